@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+"""
+Benchmark the regex fast path for resume extraction
+For each fixture in candidates/testdata/resume_fixtures.json, checks the
+locally extracted contact fields and education dates against the expected
+values, times the local pass, and compares the full vs residual extraction
+request (prompt size and max_tokens). With --live, also runs the Mistral
+extraction with and without the fast path and reports accuracy and latency.
+
+Usage:
+    python benchmarks/bench_fast_path.py [--repeat 2000]
+    python benchmarks/bench_fast_path.py --live      # needs MISTRAL_API_KEY
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from django.test.utils import override_settings
+from candidates.contact_extractor import (
+    CONTACT_FIELDS, find_contact_fields, find_education_dates, assign_education_dates,
+)
+from candidates.ocr_service import (
+    MistralOCRService, RESUME_EXTRACTION_OUTPUT, RESUME_EXTRACTION_PROMPT, residual_extraction,
+)
+from candidates.text_normalise import estimate_tokens
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        'candidates', 'testdata', 'resume_fixtures.json')
+
+
+def expected_values(fixture):
+    """{field path: expected value} for the fields the fast path targets"""
+    expected = fixture['expected']
+    values = {f'personal_info.{name}': expected['personal_info'][name] for name in CONTACT_FIELDS}
+    for index, entry in enumerate(expected['education']):
+        values[f'education[{index}].start_date'] = entry['start_date']
+        values[f'education[{index}].end_date'] = entry['end_date']
+    return values
+
+
+def result_values(data, fixture):
+    values = {f'personal_info.{name}': (data.get('personal_info') or {}).get(name) for name in CONTACT_FIELDS}
+    education = data.get('education') or []
+    for index in range(len(fixture['expected']['education'])):
+        entry = education[index] if index < len(education) else {}
+        values[f'education[{index}].start_date'] = entry.get('start_date')
+        values[f'education[{index}].end_date'] = entry.get('end_date')
+    return values
+
+
+def local_pass(fixture):
+    """Fast path alone; education entries (degree/institution) come from the expected output"""
+    text = fixture['text']
+    data = {'personal_info': find_contact_fields(text),
+            'education': [{'degree': e['degree'], 'institution': e['institution']} for e in fixture['expected']['education']]}
+    ranges = find_education_dates(text)
+    if ranges:
+        assign_education_dates(data['education'], text, ranges)
+    return data, ranges is not None
+
+
+def score(values, expected):
+    """(correct, wrong, missing) over the targeted fields"""
+    correct = sum(values[path] == value for path, value in expected.items())
+    missing = sum(values[path] is None and value is not None for path, value in expected.items())
+    return correct, len(expected) - correct - missing, missing
+
+
+def live_run(service, fixture, fast_path):
+    with override_settings(RESUME_FAST_PATH_ENABLED=fast_path):
+        start = time.perf_counter()
+        data = service.parse_resume_text(fixture['text'])
+        return data, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=2000, help="Local passes per fixture for timing")
+    parser.add_argument('--live', action='store_true', help="Also call Mistral with and without the fast path")
+    args = parser.parse_args()
+
+    with open(FIXTURES, encoding='utf-8') as f:
+        fixtures = json.load(f)
+    service = MistralOCRService() if args.live else None
+
+    print("=" * 60)
+    print(f"Extraction fast path ({len(fixtures)} fixtures)")
+    print("=" * 60)
+    totals = {'correct': 0, 'wrong': 0, 'missing': 0, 'fields': 0}
+    for fixture in fixtures:
+        expected = expected_values(fixture)
+        data, dates_found = local_pass(fixture)
+        correct, wrong, missing = score(result_values(data, fixture), expected)
+        for key, value in zip(('correct', 'wrong', 'missing'), (correct, wrong, missing)):
+            totals[key] += value
+        totals['fields'] += len(expected)
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            local_pass(fixture)
+        local_us = (time.perf_counter() - start) / args.repeat * 1e6
+
+        omitted = [f'personal_info.{name}' for name in data['personal_info']]
+        if dates_found:
+            omitted += ['education.start_date', 'education.end_date']
+        output, prompt = residual_extraction(tuple(omitted))
+
+        print(f"\n{fixture['name']}")
+        print(f"  local      {correct}/{len(expected)} correct, {wrong} wrong, {missing} left to LLM | {local_us:6.1f} µs")
+        print(f"  prompt     {estimate_tokens(RESUME_EXTRACTION_PROMPT)} -> {estimate_tokens(prompt)} tokens | "
+              f"max_tokens {RESUME_EXTRACTION_OUTPUT.max_tokens()} -> {output.max_tokens()}")
+
+        if service:
+            for label, fast_path in (('LLM only', False), ('fast path', True)):
+                result, seconds = live_run(service, fixture, fast_path)
+                correct, wrong, missing = score(result_values(result, fixture), expected)
+                print(f"  {label:10} {correct}/{len(expected)} correct, {wrong} wrong, {missing} missing | {seconds:6.2f} s")
+
+    print("\n" + "=" * 60)
+    print(f"Local: {totals['correct']}/{totals['fields']} fields correct, {totals['wrong']} wrong, "
+          f"{totals['missing']} left to the LLM")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""
+Benchmark image preprocessing for resume photos/scans
+Compares OCR payload size (and, with --ocr, Mistral OCR latency) for the
+original upload vs the normalised image.
+
+Usage:
+    python benchmarks/bench_image_preprocess.py                 # synthetic phone-photo set
+    python benchmarks/bench_image_preprocess.py --dir ./samples # your own JPEG/PNG files
+    python benchmarks/bench_image_preprocess.py --dir ./samples --ocr   # also time live OCR
+"""
+import argparse
+import base64
+import io
+import os
+import statistics
+import sys
+import time
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from PIL import Image, ImageDraw
+from candidates.image_preprocess import normalise_image
+from candidates.ocr_service import MistralOCRService
+
+
+def synthetic_samples():
+    """Text-like pages at typical phone camera / scanner resolutions"""
+    samples = []
+    for name, size, fmt in [
+        ('phone_12mp.jpg', (3024, 4032), 'JPEG'),
+        ('phone_48mp.jpg', (6000, 8000), 'JPEG'),
+        ('scan_300dpi.png', (2480, 3508), 'PNG'),
+        ('screenshot.png', (1170, 2532), 'PNG'),
+    ]:
+        image = Image.effect_noise(size, 12).convert('RGB')
+        draw = ImageDraw.Draw(image)
+        for y in range(200, size[1] - 200, max(size[1] // 60, 20)):
+            draw.text((150, y), 'Senior Backend Engineer - Django, PostgreSQL, Redis, Docker, AWS ' * 2, fill=(20, 20, 20))
+        buffer = io.BytesIO()
+        image.save(buffer, format=fmt, quality=92)
+        samples.append((name, buffer.getvalue(), f'image/{fmt.lower()}'))
+    return samples
+
+
+def dir_samples(path):
+    samples = []
+    for name in sorted(os.listdir(path)):
+        ext = os.path.splitext(name)[1].lower()
+        if ext in ('.jpg', '.jpeg', '.png'):
+            with open(os.path.join(path, name), 'rb') as f:
+                samples.append((name, f.read(), 'image/png' if ext == '.png' else 'image/jpeg'))
+    return samples
+
+
+def time_ocr(service, data, mime_type):
+    start = time.perf_counter()
+    service._ocr_pages(mime_type, [base64.b64encode(data)])
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dir', help="Directory of JPEG/PNG resumes (default: synthetic samples)")
+    parser.add_argument('--ocr', action='store_true', help="Also call Mistral OCR (needs MISTRAL_API_KEY)")
+    args = parser.parse_args()
+
+    samples = dir_samples(args.dir) if args.dir else synthetic_samples()
+    service = MistralOCRService() if args.ocr else None
+
+    print("=" * 60)
+    print(f"Image preprocessing benchmark ({len(samples)} images)")
+    print("=" * 60)
+
+    ratios = []
+    for name, data, mime_type in samples:
+        start = time.perf_counter()
+        normalised, normalised_mime = normalise_image(data)
+        prep_ms = (time.perf_counter() - start) * 1000
+        ratios.append(len(normalised) / len(data))
+
+        print(f"\n{name}")
+        print(f"  payload:    {len(data) / 1024:9.1f} KB -> {len(normalised) / 1024:9.1f} KB "
+              f"({len(normalised) / len(data):.0%})")
+        print(f"  preprocess: {prep_ms:9.1f} ms")
+
+        if service:
+            before = time_ocr(service, data, mime_type)
+            after = time_ocr(service, normalised, normalised_mime)
+            print(f"  OCR:        {before * 1000:9.1f} ms -> {after * 1000:9.1f} ms")
+
+    print("\n" + "=" * 60)
+    print(f"Median payload after preprocessing: {statistics.median(ratios):.0%} of original")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+Benchmark inverted-index top-k job retrieval
+Builds synthetic TF-IDF job catalogues (Zipf-distributed terms, idf-weighted,
+L2-normalised) from 1k to 1M jobs and, for a set of candidate queries, times
+exhaustive scoring of every job against JobIndex.top_k (MaxScore pruning),
+checking both return exactly the same jobs and scores. Pruning is forced at
+every size here; the service only prunes from PRUNING_MIN_JOBS jobs up.
+
+Usage:
+    python benchmarks/bench_job_index.py [--jobs 1000 10000 100000 1000000] [--queries 200] [--top-n 10]
+"""
+import argparse
+import os
+import sys
+import time
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.preprocessing import normalize
+from candidates import job_index
+from candidates.job_index import JobIndex, select_top_k
+from candidates.recommendation_service import MIN_MATCH_SCORE
+
+
+def zipf_terms(rng, vocabulary, size):
+    weights = 1.0 / np.arange(1, vocabulary + 1)
+    return rng.choice(vocabulary, size=size, p=weights / weights.sum())
+
+
+def synthetic_catalogue(jobs, vocabulary, seed=0):
+    """jobs x vocabulary CSC matrix of L2-normalised tf-idf weights"""
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(5, 25, size=jobs)
+    rows = np.repeat(np.arange(jobs), lengths)
+    terms = zipf_terms(rng, vocabulary, lengths.sum())
+    counts = csr_matrix((np.ones(len(rows)), (rows, terms)), shape=(jobs, vocabulary))
+    counts.sum_duplicates()
+    document_frequency = np.bincount(counts.indices, minlength=vocabulary)
+    idf = np.log((1 + jobs) / (1 + document_frequency)) + 1
+    counts.data = counts.data * idf[counts.indices]
+    return normalize(counts, norm='l2').tocsc(), idf
+
+
+def synthetic_queries(count, vocabulary, idf, seed=1):
+    """Candidate skill vectors of 5-20 terms, skewed towards common terms"""
+    rng = np.random.default_rng(seed)
+    queries = []
+    for _ in range(count):
+        terms = np.unique(zipf_terms(rng, vocabulary, rng.integers(5, 20)))
+        weights = idf[terms] / np.linalg.norm(idf[terms])
+        queries.append((terms, weights))
+    return queries
+
+
+def exhaustive(index, terms, weights, k):
+    return select_top_k(index.scores(terms, weights), np.arange(index.n_jobs), k, MIN_MATCH_SCORE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1000, 10000, 100000, 1000000], help="Catalogue sizes")
+    parser.add_argument('--vocabulary', type=int, default=20000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--top-n', type=int, default=10)
+    args = parser.parse_args()
+    job_index.PRUNING_MIN_JOBS = 0
+
+    print("=" * 60)
+    print(f"Job retrieval (top {args.top_n}, {args.queries} queries, vocabulary {args.vocabulary})")
+    print("=" * 60)
+    for jobs in args.jobs:
+        matrix, idf = synthetic_catalogue(jobs, args.vocabulary)
+        start = time.perf_counter()
+        index = JobIndex(matrix)
+        build_ms = (time.perf_counter() - start) * 1e3
+        queries = synthetic_queries(args.queries, args.vocabulary, idf)
+
+        timings = {}
+        results = {}
+        for label, function in (('exhaustive', lambda t, w: exhaustive(index, t, w, args.top_n)),
+                                ('index', lambda t, w: index.top_k(t, w, args.top_n, MIN_MATCH_SCORE))):
+            start = time.perf_counter()
+            results[label] = [function(terms, weights) for terms, weights in queries]
+            timings[label] = (time.perf_counter() - start) / len(queries) * 1e3
+
+        identical = all(np.array_equal(a[0], b[0]) and np.array_equal(a[1], b[1])
+                        for a, b in zip(results['exhaustive'], results['index']))
+        print(f"\n{jobs} jobs, {matrix.nnz} postings (term bounds in {build_ms:.1f} ms)")
+        print(f"  exhaustive {timings['exhaustive']:8.3f} ms/query")
+        print(f"  index      {timings['index']:8.3f} ms/query  ({timings['exhaustive'] / timings['index']:.1f}x)")
+        print(f"  identical results: {'yes' if identical else 'NO'}")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark for LLM JSON extraction
+Runs the malformed-output corpus (candidates/testdata/llm_outputs.json) through
+the shared extractor and through the previous split/regex/unicode_escape
+approach, reporting how many outputs each recovers and the time per call.
+
+Usage:
+    python benchmarks/bench_llm_json.py [--repeat 2000]
+"""
+import argparse
+import codecs
+import json
+import os
+import re
+import sys
+import time
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from candidates.llm_json import extract_json, LLMJSONError
+from candidates.ocr_service import RESUME_ANALYSIS_SCHEMA, RESUME_EXTRACTION_SCHEMA
+from interview.analysis_service import INTERVIEW_ANALYSIS_SCHEMA
+
+CORPUS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      'candidates', 'testdata', 'llm_outputs.json')
+SCHEMAS = {
+    'analysis': RESUME_ANALYSIS_SCHEMA,
+    'extraction': RESUME_EXTRACTION_SCHEMA,
+    'interview': INTERVIEW_ANALYSIS_SCHEMA,
+}
+
+
+def legacy_parse(text):
+    """The per-service parsing this replaced (analyze_resume's variant, the most tolerant one)"""
+    if '```json' in text:
+        text = text.split('```json')[1].split('```')[0].strip()
+    elif '```' in text:
+        text = text.split('```')[1].split('```')[0].strip()
+    text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]', '', text)
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        if 'Invalid control character' in str(e) or 'line' in str(e):
+            encoded = codecs.encode(text, 'unicode_escape').decode('ascii')
+            return json.loads(encoded.replace('\\\\', '\\'))
+        raise
+
+
+def shared_parse(case):
+    return extract_json(case['raw'], SCHEMAS[case['schema']])
+
+
+def run(parse, case):
+    try:
+        return parse(case) == case.get('expected')
+    except (json.JSONDecodeError, LLMJSONError, ValueError):
+        return 'error' in case
+
+
+def time_per_call(parse, cases, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for case in cases:
+            try:
+                parse(case)
+            except (json.JSONDecodeError, LLMJSONError, ValueError):
+                pass
+    return (time.perf_counter() - start) / (repeat * len(cases)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=2000, help="Passes over the corpus for timing")
+    args = parser.parse_args()
+
+    with open(CORPUS, encoding='utf-8') as f:
+        corpus = json.load(f)
+    parsers = {
+        'legacy': lambda case: legacy_parse(case['raw']),
+        'extract_json': shared_parse,
+    }
+
+    print("=" * 60)
+    print(f"LLM JSON extraction ({len(corpus)} corpus outputs)")
+    print("=" * 60)
+    print(f"\n{'case':40} {'legacy':>8} {'shared':>8}")
+    for case in corpus:
+        marks = ['ok' if run(parsers[name], case) else 'FAIL' for name in parsers]
+        print(f"{case['name']:40} {marks[0]:>8} {marks[1]:>8}")
+
+    print("\n" + "=" * 60)
+    for name, parse in parsers.items():
+        correct = sum(run(parse, case) for case in corpus)
+        clean = [case for case in corpus if case['name'] == 'clean']
+        print(f"{name:14} {correct}/{len(corpus)} correct | "
+              f"{time_per_call(parse, corpus, args.repeat):7.1f} µs/call (corpus) | "
+              f"{time_per_call(parse, clean, args.repeat):7.1f} µs/call (well-formed)")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
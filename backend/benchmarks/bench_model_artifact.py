@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+"""
+Benchmark recommendation model loading: final_model.pkl vs mmap artifact
+Writes one model in both formats, then for each format starts --workers
+processes that load it (as each gunicorn worker would), serve one
+recommendation and one quality analysis, and wait for each other. Reports
+cold-load time and per-worker memory: RSS counts shared pages in every
+worker, PSS splits them between the workers that map them, and private is
+what each worker alone holds.
+
+The model is dataset/final_model.pkl when it exists (or --model), otherwise
+a synthetic one with --jobs job profiles.
+
+Usage:
+    python benchmarks/bench_model_artifact.py [--workers 4] [--jobs 200000]
+    python benchmarks/bench_model_artifact.py --model ../dataset/final_model.pkl
+"""
+import argparse
+import multiprocessing
+import os
+import pickle
+import sys
+import tempfile
+import time
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+import numpy as np
+from scipy.sparse import hstack
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import LabelEncoder
+from candidates.model_artifact import export_artifact, load_artifact
+from candidates.recommendation_service import RecommendationService
+from bench_recommendations import CANDIDATE_SKILLS, synthetic_model
+
+DEFAULT_MODEL = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                             'dataset', 'final_model.pkl')
+
+
+def full_model(jobs):
+    """Synthetic job catalogue plus a forest trained on random labels, shaped like final_model.pkl"""
+    model = synthetic_model(jobs)
+    texts = model['job_profiles']['skills_required_cleaned'].tolist()[:2000]
+    responsibilities = TfidfVectorizer(max_features=1000).fit(texts)
+    features = hstack([model['tfidf_skills'].transform(texts), responsibilities.transform(texts)])
+    encoder = LabelEncoder()
+    labels = encoder.fit_transform(np.random.default_rng(0).choice(['Low', 'Medium', 'High', 'Excellent'], len(texts)))
+    forest = RandomForestClassifier(n_estimators=100, max_depth=10, random_state=42).fit(features, labels)
+    model.update(model=forest, tfidf_responsibilities=responsibilities, label_encoder=encoder)
+    return model
+
+
+def memory_kb():
+    """{'rss', 'pss', 'private'} of this process in kB (Linux)"""
+    values = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            name, _, rest = line.partition(':')
+            if name in ('Rss', 'Pss', 'Private_Clean', 'Private_Dirty'):
+                values[name] = int(rest.split()[0])
+    return {'rss': values['Rss'], 'pss': values['Pss'], 'private': values['Private_Clean'] + values['Private_Dirty']}
+
+
+def worker(path, barrier, results):
+    before = memory_kb()
+    start = time.perf_counter()
+    if path.endswith('.pkl'):
+        with open(path, 'rb') as f:
+            model = pickle.load(f)
+    else:
+        model = load_artifact(path)
+    service = RecommendationService(model=model)
+    load_s = time.perf_counter() - start
+    service.recommend(CANDIDATE_SKILLS, 10)
+    service.analyze_resume_quality(CANDIDATE_SKILLS)
+    # Measure while every worker has the model open
+    barrier.wait()
+    after = memory_kb()
+    barrier.wait()
+    results.put({'load_s': load_s, **{key: after[key] - before[key] for key in after}})
+
+
+def run(path, workers):
+    context = multiprocessing.get_context('spawn')
+    barrier, results = context.Barrier(workers), context.Queue()
+    processes = [context.Process(target=worker, args=(path, barrier, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    rows = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return rows
+
+
+def compare(args, directory):
+    model_path = args.model or (DEFAULT_MODEL if os.path.exists(DEFAULT_MODEL) else None)
+    if model_path:
+        with open(model_path, 'rb') as f:
+            model = pickle.load(f)
+    else:
+        model = full_model(args.jobs)
+        model_path = os.path.join(directory, 'final_model.pkl')
+        with open(model_path, 'wb') as f:
+            pickle.dump(model, f)
+    artifact_path = export_artifact(model, os.path.join(directory, 'artifacts'))
+    artifact_mb = sum(os.path.getsize(os.path.join(artifact_path, n)) for n in os.listdir(artifact_path)) / 2 ** 20
+
+    print("=" * 60)
+    print(f"Model loading ({len(model['job_profiles'])} jobs, {args.workers} workers)")
+    print("=" * 60)
+    for label, path, size_mb in (('pickle', model_path, os.path.getsize(model_path) / 2 ** 20),
+                                 ('mmap artifact', artifact_path, artifact_mb)):
+        rows = run(path, args.workers)
+        mean = {key: sum(row[key] for row in rows) / len(rows) for key in rows[0]}
+        print(f"\n{label} ({size_mb:.1f} MB on disk)")
+        print(f"  cold load   {mean['load_s'] * 1e3:8.1f} ms/worker")
+        print(f"  RSS         {mean['rss'] / 1024:8.1f} MB/worker")
+        print(f"  PSS         {mean['pss'] / 1024:8.1f} MB/worker  ({mean['pss'] * args.workers / 1024:.1f} MB total)")
+        print(f"  private     {mean['private'] / 1024:8.1f} MB/worker")
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--jobs', type=int, default=200000, help="Synthetic catalogue size")
+    parser.add_argument('--model', help="Pickled model to compare (default dataset/final_model.pkl if present)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='model-artifact-') as directory:
+        compare(args, directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""
+Benchmark the recommendation result cache
+On a synthetic catalogue, times one recommend() request uncached, served
+from the shared (file-based) cache, and served from the per-process LRU;
+then replays --requests searches drawn Zipf-wise from --stacks distinct
+skill stacks (popular stacks repeat, as on the Recommendations page) with
+and without the cache, and reports the hit rate.
+
+Usage:
+    python benchmarks/bench_recommendation_cache.py [--jobs 100000] [--stacks 500] [--requests 5000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+import numpy as np
+from django.test.utils import override_settings
+from candidates.recommendation_cache import RecommendationCache
+from candidates.recommendation_service import RecommendationService
+from bench_recommendations import synthetic_candidates, synthetic_model
+
+
+def per_request_ms(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jobs', type=int, default=100000)
+    parser.add_argument('--stacks', type=int, default=500, help="Distinct skill stacks searched")
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--top-n', type=int, default=10)
+    args = parser.parse_args()
+
+    model = synthetic_model(args.jobs)
+    service = RecommendationService(model=model)
+    stacks = [', '.join(skills) for skills in synthetic_candidates(model, args.stacks)]
+    weights = 1.0 / np.arange(1, len(stacks) + 1)
+    requests = np.random.default_rng(2).choice(len(stacks), size=args.requests, p=weights / weights.sum())
+
+    with tempfile.TemporaryDirectory(prefix='recommendation-cache-') as directory, override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'recommendations': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory,
+                            'OPTIONS': {'MAX_ENTRIES': 10000}},
+    }):
+        print("=" * 60)
+        print(f"Recommendation cache ({args.jobs} jobs, {args.stacks} stacks, {args.requests} requests)")
+        print("=" * 60)
+
+        skills = stacks[0]
+        uncached = per_request_ms(lambda: service.recommend(skills, args.top_n), 50)
+        with override_settings(RECOMMENDATION_CACHE_LOCAL_ENTRIES=0):
+            shared_only = RecommendationCache()
+            shared_only.recommend(service, skills, args.top_n)
+            shared = per_request_ms(lambda: shared_only.recommend(service, skills, args.top_n), 200)
+        cache = RecommendationCache()
+        cache.recommend(service, skills, args.top_n)
+        local = per_request_ms(lambda: cache.recommend(service, skills, args.top_n), 2000)
+        print("\nOne request")
+        print(f"  uncached     {uncached:8.3f} ms")
+        print(f"  shared hit   {shared:8.3f} ms  ({uncached / shared:.0f}x)")
+        print(f"  local hit    {local:8.3f} ms  ({uncached / local:.0f}x)")
+
+        start = time.perf_counter()
+        for index in requests:
+            service.recommend(stacks[index], args.top_n)
+        uncached_s = time.perf_counter() - start
+        cache = RecommendationCache()
+        start = time.perf_counter()
+        for index in requests:
+            cache.recommend(service, stacks[index], args.top_n)
+        cached_s = time.perf_counter() - start
+        stats = cache.stats()
+        print(f"\nZipf workload ({len(set(requests.tolist()))} distinct stacks requested)")
+        print(f"  uncached     {uncached_s / args.requests * 1e3:8.3f} ms/request")
+        print(f"  cached       {cached_s / args.requests * 1e3:8.3f} ms/request  ({uncached_s / cached_s:.1f}x)")
+        print(f"  hit rate     {stats['hit_rate']:.1%} ({stats['local_hits']} local, "
+              f"{stats['hits'] - stats['local_hits']} shared, {stats['misses']} misses)")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+"""
+Benchmark job recommendation scoring
+Times the original per-request path (cosine_similarity against the whole job
+matrix, full argsort, DataFrame row lookups, separate dense skill insights)
+against RecommendationService.recommend (pre-normalised column matrix, gather
+over the candidate's terms, argpartition top-k, one shared vector) on
+synthetic catalogues of growing size, and checks both return the same jobs.
+Also times --batch candidates scored one request at a time against one
+batch_recommendations call.
+
+Usage:
+    python benchmarks/bench_recommendations.py [--jobs 1000 10000 100000] [--repeat 50] [--batch 500]
+"""
+import argparse
+import os
+import sys
+import time
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+from candidates.recommendation_service import RecommendationService
+
+CANDIDATE_SKILLS = 'python, django, sql, postgresql, docker, aws, machine learning, pandas, git, linux'
+
+
+def synthetic_model(jobs, vocabulary=5000, seed=0):
+    """Model dict shaped like dataset/final_model.pkl; skill terms Zipf-distributed"""
+    rng = np.random.default_rng(seed)
+    terms = np.array([f'skill{i}' for i in range(vocabulary)] + CANDIDATE_SKILLS.replace(',', '').split())
+    weights = 1.0 / np.arange(1, len(terms) + 1)
+    weights /= weights.sum()
+    texts = [' '.join(rng.choice(terms, size=rng.integers(5, 25), p=weights)) for _ in range(jobs)]
+    tfidf = TfidfVectorizer()
+    matrix = tfidf.fit_transform(texts)
+    profiles = pd.DataFrame({
+        '﻿job_position_name': [f'Job {i}' for i in range(jobs)],
+        'skills_required_cleaned': texts,
+        'responsibilities': ['Design, build and run services. ' * 10] * jobs,
+        'educationaL_requirements': ['BSc'] * jobs,
+        'experiencere_requirement': ['3 years'] * jobs,
+    })
+    return {'tfidf_skills': tfidf, 'job_skills_matrix': matrix, 'job_profiles': profiles}
+
+
+def synthetic_candidates(model, count, seed=1):
+    """Skill lists of 5-15 terms drawn from the model vocabulary"""
+    rng = np.random.default_rng(seed)
+    vocabulary = model['tfidf_skills'].get_feature_names_out()[:2000]
+    return [rng.choice(vocabulary, size=rng.integers(5, 15)) for _ in range(count)]
+
+
+def legacy_recommend(service, model, skills, top_n):
+    """The pre-index implementation, kept here as the baseline"""
+    candidate_vector = model['tfidf_skills'].transform([service._clean_text(skills)])
+    similarities = cosine_similarity(candidate_vector, model['job_skills_matrix'])[0]
+    recommendations = []
+    for idx in similarities.argsort()[-top_n:][::-1]:
+        job = model['job_profiles'].iloc[idx]
+        if similarities[idx] > 0.001:
+            recommendations.append({
+                'job_title': job.get('job_position_name', job.get('﻿job_position_name', 'N/A')),
+                'match_score': round(similarities[idx] * 100, 2),
+                'required_skills': job.get('skills_required_cleaned', 'N/A'),
+                'responsibilities': job.get('responsibilities', 'N/A')[:200] + '...',
+                'education_required': job.get('educationaL_requirements', 'N/A'),
+                'experience_required': job.get('experiencere_requirement', 'N/A'),
+            })
+    skills_array = model['tfidf_skills'].transform([skills]).toarray()[0]
+    top_skills = [skills_array[i] for i in skills_array.argsort()[-10:][::-1] if skills_array[i] > 0]
+    return recommendations, top_skills
+
+
+def time_per_call(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1000, 10000, 100000], help="Catalogue sizes")
+    parser.add_argument('--top-n', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=50, help="Requests per catalogue for timing")
+    parser.add_argument('--batch', type=int, default=500, help="Candidates in the batch comparison")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"Recommendation scoring (top {args.top_n}, {args.repeat} requests per size)")
+    print("=" * 60)
+    for jobs in args.jobs:
+        model = synthetic_model(jobs)
+        start = time.perf_counter()
+        service = RecommendationService(model=model)
+        index_ms = (time.perf_counter() - start) * 1e3
+
+        legacy, _ = legacy_recommend(service, model, CANDIDATE_SKILLS, args.top_n)
+        current, _ = service.recommend(CANDIDATE_SKILLS, args.top_n)
+        same = [r['match_score'] for r in legacy] == [r['match_score'] for r in current]
+
+        legacy_ms = time_per_call(lambda: legacy_recommend(service, model, CANDIDATE_SKILLS, args.top_n), args.repeat)
+        current_ms = time_per_call(lambda: service.recommend(CANDIDATE_SKILLS, args.top_n), args.repeat)
+        print(f"\n{jobs} jobs, {model['job_skills_matrix'].nnz} non-zeros (index built in {index_ms:.1f} ms)")
+        print(f"  legacy     {legacy_ms:8.2f} ms/request")
+        print(f"  sparse     {current_ms:8.2f} ms/request  ({legacy_ms / current_ms:.1f}x faster)")
+        print(f"  same scores: {'yes' if same else 'NO'}")
+
+        candidates = [' '.join(words) for words in synthetic_candidates(model, args.batch)]
+        start = time.perf_counter()
+        single = [service.get_job_recommendations(skills, args.top_n) for skills in candidates]
+        single_s = time.perf_counter() - start
+        start = time.perf_counter()
+        batch = service.batch_recommendations(candidates, args.top_n)
+        batch_s = time.perf_counter() - start
+        same = [[r['match_score'] for r in rs] for rs in single] == [[r['match_score'] for r in rs] for rs in batch]
+        print(f"  {args.batch} candidates: one by one {single_s:6.2f} s, batch {batch_s:6.2f} s "
+              f"({single_s / batch_s:.1f}x faster), same scores: {'yes' if same else 'NO'}")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,31 @@
+import os
+import sys
 from django.apps import AppConfig
+from django.conf import settings
+
+# Processes that serve requests and so should warm up at start
+SERVERS = ('gunicorn', 'uwsgi', 'daphne', 'uvicorn')
+
+
+def is_server_process(argv=None):
+    """
+    True for a WSGI/ASGI server or `manage.py runserver` (its serving child,
+    not the autoreloader parent); False for other management commands,
+    tests and scripts, which don't need the model loaded up front.
+    """
+    argv = sys.argv if argv is None else argv
+    if not argv:
+        return False
+    if os.path.basename(argv[0]) == 'manage.py':
+        return argv[1:2] == ['runserver'] and (os.environ.get('RUN_MAIN') == 'true' or '--noreload' in argv)
+    return any(server in argv[0] for server in SERVERS)
 
 
 class CandidatesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "candidates"
+
+    def ready(self):
+        if getattr(settings, 'RECOMMENDATION_WARMUP', False) and is_server_process():
+            from .warmup import warm_up
+            warm_up()
@@ -0,0 +1,191 @@
+"""
+Candidate index for reverse matching (job -> stored candidates)
+Each Person is vectorised like a job's required skills (the recommendation
+model's skills TF-IDF, L2-normalised) from their Skill names plus stored
+resume text, so a job vector's dot product with a candidate row is their
+cosine similarity.
+
+The index is built once per process and then kept current incrementally:
+rows of updated people are masked out of the main matrix and re-added to a
+small pending matrix, which is merged in once it grows. SaveCVView updates
+the saving process as soon as its transaction commits; every process also
+picks up people saved elsewhere (other workers, bulk ingestion) from
+Person.updated_at before answering a query.
+"""
+
+import threading
+import time
+from datetime import timedelta
+
+import numpy as np
+from scipy.sparse import csr_matrix, vstack
+from sklearn.preprocessing import normalize
+from django.utils import timezone
+
+from .job_index import select_top_k
+from .models import Person, Skill
+from .recommendation_service import MIN_MATCH_SCORE, get_recommendation_service
+from .skill_matcher import get_skill_matcher
+
+
+# Pending rows merged into the main matrix once there are this many
+MERGE_PENDING_ROWS = 256
+# Each sync re-checks people updated this long before the previous one started,
+# so a save whose transaction was still open then (its updated_at is older
+# than its commit) is not missed
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+class CandidateIndex:
+    """
+    People x vocabulary matrix over the recommendation service's vocabulary.
+    Thread-safe; built from the database on creation.
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self._lock = threading.Lock()
+        vocabulary = len(service.feature_names)
+        self._matrix = csr_matrix((0, vocabulary))
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._live = np.zeros(0, dtype=bool)
+        self._row_of = {}       # person id -> row in _matrix
+        self._pending = {}      # person id -> 1 x vocabulary row, newer than _matrix
+        self._indexed_at = {}   # person id -> updated_at of the indexed version
+        self._synced_at = timezone.now()
+        self.updates = 0
+        with self._lock:
+            self._update(Person.objects.values_list('id', flat=True), full=True)
+
+    def __len__(self):
+        return int(self._live.sum()) + len(self._pending)
+
+    def _documents(self, person_ids):
+        """(id, updated_at, text) for the given people, skills first then resume text"""
+        people = list(Person.objects.filter(id__in=person_ids).values_list('id', 'updated_at', 'resume_text'))
+        skills = {}
+        for person_id, name in Skill.objects.filter(person_id__in=[p[0] for p in people]).values_list('person_id', 'name'):
+            skills.setdefault(person_id, []).append(name)
+        return [(person_id, updated_at, ', '.join(skills.get(person_id, [])) + '\n' + (resume_text or ''))
+                for person_id, updated_at, resume_text in people]
+
+    def _vectors(self, texts):
+        """L2-normalised skills TF-IDF rows; aliases ("js", "k8s") count as their canonical skills"""
+        service, matcher = self.service, get_skill_matcher()
+        texts = [service._clean_text(matcher.skills_text(text)) for text in texts]
+        return normalize(service.tfidf_skills.transform(texts), norm='l2').tocsr()
+
+    def _update(self, person_ids, full=False):
+        """Re-index `person_ids` from the database (people no longer there are dropped). Call with the lock held."""
+        person_ids = list(person_ids)
+        documents = self._documents(person_ids)
+        vectors = self._vectors([text for _, _, text in documents]) if documents else None
+
+        if full:
+            self._matrix = vectors if vectors is not None else self._matrix
+            self._ids = np.array([d[0] for d in documents], dtype=np.int64)
+            self._live = np.ones(len(documents), dtype=bool)
+            self._row_of = {person_id: row for row, person_id in enumerate(self._ids.tolist())}
+            self._pending = {}
+        else:
+            for person_id in person_ids:
+                row = self._row_of.pop(person_id, None)
+                if row is not None:
+                    self._live[row] = False
+                self._pending.pop(person_id, None)
+                self._indexed_at.pop(person_id, None)
+            for row, (person_id, _, _) in enumerate(documents):
+                self._pending[person_id] = vectors[row]
+            self.updates += len(person_ids)
+            if len(self._pending) >= MERGE_PENDING_ROWS:
+                self._merge()
+
+        for person_id, updated_at, _ in documents:
+            self._indexed_at[person_id] = updated_at
+
+    def _merge(self):
+        """Fold pending rows into the main matrix and drop masked rows"""
+        pending_ids = list(self._pending)
+        self._matrix = vstack([self._matrix[self._live]] + [self._pending[i] for i in pending_ids], format='csr')
+        self._ids = np.concatenate([self._ids[self._live], np.array(pending_ids, dtype=np.int64)])
+        self._live = np.ones(len(self._ids), dtype=bool)
+        self._row_of = {person_id: row for row, person_id in enumerate(self._ids.tolist())}
+        self._pending = {}
+
+    def update(self, person_ids):
+        """Re-index these people now (after they were saved or deleted)"""
+        with self._lock:
+            self._update(person_ids)
+
+    def sync(self):
+        """Re-index people changed since the last sync, by any process. One query when nothing changed."""
+        with self._lock:
+            started = timezone.now()
+            changed = Person.objects.filter(updated_at__gte=self._synced_at - SYNC_OVERLAP)
+            stale = [person_id for person_id, updated_at in changed.values_list('id', 'updated_at')
+                     if self._indexed_at.get(person_id) != updated_at]
+            if stale:
+                self._update(stale)
+            self._synced_at = started
+            return len(stale)
+
+    def job_vector(self, job_text):
+        """Vector of a job description (or a catalogue job's required skills)"""
+        return self._vectors([job_text if isinstance(job_text, str) else ''])
+
+    def top_candidates(self, job_vector, top_n=10):
+        """
+        Best-matching people for a 1 x vocabulary job vector
+
+        Returns:
+        - list of (person id, cosine similarity), best first
+        """
+        top_n = int(top_n)
+        query = job_vector.tocsr().T
+        with self._lock:
+            scores = (self._matrix @ query).toarray().ravel()
+            scores[~self._live] = 0.0
+            ids = self._ids
+            if self._pending:
+                pending_ids = list(self._pending)
+                pending = vstack([self._pending[i] for i in pending_ids], format='csr')
+                scores = np.concatenate([scores, (pending @ query).toarray().ravel()])
+                ids = np.concatenate([ids, np.array(pending_ids, dtype=np.int64)])
+        ids, scores = select_top_k(scores, ids, top_n, MIN_MATCH_SCORE)
+        return [(int(person_id), float(score)) for person_id, score in zip(ids, scores)]
+
+
+# Singleton instance (rebuilt when the recommendation model is reloaded, as
+# the vocabulary changes with it)
+_candidate_index = None
+_candidate_index_lock = threading.Lock()
+
+
+def get_candidate_index():
+    """
+    Get or build this process's candidate index, synced with the database.
+    None when no recommendation model is available.
+    """
+    global _candidate_index
+    service = get_recommendation_service()
+    if not service.model:
+        return None
+    index = _candidate_index
+    if index is None or index.service is not service:
+        with _candidate_index_lock:
+            if _candidate_index is None or _candidate_index.service is not service:
+                start = time.perf_counter()
+                _candidate_index = CandidateIndex(service)
+                print(f"[CandidateIndex] Indexed {len(_candidate_index)} candidates for model "
+                      f"{service.model_version} in {time.perf_counter() - start:.2f}s")
+            index = _candidate_index
+    else:
+        index.sync()
+    return index
+
+
+def refresh_candidates(person_ids):
+    """Re-index saved people in this process's index, if it has been built (call after commit)"""
+    index = _candidate_index
+    if index is not None:
+        index.update(person_ids)
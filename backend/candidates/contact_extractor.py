@@ -0,0 +1,168 @@
+"""
+Deterministic fast path for resume extraction
+Finds email, phone, LinkedIn/GitHub/portfolio links and education date ranges
+with precompiled patterns, so the LLM is only asked for what is left.
+"""
+
+import re
+from bisect import bisect_right
+
+
+CONTACT_FIELDS = ['email', 'phone', 'linkedin_url', 'github_url', 'portfolio_url']
+
+_EMAIL_RE = re.compile(r'(?<![\w.+-])[\w.+-]+@[\w-]+(?:\.[\w-]+)*\.[a-z]{2,}(?![\w-])', re.I)
+_LINKEDIN_RE = re.compile(r'(?:https?://)?(?:[\w-]+\.)?linkedin\.com/(?:in|pub)/[\w%.-]+', re.I)
+_GITHUB_RE = re.compile(r'(?:https?://)?(?:www\.)?github\.com/[\w-]+', re.I)
+_URL_RE = re.compile(r'(?:https?://|www\.)[^\s<>()\[\]{}"\',;|]+', re.I)
+# Non-blank lines at the top of a CV searched for a portfolio link
+HEADER_LINES = 8
+# Domains whose links are not a personal portfolio
+_NOT_PORTFOLIO_RE = re.compile(r'linkedin\.com|github\.com|google\.com/maps|mailto:', re.I)
+
+# +44 7700 900123, (555) 123-4567, 555.123.4567, +1-555-123-4567
+_PHONE_RE = re.compile(r'(?<![\w+])(?:\+\d{1,3}[\s.-]?)?(?:\(\d{1,5}\)[\s.-]?)?\d[\d\s.-]{5,16}\d(?![\w])')
+# Digit runs that look like phone numbers but are years, year ranges or dates
+_NOT_PHONE_RE = re.compile(r'^(?:(?:19|20)\d\d\s*[-.]\s*(?:19|20)\d\d|\d{1,2}[./-]\d{1,2}[./-]\d{2,4}|(?:19|20)\d\d)$')
+
+_MONTH = r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?'
+_DATE = rf'(?:{_MONTH}\s+\d{{4}}|\d{{1,2}}/\d{{4}}|(?:19|20)\d\d)'
+_DATE_RANGE_RE = re.compile(
+    rf'\b(?P<start>{_DATE})\s*(?:-|–|—|to|until)\s*(?P<end>{_DATE}|present|current|now|ongoing)\b', re.I)
+_YEAR_RE = re.compile(r'\b(?:19|20)\d\d\b')
+
+# Short lines that are section titles; education opens the section we search
+# for date ranges, any other title closes it
+_EDUCATION_TITLE_RE = re.compile(r'^\W*(?:education|academic \w+|qualifications)\W*$', re.I)
+_SECTION_TITLE_RE = re.compile(
+    r'^\W*(?:(?:work |professional )?experience|employment(?: history)?|work history|skills|technical skills|'
+    r'projects|certifications?|achievements|awards|publications|languages|interests|hobbies|references|'
+    r'summary|profile|objective|volunteering|courses|training)\W*$', re.I)
+
+
+def _url(value):
+    value = value.rstrip('./')
+    return value if value.lower().startswith(('http://', 'https://')) else f'https://{value}'
+
+
+def _phone(text):
+    for match in _PHONE_RE.finditer(text):
+        value = match.group().strip()
+        digits = sum(c.isdigit() for c in value)
+        if 7 <= digits <= 15 and not _NOT_PHONE_RE.match(value):
+            return value
+    return None
+
+
+def header_block(text):
+    """
+    The CV's header: its first HEADER_LINES non-blank lines, cut at the first
+    section title. A personal site is listed there; links further down
+    belong to employers, projects or publications.
+    """
+    lines = []
+    for line in text.split('\n'):
+        if _SECTION_TITLE_RE.match(line) or _EDUCATION_TITLE_RE.match(line) or len(lines) == HEADER_LINES:
+            break
+        if line.strip():
+            lines.append(line)
+    return '\n'.join(lines)
+
+
+def find_contact_fields(text):
+    """
+    Returns:
+        {field: value} for the personal_info contact fields found in `text`;
+        portfolio_url only from its header block
+    """
+    found = {}
+    email = _EMAIL_RE.search(text)
+    if email:
+        found['email'] = email.group().lower()
+    # Digits inside emails/links are not phone numbers
+    phone = _phone(_EMAIL_RE.sub(' ', _URL_RE.sub(' ', text)))
+    if phone:
+        found['phone'] = phone
+    linkedin = _LINKEDIN_RE.search(text)
+    if linkedin:
+        found['linkedin_url'] = _url(linkedin.group())
+    github = _GITHUB_RE.search(text)
+    if github:
+        found['github_url'] = _url(github.group())
+    for match in _URL_RE.finditer(header_block(text)):
+        if not _NOT_PORTFOLIO_RE.search(match.group()):
+            found['portfolio_url'] = _url(match.group())
+            break
+    return found
+
+
+def education_section(text):
+    """(start, end) offsets of the education section, or None if there is no such heading"""
+    start = None
+    offset = 0
+    for line in text.split('\n'):
+        if start is None and _EDUCATION_TITLE_RE.match(line):
+            start = offset + len(line)
+        elif start is not None and _SECTION_TITLE_RE.match(line):
+            return start, offset
+        offset += len(line) + 1
+    return (start, len(text)) if start is not None else None
+
+
+def find_education_dates(text):
+    """
+    Date ranges in the education section, in order.
+
+    Returns:
+        [(offset in text, start, end)], or None when the section has dates
+        that are not ranges (a lone graduation year) and the LLM should read them
+    """
+    section = education_section(text)
+    if section is None:
+        return None
+    start, end = section
+    body = text[start:end]
+    ranges = [(start + m.start(), m.group('start'), m.group('end')) for m in _DATE_RANGE_RE.finditer(body)]
+    # Every line mentioning a year must be covered by a range
+    dated_lines = [line for line in body.split('\n') if _YEAR_RE.search(line)]
+    if not ranges or any(not _DATE_RANGE_RE.search(line) for line in dated_lines):
+        return None
+    return ranges
+
+
+def assign_education_dates(entries, text, ranges):
+    """
+    Fill start_date/end_date of LLM education entries from `ranges`. Each
+    entry takes the unused range closest to a line naming its institution or
+    degree: the same line first, then the lines below it, then above. Entries
+    that can't be located take the remaining ranges in document order.
+
+    Returns:
+        Indexes of the entries that were given dates
+    """
+    line_starts = [0] + [i + 1 for i, char in enumerate(text) if char == '\n']
+    lowered = text.lower()
+    section_start = education_section(text)[0]
+
+    def distance(range_line, anchor_line):
+        if range_line == anchor_line:
+            return (0, 0)
+        if range_line > anchor_line:
+            return (1, range_line - anchor_line)
+        return (2, anchor_line - range_line)
+
+    unused = [(bisect_right(line_starts, offset) - 1, start, end) for offset, start, end in ranges]
+    assigned = []
+    for index, entry in enumerate(entries):
+        if not unused:
+            break
+        anchors = [lowered.find(str(entry[key]).lower(), section_start) for key in ('institution', 'degree')
+                   if entry.get(key)]
+        anchor_lines = [bisect_right(line_starts, position) - 1 for position in anchors if position != -1]
+        if anchor_lines:
+            best = min(unused, key=lambda r: min(distance(r[0], line) for line in anchor_lines))
+        else:
+            best = unused[0]
+        unused.remove(best)
+        entry['start_date'], entry['end_date'] = best[1], best[2]
+        assigned.append(index)
+    return assigned
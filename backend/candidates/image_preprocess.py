@@ -0,0 +1,79 @@
+"""
+Image normalisation for JPEG/PNG resume uploads
+Phone photos arrive at camera resolution (often 4000x3000, several MB); OCR
+needs far less. Images are rotated upright, converted to grayscale, downscaled
+to an OCR-friendly DPI and recompressed before being sent to Mistral OCR.
+"""
+
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from PIL import Image, ImageOps
+
+
+# Long edge of an A4 page in inches; uploads are assumed to be a photo/scan of one page
+PAGE_LONG_EDGE_INCHES = 11.69
+
+# Shared pool so concurrent uploads can't all decode large images at once.
+# Pillow releases the GIL while decoding/resizing, so request threads keep running.
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'OCR_IMAGE_PREPROCESS_WORKERS', 2),
+                    thread_name_prefix='ocr-image',
+                )
+    return _executor
+
+
+def normalise_image(data):
+    """
+    Normalise one resume image for OCR.
+
+    Args:
+        data: raw JPEG/PNG bytes
+
+    Returns:
+        (image bytes, mime type). The original bytes are returned unchanged when
+        normalisation would not make the payload smaller.
+    """
+    target_dpi = getattr(settings, 'OCR_IMAGE_TARGET_DPI', 200)
+    quality = getattr(settings, 'OCR_IMAGE_JPEG_QUALITY', 80)
+    max_edge = round(PAGE_LONG_EDGE_INCHES * target_dpi)
+
+    with Image.open(io.BytesIO(data)) as image:
+        original_format = (image.format or 'JPEG').lower()
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('L')
+        if max(image.size) > max_edge:
+            image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', quality=quality, optimize=True)
+
+    normalised = buffer.getvalue()
+    if len(normalised) >= len(data):
+        return data, f'image/{original_format}'
+    return normalised, 'image/jpeg'
+
+
+def preprocess_upload(data):
+    """
+    Run `normalise_image` on the shared worker pool and wait for the result.
+    Falls back to the original bytes if the image can't be decoded.
+    """
+    if not getattr(settings, 'OCR_IMAGE_PREPROCESS_ENABLED', True):
+        return data, None
+
+    try:
+        return _get_executor().submit(normalise_image, data).result()
+    except Exception as e:
+        print(f"[ImagePreprocess] Skipping normalisation: {e}")
+        return data, None
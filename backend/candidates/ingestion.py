@@ -0,0 +1,288 @@
+"""
+Bulk resume ingestion
+Runs the OCR/extraction pipeline over a directory or archive of CVs with a
+process pool (one thread pool per process), a token bucket shared by all
+workers to stay within upstream quotas, bulk inserts of Person and child rows,
+and a checkpoint file so interrupted runs resume where they stopped.
+Only the parent process touches the database (Person rows and the OCR cache).
+"""
+
+import io
+import json
+import multiprocessing
+import os
+import tarfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from django.conf import settings
+from django.db import connections, transaction
+
+from config.checkpoint import Checkpoint
+from .models import Person
+from .ocr_cache import ocr_cache, content_hash
+from .ocr_service import MistralOCRService
+from .serializers import PersonSerializer
+
+
+MIME_TYPES = {
+    '.pdf': 'application/pdf',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+}
+
+PERSON_FIELDS = ['first_name', 'last_name', 'phone', 'linkedin_url', 'github_url', 'portfolio_url', 'resume_text']
+
+
+class TokenBucket:
+    """
+    Token bucket shared between processes (state lives in shared memory), so
+    every worker draws from one global budget of `rate` requests per second
+    with bursts of up to `burst` requests.
+    """
+
+    def __init__(self, rate, burst=1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        # [available tokens, time of the last update]
+        self._state = multiprocessing.Array('d', [self.burst, time.monotonic()])
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self._state.get_lock():
+                tokens, updated = self._state[0], self._state[1]
+                now = time.monotonic()
+                tokens = min(self.burst, tokens + (now - updated) * self.rate)
+                if tokens >= 1:
+                    self._state[0], self._state[1] = tokens - 1, now
+                    return
+                self._state[0], self._state[1] = tokens, now
+                delay = (1 - tokens) / self.rate
+            time.sleep(delay)
+
+
+def iter_documents(source):
+    """
+    Yield (key, mime type, bytes) for each supported CV under `source`.
+
+    Args:
+        source: a directory (walked recursively) or a .zip / .tar(.gz) archive
+
+    Keys are paths relative to the source, in a stable order; they are what
+    the checkpoint records.
+    """
+    def mime_for(name):
+        return MIME_TYPES.get(os.path.splitext(name)[1].lower())
+
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if mime_for(name):
+                    path = os.path.join(root, name)
+                    with open(path, 'rb') as f:
+                        yield os.path.relpath(path, source), mime_for(name), f.read()
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and mime_for(info.filename):
+                    yield info.filename, mime_for(info.filename), archive.read(info)
+    elif tarfile.is_tarfile(source):
+        with tarfile.open(source) as archive:
+            for member in archive:
+                if member.isfile() and mime_for(member.name):
+                    yield member.name, mime_for(member.name), archive.extractfile(member).read()
+    else:
+        raise ValueError(f"{source} is not a directory, zip or tar archive")
+
+
+# Per-process pipeline state, set by `_init_worker`
+_worker = {}
+
+
+def _init_worker(service, threads):
+    # Spawned (non-fork) workers start with a fresh interpreter
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+    _worker.update(service=service, threads=threads)
+
+
+def _ingest_document(document):
+    """
+    OCR + extract one CV, without touching the database.
+
+    Args:
+        document: (key, mime type, bytes, cached OCR text or None)
+
+    Returns:
+        (key, validated PersonSerializer data, error, text to cache or None)
+    """
+    key, mime_type, data, text = document
+    fresh = None
+    try:
+        service = _worker['service']
+        if text is None:
+            text = fresh = service.extract_text_from_document(io.BytesIO(data), mime_type)
+        parsed = service.parse_resume_text(text)
+        if 'raw_text' in parsed:
+            return key, None, "Model output could not be parsed", fresh
+
+        record = dict(parsed.get('personal_info') or {}, resume_text=text)
+        record.update({name: parsed.get(name) or [] for name in PersonSerializer.CHILDREN})
+        serializer = PersonSerializer(data=record)
+        if not serializer.is_valid():
+            return key, None, f"Invalid CV data: {json.dumps(serializer.errors)}", fresh
+        return key, dict(serializer.validated_data), None, fresh
+    except Exception as e:
+        return key, None, str(e), fresh
+
+
+def _ingest_batch(batch):
+    """Run in a worker process: the batch's documents on the process' thread pool"""
+    with ThreadPoolExecutor(max_workers=_worker['threads']) as executor:
+        return list(executor.map(_ingest_document, batch))
+
+
+class ResumeIngester:
+    """
+    Import a directory or archive of CVs.
+
+    Worker processes do the CPU-bound part (PDF text layers, image
+    preprocessing, normalisation, validation) and their threads wait on the
+    upstream API; only the parent process uses the database. It looks each
+    document up in the OCR cache before sending it to a worker, stores the
+    text workers extract, and writes Person rows. (Workers skip the per-page
+    OCR cache, which a whole-document hit makes unnecessary on re-runs.)
+
+    Settings (overridable per run):
+      - RESUME_INGEST_PROCESSES: worker processes (0 runs in this process)
+      - RESUME_INGEST_THREADS: documents in flight per process
+      - RESUME_INGEST_RATE_LIMIT / RESUME_INGEST_BURST: upstream requests per
+        second across all workers, and the burst allowed on top
+    """
+
+    def __init__(self, processes=None, threads=None, rate_limit=None, batch_size=20, checkpoint_path=None):
+        self.processes = max(0, int(processes if processes is not None else getattr(settings, 'RESUME_INGEST_PROCESSES', 2)))
+        self.threads = max(1, int(threads or getattr(settings, 'RESUME_INGEST_THREADS', 4)))
+        rate_limit = rate_limit or getattr(settings, 'RESUME_INGEST_RATE_LIMIT', 1.0)
+        self.rate_limiter = TokenBucket(rate_limit, getattr(settings, 'RESUME_INGEST_BURST', 5))
+        self.batch_size = max(1, int(batch_size))
+        self.checkpoint = Checkpoint(checkpoint_path)
+        # Built here so a missing API key fails before any worker starts
+        self.service = MistralOCRService()
+        self.service.rate_limiter = self.rate_limiter
+        self.service.cache = None
+
+    def ingest(self, source):
+        """
+        Returns:
+            Summary dict with imported/failed/skipped counts and throughput
+        """
+        started = time.monotonic()
+        imported = 0
+        skipped = 0
+        errors = []
+        digests = {}  # key -> (content hash, size) of documents in flight
+
+        def batches():
+            nonlocal skipped
+            batch = []
+            for key, mime_type, data in iter_documents(source):
+                if key in self.checkpoint:
+                    skipped += 1
+                    continue
+                digest = content_hash(data)
+                digests[key] = (digest, len(data))
+                batch.append((key, mime_type, data, ocr_cache.get(digest)))
+                if len(batch) >= self.batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+        for results in self._run(batches()):
+            records = []
+            for key, record, error, text in results:
+                digest, size = digests.pop(key)
+                if text is not None:
+                    ocr_cache.set(digest, text, file_size=size)
+                if error:
+                    print(f"[Ingest] Failed {key}: {error}")
+                    errors.append({'file': key, 'error': error})
+                else:
+                    records.append((key, record))
+            imported += self._flush(records)
+
+        elapsed = time.monotonic() - started
+        per_minute = imported / elapsed * 60 if elapsed > 0 else 0.0
+        summary = {
+            'imported': imported,
+            'failed': len(errors),
+            'skipped': skipped,
+            'processes': self.processes,
+            'threads': self.threads,
+            'elapsed_seconds': round(elapsed, 3),
+            'documents_per_minute': round(per_minute, 2),
+            'errors': errors,
+        }
+        print(f"[Ingest] {imported} imported, {len(errors)} failed, {skipped} skipped, "
+              f"{summary['documents_per_minute']} documents/min")
+        return summary
+
+    def _run(self, batches):
+        """Yield the results of each batch as it completes"""
+        if not self.processes:
+            _init_worker(self.service, self.threads)
+            for batch in batches:
+                yield _ingest_batch(batch)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.processes, initializer=_init_worker,
+                                 initargs=(self.service, self.threads)) as executor:
+            # Bounded read-ahead so a large archive is never held in memory at once
+            in_flight = set()
+            for batch in batches:
+                # Workers fork on submit (again if one dies) and must not share the
+                # connections the parent opened for cache lookups and inserts
+                connections.close_all()
+                in_flight.add(executor.submit(_ingest_batch, batch))
+                if len(in_flight) >= self.processes * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            for future in in_flight:
+                yield future.result()
+
+    def _flush(self, records):
+        """Upsert a batch of people by email and replace their children, one query per table"""
+        if not records:
+            return 0
+
+        # The same candidate twice in a batch: the last file wins
+        by_email = {record['email']: record for _, record in records}
+        people = [
+            Person(email=email, **{field: record.get(field) for field in PERSON_FIELDS})
+            for email, record in by_email.items()
+        ]
+
+        with transaction.atomic():
+            # updated_at (set on insert) tells other processes' candidate indexes what changed
+            Person.objects.bulk_create(people, update_conflicts=True, unique_fields=['email'],
+                                       update_fields=PERSON_FIELDS + ['updated_at'])
+            ids = {person.email: person.pk for person in Person.objects.filter(email__in=by_email)}
+            for name, model in PersonSerializer.CHILDREN.items():
+                model.objects.filter(person_id__in=ids.values()).delete()
+                model.objects.bulk_create([
+                    model(person_id=ids[email], **item)
+                    for email, record in by_email.items()
+                    for item in record.get(name, [])
+                ])
+
+        self.checkpoint.add_many(key for key, _ in records)
+        return len(records)
@@ -0,0 +1,172 @@
+"""
+Inverted-index top-k retrieval for job recommendations
+The normalised jobs x terms matrix, stored by column, is already an inverted
+index: column t lists the jobs containing term t (sorted) and their weights.
+JobIndex adds each term's largest weight and answers top-k queries with
+MaxScore-style pruning, so long posting lists of low-weight terms are only
+probed for jobs that can still make the top k.
+"""
+
+import numpy as np
+
+
+# Slack on the pruning bounds so float rounding in partial sums can never
+# drop a job that exhaustive scoring would return
+BOUND_EPSILON = 1e-9
+# Pruning has a fixed cost per query term and only pays off once exhaustive
+# scoring is memory-bound: smaller catalogues, and queries touching fewer
+# postings, are scored exhaustively (see benchmarks/bench_job_index.py)
+PRUNING_MIN_JOBS = 500000
+EXHAUSTIVE_POSTINGS = 100000
+# Jobs whose exact scores seed the k-th best floor
+SEED_JOBS = 512
+
+
+def select_top_k(scores, jobs, k, min_score):
+    """
+    The k best of `scores` (for `jobs`) above min_score, best first, ties in
+    catalogue order, without sorting all of them.
+
+    Returns:
+        (jobs, scores)
+    """
+    k = max(0, min(int(k), len(scores)))
+    if k == 0:
+        return jobs[:0], scores[:0]
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.lexsort((jobs[top], -scores[top]))]
+    top = top[scores[top] > min_score]
+    return jobs[top], scores[top]
+
+
+class JobIndex:
+    """
+    Term -> (job, weight) postings over a jobs x terms CSC matrix with sorted
+    indices. Scores are dot products with a sparse query (term ids, weights);
+    weights are non-negative (tf-idf), which the pruning bounds rely on.
+    """
+
+    def __init__(self, job_columns):
+        self.job_columns = job_columns
+        self.n_jobs = job_columns.shape[0]
+        indptr = job_columns.indptr
+        # Largest weight per term: the most one term can add to any job's score
+        self.term_max = np.zeros(job_columns.shape[1])
+        starts = np.flatnonzero(np.diff(indptr))
+        if len(starts):
+            self.term_max[starts] = np.maximum.reduceat(job_columns.data, indptr[starts])
+
+    def postings(self, term):
+        start, end = self.job_columns.indptr[term], self.job_columns.indptr[term + 1]
+        return self.job_columns.indices[start:end], self.job_columns.data[start:end]
+
+    def scores(self, terms, weights):
+        """Exhaustive scores of every job"""
+        return self.job_columns[:, terms] @ weights
+
+    def probe(self, term, jobs, scratch=None):
+        """
+        Weights of `term` in the (sorted) `jobs`, 0 where it doesn't occur.
+        With a zeroed n_jobs `scratch` array, long lookups scatter the postings
+        into it instead of binary searching (the array is zeroed again after).
+        """
+        postings, weights = self.postings(term)
+        found = np.zeros(len(jobs))
+        if len(postings) == 0 or len(jobs) == 0:
+            return found
+        if scratch is not None and len(jobs) * np.log2(len(postings) + 1) > len(postings) + len(jobs):
+            scratch[postings] = weights
+            found = scratch[jobs]
+            scratch[postings] = 0.0
+            return found
+        if len(postings) < len(jobs):
+            # Fewer postings than jobs: look the postings up among the jobs instead
+            position = np.minimum(np.searchsorted(jobs, postings), len(jobs) - 1)
+            hit = jobs[position] == postings
+            found[position[hit]] = weights[hit]
+            return found
+        position = np.minimum(np.searchsorted(postings, jobs), len(postings) - 1)
+        hit = postings[position] == jobs
+        found[hit] = weights[position[hit]]
+        return found
+
+    def exact_scores(self, terms, weights, jobs, scratch=None):
+        """Scores of the (sorted) `jobs`, summed in query term order like the exhaustive product"""
+        scores = np.zeros(len(jobs))
+        for term, weight in zip(terms, weights):
+            scores += self.probe(term, jobs, scratch) * weight
+        return scores
+
+    def top_k(self, terms, weights, k, min_score=0.0):
+        """
+        The k best jobs scoring above min_score; identical to select_top_k
+        over exhaustive scores.
+
+        MaxScore-style: each term's upper bound is its query weight times its
+        largest posting weight.
+        1. Exact scores of a few seed jobs (from the postings of the
+           highest-bound terms) give a floor for the k-th best score.
+        2. Terms are split, in bound order, into essential ones and the rest,
+           whose bounds together stay under that floor; a job containing
+           none of the essential terms can't make the top k.
+        3. The essential terms are scored in one sparse product; the rest
+           (typically long, low-weight posting lists) are only probed for the
+           jobs that can still reach the floor, dropping jobs as the bound
+           left shrinks.
+        4. The survivors' exact scores are summed in query term order.
+
+        Returns:
+            (jobs, scores)
+        """
+        terms, weights, k = np.asarray(terms), np.asarray(weights), int(k)
+        if len(terms) == 0 or k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        lengths = np.diff(self.job_columns.indptr)[terms]
+        if self.n_jobs < PRUNING_MIN_JOBS or lengths.sum() < EXHAUSTIVE_POSTINGS:
+            return select_top_k(self.scores(terms, weights), np.arange(self.n_jobs), k, min_score)
+
+        bounds = weights * self.term_max[terms]
+        order = np.argsort(-bounds, kind='stable')
+        # remaining[i]: the most terms order[i:] can still add to any job
+        remaining = np.append(np.cumsum(bounds[order][::-1])[::-1], 0.0)
+
+        def kth_best(scores):
+            return np.partition(scores, len(scores) - k)[len(scores) - k] if len(scores) >= k else 0.0
+
+        # 1. Floor for the k-th best score from real jobs' exact scores: the
+        #    heaviest postings of the highest-bound terms
+        seeds, budget = [], SEED_JOBS
+        for position in order:
+            jobs, job_weights = self.postings(terms[position])
+            if len(jobs) > budget:
+                jobs = jobs[np.argpartition(-job_weights, budget - 1)[:budget]]
+            seeds.append(jobs)
+            budget -= len(jobs)
+            if budget <= 0:
+                break
+        seeds = np.unique(np.concatenate(seeds))
+        floor = max(kth_best(self.exact_scores(terms, weights, seeds)), min_score)
+
+        # 2. Essential terms: the shortest prefix leaving less than the floor
+        essential = int(np.argmax(remaining + BOUND_EPSILON < floor)) if floor > 0 else len(order)
+        if floor <= 0 or essential >= len(order) - 1:
+            return select_top_k(self.scores(terms, weights), np.arange(self.n_jobs), k, min_score)
+
+        # 3. Essential terms in one product; candidates can still reach the floor
+        essential_terms = np.sort(order[:essential])
+        partial = self.job_columns[:, terms[essential_terms]] @ weights[essential_terms]
+        candidates = np.flatnonzero(partial >= floor - remaining[essential] - BOUND_EPSILON)
+        candidate_scores = partial[candidates]
+        # partial is no longer needed: reuse it, zeroed, for probing
+        scratch = partial
+        scratch.fill(0.0)
+        for step in range(essential, len(order)):
+            # Partial scores are lower bounds too: the k-th best of them raises the floor
+            floor = max(kth_best(candidate_scores), floor)
+            keep = candidate_scores + remaining[step] + BOUND_EPSILON >= floor
+            candidates, candidate_scores = candidates[keep], candidate_scores[keep]
+            position = order[step]
+            candidate_scores = candidate_scores + self.probe(terms[position], candidates, scratch) * weights[position]
+
+        # 4. Exact scores of the survivors
+        return select_top_k(self.exact_scores(terms, weights, candidates, scratch), candidates, k, min_score)
@@ -0,0 +1,171 @@
+"""
+Tolerant JSON extraction for LLM output
+Finds the first JSON object in a chat completion, repairs the defects models
+commonly produce (code fences, surrounding prose, literal newlines/control
+characters inside strings, trailing commas) and validates it against a schema.
+"""
+
+import json
+import re
+
+
+class LLMJSONError(ValueError):
+    """Model output could not be turned into a valid JSON object"""
+
+    def __init__(self, message, raw=''):
+        super().__init__(message)
+        self.raw = raw
+
+
+_FENCE_RE = re.compile(r'```[a-zA-Z]*[ \t]*\n?')
+
+# One token per string literal (matched whole, including any literal newlines)
+# or structural character; everything between tokens is copied through as-is
+_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[{}\[\],]', re.S)
+
+# Control characters are invalid inside JSON strings: escape the common
+# whitespace ones, drop the rest
+_STRING_CONTROL_CHARS = {i: None for i in range(0x20)}
+_STRING_CONTROL_CHARS.update({ord('\n'): '\\n', ord('\r'): '\\r', ord('\t'): '\\t'})
+
+_decoder = json.JSONDecoder()
+
+
+def _object_start(text):
+    """Index of the first '{', looking inside a code fence first if there is one"""
+    fence = _FENCE_RE.search(text)
+    if fence:
+        start = text.find('{', fence.end())
+        if start != -1:
+            return start
+    return text.find('{')
+
+
+def _repair(text, start):
+    """
+    Single scan from `start` to the end of the first balanced object, rebuilding
+    it with string literals escaped and trailing commas dropped.
+    """
+    out = []
+    depth = 0
+    pending_comma = None  # index in `out` of a comma that may turn out to be trailing
+    position = start
+
+    for match in _TOKEN_RE.finditer(text, start):
+        gap = text[position:match.start()]
+        if gap:
+            out.append(gap)
+            if not gap.isspace():
+                pending_comma = None
+        position = match.end()
+
+        token = match.group()
+        if token[0] == '"':
+            out.append(token.translate(_STRING_CONTROL_CHARS))
+            pending_comma = None
+        elif token == ',':
+            pending_comma = len(out)
+            out.append(token)
+        elif token in '{[':
+            depth += 1
+            out.append(token)
+            pending_comma = None
+        else:
+            if pending_comma is not None:
+                out[pending_comma] = ''
+                pending_comma = None
+            depth -= 1
+            out.append(token)
+            if depth == 0:
+                return ''.join(out)
+
+    raise LLMJSONError("Unterminated JSON object (response truncated?)", raw=text)
+
+
+def extract_json(text, schema=None):
+    """
+    Parse the first JSON object in an LLM response.
+
+    Well-formed output is decoded directly; only if that fails is the object
+    rebuilt by `_repair` and decoded again.
+
+    Args:
+        text: raw model output
+        schema: optional JSON-Schema-style dict checked with `validate`
+
+    Returns:
+        The decoded dict
+
+    Raises:
+        LLMJSONError: no object found, unrepairable, or failed validation
+    """
+    text = text or ''
+    start = _object_start(text)
+    if start == -1:
+        raise LLMJSONError("No JSON object found in model output", raw=text)
+
+    try:
+        data, _ = _decoder.raw_decode(text, start)
+    except json.JSONDecodeError:
+        try:
+            data = json.loads(_repair(text, start))
+        except json.JSONDecodeError as e:
+            raise LLMJSONError(f"Malformed JSON in model output: {e}", raw=text)
+
+    if not isinstance(data, dict):
+        raise LLMJSONError("Model output is not a JSON object", raw=text)
+
+    if schema is not None:
+        errors = validate(data, schema)
+        if errors:
+            raise LLMJSONError(f"Model output failed validation: {'; '.join(errors)}", raw=text)
+    return data
+
+
+_TYPE_CHECKS = {
+    'object': lambda v: isinstance(v, dict),
+    'array': lambda v: isinstance(v, list),
+    'string': lambda v: isinstance(v, str),
+    'integer': lambda v: isinstance(v, int) and not isinstance(v, bool),
+    'number': lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    'boolean': lambda v: isinstance(v, bool),
+    'null': lambda v: v is None,
+}
+
+
+def validate(value, schema, path='$'):
+    """
+    Check `value` against a JSON Schema subset: type (name or list of names),
+    properties, required, items, enum and minimum/maximum. Length and item
+    count caps are treated as hints and not enforced.
+
+    Returns:
+        List of error strings (empty when valid)
+    """
+    expected = schema.get('type')
+    if expected:
+        types = expected if isinstance(expected, list) else [expected]
+        if not any(_TYPE_CHECKS[t](value) for t in types):
+            return [f"{path}: expected {' or '.join(types)}, got {type(value).__name__}"]
+
+    if 'enum' in schema and value not in schema['enum']:
+        return [f"{path}: {value!r} not one of {schema['enum']}"]
+
+    if _TYPE_CHECKS['number'](value):
+        if 'minimum' in schema and value < schema['minimum']:
+            return [f"{path}: {value} is below the minimum of {schema['minimum']}"]
+        if 'maximum' in schema and value > schema['maximum']:
+            return [f"{path}: {value} is above the maximum of {schema['maximum']}"]
+
+    errors = []
+    if isinstance(value, dict):
+        for name in schema.get('required', []):
+            if name not in value:
+                errors.append(f"{path}: missing required field '{name}'")
+        for name, subschema in schema.get('properties', {}).items():
+            if name in value:
+                errors.extend(validate(value[name], subschema, f"{path}.{name}"))
+    elif isinstance(value, list) and 'items' in schema:
+        for index, item in enumerate(value):
+            errors.extend(validate(item, schema['items'], f"{path}[{index}]"))
+    return errors
@@ -0,0 +1,213 @@
+"""
+Declarative output contracts for LLM calls
+One definition per structured response generates the compact shape shown to
+the model, the `response_format` JSON schema, the validation schema used by
+`extract_json`, and a `max_tokens` budget derived from the per-field caps.
+"""
+
+import copy
+import math
+from abc import ABC, abstractmethod
+
+
+# Conservative characters-per-token for JSON output (short keys, punctuation)
+CHARS_PER_TOKEN = 3.0
+# Headroom on top of the capped output size before the response is cut off
+TOKEN_MARGIN = 1.15
+
+
+class Field(ABC):
+    json_type = None
+
+    def __init__(self, description='', required=None, nullable=False):
+        self.description = description
+        # Nullable fields may also be left out
+        self.required = (not nullable) if required is None else required
+        self.nullable = nullable
+
+    def schema(self):
+        return {'type': [self.json_type, 'null'] if self.nullable else self.json_type}
+
+    def hint(self):
+        return self.json_type + ('|null' if self.nullable else '')
+
+    @abstractmethod
+    def max_chars(self):
+        """Longest serialised value the schema allows, which sizes max_tokens"""
+
+
+class String(Field):
+    json_type = 'string'
+
+    def __init__(self, max_length=100, enum=None, **kwargs):
+        super().__init__(**kwargs)
+        self.max_length = max_length
+        self.enum = enum
+
+    def schema(self):
+        schema = super().schema()
+        if self.enum:
+            schema['enum'] = list(self.enum) + ([None] if self.nullable else [])
+        else:
+            schema['maxLength'] = self.max_length
+        return schema
+
+    def hint(self):
+        if self.enum:
+            return '|'.join(f'"{value}"' for value in self.enum)
+        return f'{super().hint()} ≤{self.max_length}'
+
+    def max_chars(self):
+        longest = max(map(len, self.enum)) if self.enum else self.max_length
+        return longest + 2  # quotes
+
+
+class Integer(Field):
+    json_type = 'integer'
+
+    def __init__(self, minimum=None, maximum=None, **kwargs):
+        super().__init__(**kwargs)
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def schema(self):
+        schema = super().schema()
+        if self.minimum is not None:
+            schema['minimum'] = self.minimum
+        if self.maximum is not None:
+            schema['maximum'] = self.maximum
+        return schema
+
+    def hint(self):
+        if self.minimum is not None and self.maximum is not None:
+            return f'int {self.minimum}-{self.maximum}'
+        return 'int'
+
+    def max_chars(self):
+        return len(str(self.maximum)) if self.maximum is not None else 10
+
+
+class Array(Field):
+    json_type = 'array'
+
+    def __init__(self, items, max_items, min_items=0, **kwargs):
+        super().__init__(**kwargs)
+        self.items = items
+        self.min_items = min_items
+        self.max_items = max_items
+
+    def schema(self):
+        schema = super().schema()
+        schema['items'] = self.items.schema()
+        schema['maxItems'] = self.max_items
+        if self.min_items:
+            schema['minItems'] = self.min_items
+        return schema
+
+    def count_hint(self):
+        if self.min_items:
+            return f'{self.min_items}-{self.max_items} items'
+        return f'≤{self.max_items} items'
+
+    def hint(self):
+        return f'[{self.items.hint()}] ({self.count_hint()})'
+
+    def max_chars(self):
+        return self.max_items * (self.items.max_chars() + 2) + 2
+
+
+class Object(Field):
+    json_type = 'object'
+
+    def __init__(self, fields, **kwargs):
+        super().__init__(**kwargs)
+        self.fields = fields
+
+    def schema(self):
+        schema = super().schema()
+        schema['properties'] = {name: field.schema() for name, field in self.fields.items()}
+        schema['required'] = [name for name, field in self.fields.items() if field.required]
+        schema['additionalProperties'] = False
+        return schema
+
+    def hint(self):
+        return '{' + ', '.join(f'"{name}": {field.hint()}' for name, field in self.fields.items()) + '}'
+
+    def max_chars(self):
+        return 2 + sum(len(name) + 4 + field.max_chars() for name, field in self.fields.items())
+
+
+class OutputSchema:
+    """
+    Contract for one structured LLM response.
+
+    Args:
+        name: schema name sent in response_format
+        fields: {name: Field} for the top-level object
+    """
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.root = Object(fields)
+
+    def json_schema(self):
+        """JSON schema of the response; also what `extract_json` validates against"""
+        return self.root.schema()
+
+    def response_format(self):
+        """Mistral chat `response_format` constraining output to this schema"""
+        return {
+            'type': 'json_schema',
+            'json_schema': {'name': self.name, 'schema': self.json_schema(), 'strict': True},
+        }
+
+    def without(self, *paths):
+        """
+        Copy of this schema minus some fields, for calls where part of the
+        answer is already known. Paths are dotted field names; fields of an
+        array's items are addressed through the array ("education.start_date").
+        """
+        return OutputSchema(self.name, _omit(self.root, [path.split('.') for path in paths]).fields)
+
+    def max_tokens(self):
+        """Output token budget: the largest response the field caps allow, plus margin"""
+        return math.ceil(self.root.max_chars() / CHARS_PER_TOKEN * TOKEN_MARGIN)
+
+    def prompt(self):
+        """
+        Compact description of the expected JSON: one line per field with its
+        type, caps and (optional) description, instead of a full example object.
+        """
+        return '\n'.join(['{', *self._lines(self.root, '  '), '}', '(≤N after string = max characters)'])
+
+    def _lines(self, obj, indent):
+        lines = []
+        for name, field in obj.fields.items():
+            comment = f'  // {field.description}' if field.description else ''
+            if isinstance(field, Object):
+                lines.append(f'{indent}"{name}": {{{comment}')
+                lines.extend(self._lines(field, indent + '  '))
+                lines.append(f'{indent}}}')
+            elif isinstance(field, Array) and isinstance(field.items, Object):
+                lines.append(f'{indent}"{name}": [{field.items.hint()}] ({field.count_hint()}){comment}')
+            else:
+                lines.append(f'{indent}"{name}": {field.hint()}{comment}')
+        return lines
+
+
+def _omit(field, paths):
+    """Copy of `field` without the fields at `paths` (lists of names)"""
+    if isinstance(field, Array):
+        trimmed = copy.copy(field)
+        trimmed.items = _omit(field.items, paths)
+        return trimmed
+    if isinstance(field, Object):
+        trimmed = copy.copy(field)
+        trimmed.fields = {}
+        for name, child in field.fields.items():
+            if [name] in paths:
+                continue
+            nested = [path[1:] for path in paths if len(path) > 1 and path[0] == name]
+            trimmed.fields[name] = _omit(child, nested) if nested else child
+        return trimmed
+    return field
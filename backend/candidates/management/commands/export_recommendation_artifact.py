@@ -0,0 +1,29 @@
+import os
+import pickle
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from candidates.model_artifact import export_artifact
+
+
+class Command(BaseCommand):
+    help = "Convert final_model.pkl into a memory-mappable recommendation artifact and make it the CURRENT version."
+
+    def add_arguments(self, parser):
+        dataset = os.path.join(settings.BASE_DIR.parent, 'dataset')
+        parser.add_argument('--model', default=os.path.join(dataset, 'final_model.pkl'), help="Pickled model to convert.")
+        parser.add_argument('--output', help="Artifacts directory (default RECOMMENDATION_ARTIFACT_DIR or dataset/artifacts).")
+        parser.add_argument('--artifact-version', help="Version name (default: current timestamp).")
+
+    def handle(self, *args, **options):
+        output = options['output'] or settings.RECOMMENDATION_ARTIFACT_DIR or \
+            os.path.join(settings.BASE_DIR.parent, 'dataset', 'artifacts')
+        try:
+            with open(options['model'], 'rb') as f:
+                model = pickle.load(f)
+            path = export_artifact(model, output, version=options['artifact_version'])
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(str(e))
+
+        size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+        self.stdout.write(self.style.SUCCESS(f"Exported {path} ({size / (1024 * 1024):.2f} MB)"))
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:14
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0003_ocrcacheentry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('extract', 'Extract'), ('analyze', 'Analyze'), ('full', 'Full')], default='full', max_length=20)),
+                ('stage', models.CharField(choices=[('received', 'Received'), ('text_extracted', 'Text extracted'), ('parsed', 'Parsed'), ('analysed', 'Analysed'), ('completed', 'Completed'), ('failed', 'Failed')], default='received', max_length=20)),
+                ('file', models.FileField(blank=True, null=True, upload_to='resume_jobs/')),
+                ('file_name', models.TextField()),
+                ('mime_type', models.CharField(max_length=100)),
+                ('extracted_text', models.TextField(blank=True, default='')),
+                ('result', models.JSONField(default=dict)),
+                ('error', models.TextField(blank=True, default='')),
+                ('events', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='resume_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['stage'], name='candidates__stage_898dd7_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0004_resumejob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='person',
+            name='resume_text',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='person',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,288 @@
+"""
+Memory-mappable recommendation model artifact
+Replaces final_model.pkl with a versioned directory of .npy arrays that every
+worker process opens with np.load(mmap_mode='r'), so the job matrix, job
+metadata and forest share one copy in the page cache instead of one
+unpickled copy per worker.
+
+Layout (<artifacts dir>/<version>/):
+    manifest.json                   format, version, shapes, vectorizer params, metadata
+    jobs_by_term.{data,indices,indptr}.npy
+                                    L2-normalised job matrix, term-major CSR (vocabulary x jobs)
+    <vectorizer>.terms.npy / .idf.npy
+                                    vocabulary in column order and idf weights
+    jobs.<field>.{bytes,offsets,missing}.npy
+                                    job metadata, one UTF-8 string column per field
+    forest.<array>.npy              RandomForest trees flattened into node arrays
+<artifacts dir>/CURRENT names the version services load.
+
+No Django imports: dataset/main.py uses this module to export after training.
+"""
+
+import json
+import math
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import LabelEncoder, normalize
+
+
+FORMAT_VERSION = 1
+CURRENT_FILE = 'CURRENT'
+VECTORIZERS = ('tfidf_skills', 'tfidf_responsibilities')
+# Served field -> job_profiles column (the title column may carry a BOM)
+JOB_COLUMNS = {
+    'job_title': ('job_position_name', '﻿job_position_name'),
+    'required_skills': ('skills_required_cleaned',),
+    'responsibilities': ('responsibilities',),
+    'education_required': ('educationaL_requirements',),
+    'experience_required': ('experiencere_requirement',),
+}
+FOREST_ARRAYS = ('roots', 'children_left', 'children_right', 'feature', 'threshold', 'proba')
+
+
+class StringColumn:
+    """Read-only sequence of optional strings stored as one UTF-8 blob plus offsets"""
+
+    def __init__(self, blob, offsets, missing):
+        self._blob = blob
+        self._offsets = offsets
+        self._missing = missing
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if self._missing[index]:
+            return None
+        return bytes(self._blob[self._offsets[index]:self._offsets[index + 1]]).decode('utf-8')
+
+    def tolist(self):
+        return [self[i] for i in range(len(self))]
+
+
+class FlattenedForest:
+    """
+    RandomForestClassifier prediction over flattened node arrays.
+
+    All trees share one set of arrays (node ids are global; roots holds each
+    tree's first node). Matches sklearn: features are compared as float32 and
+    the class probabilities are the mean of the leaf distributions.
+    """
+
+    def __init__(self, roots, children_left, children_right, feature, threshold, proba, classes, n_features):
+        self.roots = roots
+        self.children_left = children_left
+        self.children_right = children_right
+        self.feature = feature
+        self.threshold = threshold
+        self.proba = proba
+        self.classes_ = classes
+        self.n_features_in_ = n_features
+        self.n_estimators = len(roots)
+
+    def _leaves(self, x):
+        nodes = np.array(self.roots, dtype=np.int64)
+        while True:
+            left = self.children_left[nodes]
+            inner = left != -1
+            if not inner.any():
+                return nodes
+            go_left = x[self.feature[nodes[inner]]] <= self.threshold[nodes[inner]]
+            nodes[inner] = np.where(go_left, left[inner], self.children_right[nodes[inner]])
+
+    def predict_proba(self, X):
+        X = X.toarray() if hasattr(X, 'toarray') else np.asarray(X)
+        X = X.astype(np.float32)
+        return np.array([self.proba[self._leaves(row)].mean(axis=0) for row in X])
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def _flatten_forest(forest):
+    """Node arrays of every tree, concatenated, with leaf counts normalised to probabilities"""
+    arrays = {name: [] for name in FOREST_ARRAYS}
+    offset = 0
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        arrays['roots'].append([offset])
+        for name in ('children_left', 'children_right'):
+            children = getattr(tree, name).astype(np.int64)
+            arrays[name].append(np.where(children == -1, -1, children + offset))
+        arrays['feature'].append(tree.feature.astype(np.int64))
+        arrays['threshold'].append(tree.threshold.astype(np.float64))
+        value = tree.value[:, 0, :].astype(np.float64)
+        totals = value.sum(axis=1, keepdims=True)
+        arrays['proba'].append(np.divide(value, totals, out=np.zeros_like(value), where=totals > 0))
+        offset += tree.node_count
+    return {name: np.concatenate(parts) for name, parts in arrays.items()}
+
+
+def _vectorizer_params(vectorizer):
+    params = {}
+    for name, value in vectorizer.get_params().items():
+        if name == 'dtype':
+            value = np.dtype(value).name
+        elif name == 'ngram_range':
+            value = list(value)
+        elif callable(value):
+            raise ValueError(f"Vectorizer parameter '{name}' is a callable and can't be exported")
+        params[name] = value
+    params.pop('vocabulary', None)
+    return params
+
+
+def _vectorizer(params, terms, idf):
+    params = dict(params, ngram_range=tuple(params['ngram_range']), dtype=np.dtype(params['dtype']))
+    vectorizer = TfidfVectorizer(**params)
+    vectorizer.vocabulary_ = {str(term): index for index, term in enumerate(terms)}
+    vectorizer.idf_ = np.asarray(idf)
+    return vectorizer
+
+
+def _string_column(values):
+    missing = np.array([value is None or (isinstance(value, float) and math.isnan(value)) for value in values],
+                       dtype=bool)
+    encoded = [b'' if gap else str(value).encode('utf-8') for value, gap in zip(values, missing)]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets, missing
+
+
+def export_artifact(model, directory, version=None):
+    """
+    Write a pickle-shaped model dict (as built by dataset/main.py) as a new
+    artifact version under `directory` and make it CURRENT.
+
+    Returns:
+        Path of the version directory
+    """
+    version = version or time.strftime('%Y%m%d%H%M%S')
+    os.makedirs(directory, exist_ok=True)
+    target = os.path.join(directory, version)
+    if os.path.exists(target):
+        raise ValueError(f"Artifact version {version} already exists")
+
+    staging = tempfile.mkdtemp(prefix=f'.{version}-', dir=directory)
+    try:
+        def save(name, array):
+            np.save(os.path.join(staging, f'{name}.npy'), np.ascontiguousarray(array))
+
+        jobs_by_term = normalize(csr_matrix(model['job_skills_matrix']), norm='l2').T.tocsr()
+        jobs_by_term.sort_indices()
+        for part in ('data', 'indices', 'indptr'):
+            save(f'jobs_by_term.{part}', getattr(jobs_by_term, part))
+
+        vectorizers = {}
+        for name in VECTORIZERS:
+            if model.get(name) is None:
+                continue
+            save(f'{name}.terms', model[name].get_feature_names_out().astype(str))
+            save(f'{name}.idf', model[name].idf_)
+            vectorizers[name] = _vectorizer_params(model[name])
+
+        job_profiles = model['job_profiles']
+        for field, columns in JOB_COLUMNS.items():
+            column = next((c for c in columns if c in job_profiles), None)
+            values = job_profiles[column].tolist() if column else [None] * len(job_profiles)
+            for part, array in zip(('bytes', 'offsets', 'missing'), _string_column(values)):
+                save(f'jobs.{field}.{part}', array)
+
+        forest = None
+        if model.get('model') is not None:
+            for name, array in _flatten_forest(model['model']).items():
+                save(f'forest.{name}', array)
+            forest = {'classes': model['model'].classes_.tolist(), 'n_features': int(model['model'].n_features_in_)}
+
+        encoder = model.get('label_encoder')
+        manifest = {
+            'format': FORMAT_VERSION,
+            'version': version,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'jobs': int(jobs_by_term.shape[1]),
+            'vocabulary': int(jobs_by_term.shape[0]),
+            'vectorizers': vectorizers,
+            'forest': forest,
+            'label_classes': encoder.classes_.tolist() if encoder is not None else None,
+            'metadata': model.get('metadata', {}),
+        }
+        with open(os.path.join(staging, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, default=str)
+
+        os.rename(staging, target)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    set_current_version(directory, version)
+    return target
+
+
+def set_current_version(directory, version):
+    """Point CURRENT at `version` (atomic replace)"""
+    pointer = os.path.join(directory, CURRENT_FILE)
+    with open(f'{pointer}.tmp', 'w', encoding='utf-8') as f:
+        f.write(version + '\n')
+    os.replace(f'{pointer}.tmp', pointer)
+
+
+def current_version(directory):
+    """Version named by CURRENT, or None when there is no artifact"""
+    try:
+        with open(os.path.join(directory, CURRENT_FILE), encoding='utf-8') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def load_artifact(path, mmap_mode='r'):
+    """
+    Open an artifact version directory.
+
+    Returns:
+        Model dict with the keys RecommendationService reads: tfidf_skills,
+        tfidf_responsibilities, model (FlattenedForest), label_encoder,
+        jobs_by_term, job_fields, skills_terms, metadata, version
+    """
+    with open(os.path.join(path, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format {manifest.get('format')} in {path}")
+
+    def load(name):
+        return np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode)
+
+    model = {
+        'version': manifest['version'],
+        'metadata': manifest.get('metadata', {}),
+        'jobs_by_term': csr_matrix(
+            (load('jobs_by_term.data'), load('jobs_by_term.indices'), load('jobs_by_term.indptr')),
+            shape=(manifest['vocabulary'], manifest['jobs']), copy=False),
+        'job_fields': {
+            field: StringColumn(load(f'jobs.{field}.bytes'), load(f'jobs.{field}.offsets'), load(f'jobs.{field}.missing'))
+            for field in JOB_COLUMNS
+        },
+    }
+    for name, params in manifest['vectorizers'].items():
+        terms = load(f'{name}.terms')
+        model[name] = _vectorizer(params, terms, load(f'{name}.idf'))
+        if name == 'tfidf_skills':
+            model['skills_terms'] = terms
+
+    if manifest.get('forest'):
+        model['model'] = FlattenedForest(
+            *(load(f'forest.{name}') for name in FOREST_ARRAYS),
+            classes=np.array(manifest['forest']['classes']),
+            n_features=manifest['forest']['n_features'],
+        )
+    if manifest.get('label_classes') is not None:
+        encoder = LabelEncoder()
+        encoder.classes_ = np.array(manifest['label_classes'])
+        model['label_encoder'] = encoder
+    return model
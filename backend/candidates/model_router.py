@@ -0,0 +1,107 @@
+"""
+Model routing for resume LLM calls
+Picks the Mistral model tier for each call from the task, the size of the
+(normalised) resume text and recent upstream latency, using ordered rules
+from settings, and keeps per-tier serving and latency statistics.
+"""
+
+import threading
+import time
+from collections import Counter
+from django.conf import settings
+
+from .text_normalise import estimate_tokens
+
+
+# Weight of the newest sample in the per-tier latency moving average
+LATENCY_EWMA_ALPHA = 0.3
+
+
+class ModelRouter:
+    """
+    Rule-based model tier selection.
+
+    Settings:
+      - LLM_MODEL_TIERS: {tier: model name}, ordered from smallest to largest;
+        a failed validation escalates to the next tier
+      - LLM_ROUTING_RULES: ordered list of rules; the first that matches wins.
+        A rule is a dict with `tier` and optional conditions:
+          task              'extraction' / 'analysis' (omit for any task)
+          max_input_tokens  only for texts up to this many tokens
+          max_latency       only while the tier's recent latency (seconds) is below this
+      - LLM_ESCALATE_ON_INVALID: retry on the next tier when output fails validation
+      - LLM_LATENCY_TTL_SECONDS: a tier's latency expires this long after its
+        last sample. A tier skipped by max_latency gets no new samples, so
+        without expiry it would never be routed to again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = {}
+        self._sampled_at = {}
+        self.served = Counter()
+        self.escalations = Counter()
+
+    @property
+    def tiers(self):
+        return getattr(settings, 'LLM_MODEL_TIERS', {'large': 'mistral-large-latest'})
+
+    def route(self, task, text):
+        """Return the tier for `task` on `text`"""
+        tokens = estimate_tokens(text or '')
+        for rule in getattr(settings, 'LLM_ROUTING_RULES', []):
+            if rule.get('task') not in (None, task):
+                continue
+            if 'max_input_tokens' in rule and tokens > rule['max_input_tokens']:
+                continue
+            if 'max_latency' in rule and self.recent_latency(rule['tier']) > rule['max_latency']:
+                continue
+            return rule['tier']
+        return list(self.tiers)[-1]
+
+    def recent_latency(self, tier):
+        """Moving-average latency of `tier` in seconds; 0 if unmeasured or expired"""
+        with self._lock:
+            if self._expired(tier):
+                return 0
+            return self.latency.get(tier, 0)
+
+    def _expired(self, tier):
+        ttl = getattr(settings, 'LLM_LATENCY_TTL_SECONDS', 300)
+        sampled_at = self._sampled_at.get(tier)
+        return sampled_at is not None and time.monotonic() - sampled_at > ttl
+
+    def model(self, tier):
+        return self.tiers[tier]
+
+    def escalation_tier(self, tier):
+        """Next larger tier, or None if `tier` is the largest or escalation is off"""
+        if not getattr(settings, 'LLM_ESCALATE_ON_INVALID', True):
+            return None
+        names = list(self.tiers)
+        position = names.index(tier)
+        return names[position + 1] if position + 1 < len(names) else None
+
+    def record(self, task, tier, seconds, escalated=False):
+        """Record that `tier` served a `task` call taking `seconds`"""
+        with self._lock:
+            previous = None if self._expired(tier) else self.latency.get(tier)
+            self.latency[tier] = seconds if previous is None else (
+                LATENCY_EWMA_ALPHA * seconds + (1 - LATENCY_EWMA_ALPHA) * previous
+            )
+            self._sampled_at[tier] = time.monotonic()
+            self.served[f'{task}:{tier}'] += 1
+            if escalated:
+                self.escalations[task] += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'served': dict(self.served),
+                'escalations': dict(self.escalations),
+                'latency_seconds': {tier: round(value, 3) for tier, value in self.latency.items()},
+            }
+
+
+# Singleton instance
+model_router = ModelRouter()
@@ -9,7 +9,9 @@ class Person(models.Model):
     linkedin_url = models.URLField(max_length=500, blank=True, null=True)
     github_url = models.URLField(max_length=500, blank=True, null=True)
     portfolio_url = models.URLField(max_length=500, blank=True, null=True)
+    resume_text = models.TextField(blank=True, default='')  # extracted CV text, indexed for candidate matching
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)  # candidate index sync watermark
 
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.email})"
@@ -76,3 +78,90 @@ class ResumeReport(models.Model):
             models.Index(fields=['user', 'created_at']),
             models.Index(fields=['ats_score']),
         ]
+
+
+class OCRCacheEntry(models.Model):
+    """
+    OCR output cached by the SHA-256 of the uploaded file, so identical uploads skip OCR.
+    """
+    content_hash = models.CharField(max_length=64, unique=True)
+    text = models.TextField()
+    file_size = models.IntegerField(default=0)  # bytes of the original upload
+    hits = models.IntegerField(default=0)
+
+    # Metadata
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"OCR cache {self.content_hash[:12]} ({self.hits} hits)"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['last_used_at']),
+        ]
+
+
+class ResumeJob(models.Model):
+    """
+    Background resume processing job (upload -> OCR -> LLM), persisted so
+    progress survives restarts and can be polled by the client (the status
+    endpoint sends Retry-After until the job finishes).
+    """
+    STAGE_RECEIVED = 'received'
+    STAGE_TEXT_EXTRACTED = 'text_extracted'
+    STAGE_PARSED = 'parsed'
+    STAGE_ANALYSED = 'analysed'
+    STAGE_COMPLETED = 'completed'
+    STAGE_FAILED = 'failed'
+    STAGE_CHOICES = [
+        (STAGE_RECEIVED, 'Received'),
+        (STAGE_TEXT_EXTRACTED, 'Text extracted'),
+        (STAGE_PARSED, 'Parsed'),
+        (STAGE_ANALYSED, 'Analysed'),
+        (STAGE_COMPLETED, 'Completed'),
+        (STAGE_FAILED, 'Failed'),
+    ]
+    TERMINAL_STAGES = (STAGE_COMPLETED, STAGE_FAILED)
+
+    KIND_EXTRACT = 'extract'  # structured data only (OCRExtractView)
+    KIND_ANALYZE = 'analyze'  # quality analysis only (ResumeAnalysisView)
+    KIND_FULL = 'full'        # both (ResumePipelineView)
+    KIND_CHOICES = [
+        (KIND_EXTRACT, 'Extract'),
+        (KIND_ANALYZE, 'Analyze'),
+        (KIND_FULL, 'Full'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey('accounts.CustomUser', on_delete=models.SET_NULL, null=True, blank=True, related_name='resume_jobs')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default=KIND_FULL)
+    stage = models.CharField(max_length=20, choices=STAGE_CHOICES, default=STAGE_RECEIVED)
+
+    # Upload (kept until the job finishes so an interrupted job can be re-run)
+    file = models.FileField(upload_to='resume_jobs/', blank=True, null=True)
+    file_name = models.TextField()
+    mime_type = models.CharField(max_length=100)
+
+    # Progress and output
+    extracted_text = models.TextField(blank=True, default='')
+    result = models.JSONField(default=dict)  # {"text": structured data, "analysis": analysis data}
+    error = models.TextField(blank=True, default='')
+    events = models.JSONField(default=list)  # [{"stage": ..., "at": ISO timestamp}]
+
+    # Metadata
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Resume job {self.id} ({self.kind}, {self.stage})"
+
+    @property
+    def is_finished(self):
+        return self.stage in self.TERMINAL_STAGES
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['stage']),
+        ]
@@ -0,0 +1,117 @@
+"""
+Content-addressed OCR cache
+Stores OCR output keyed by the SHA-256 of the uploaded file so identical
+uploads never hit the Mistral OCR API twice.
+"""
+
+import hashlib
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from .models import OCRCacheEntry
+
+
+def content_hash(data):
+    """SHA-256 hex digest of the raw file bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class OCRCache:
+    """
+    Persistent OCR cache with TTL and size-based (least recently used) eviction.
+
+    Settings:
+      - OCR_CACHE_ENABLED: turn the cache off entirely
+      - OCR_CACHE_TTL_SECONDS: entries older than this (since last use) are discarded
+      - OCR_CACHE_MAX_ENTRIES: least recently used entries beyond this are pruned
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return getattr(settings, 'OCR_CACHE_ENABLED', True)
+
+    @property
+    def ttl(self):
+        return timedelta(seconds=getattr(settings, 'OCR_CACHE_TTL_SECONDS', 30 * 24 * 3600))
+
+    @property
+    def max_entries(self):
+        return getattr(settings, 'OCR_CACHE_MAX_ENTRIES', 5000)
+
+    def get(self, digest):
+        """
+        Return cached text for `digest`, or None on a miss / expired entry.
+        """
+        if not self.enabled:
+            return None
+
+        entry = OCRCacheEntry.objects.filter(content_hash=digest).only('text', 'last_used_at').first()
+        now = timezone.now()
+        if entry and entry.last_used_at < now - self.ttl:
+            entry.delete()
+            entry = None
+
+        if entry is None:
+            self._record(hit=False)
+            return None
+
+        OCRCacheEntry.objects.filter(pk=entry.pk).update(hits=F('hits') + 1, last_used_at=now)
+        self._record(hit=True)
+        return entry.text
+
+    def set(self, digest, text, file_size=0):
+        """Store OCR output for `digest` and evict beyond the size cap"""
+        if not self.enabled:
+            return
+
+        OCRCacheEntry.objects.update_or_create(
+            content_hash=digest,
+            defaults={'text': text, 'file_size': file_size, 'last_used_at': timezone.now()},
+        )
+        self.prune()
+
+    def prune(self):
+        """Drop expired entries, then the least recently used ones beyond OCR_CACHE_MAX_ENTRIES"""
+        OCRCacheEntry.objects.filter(last_used_at__lt=timezone.now() - self.ttl).delete()
+
+        overflow = OCRCacheEntry.objects.count() - self.max_entries
+        if overflow > 0:
+            stale = OCRCacheEntry.objects.order_by('last_used_at').values_list('pk', flat=True)[:overflow]
+            OCRCacheEntry.objects.filter(pk__in=list(stale)).delete()
+
+    def stats(self):
+        """
+        Cache metrics: per-process hit/miss counters since start, plus the
+        lifetime hit total and entry count stored in the table.
+        """
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        totals = OCRCacheEntry.objects.aggregate(entries=Count('pk'), lifetime_hits=Sum('hits'))
+        return {
+            'enabled': self.enabled,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            'entries': totals['entries'],
+            'lifetime_hits': totals['lifetime_hits'] or 0,
+        }
+
+    def _record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+# Singleton instance
+ocr_cache = OCRCache()
@@ -1,130 +1,197 @@
 import os
 import base64
+import hashlib
 import json
-import re
 import requests
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from django.conf import settings
+from .ocr_cache import ocr_cache, content_hash
+from .pdf_text import HAS_PYPDF, open_pdf, extract_page_text, pages_to_pdf
+from .image_preprocess import preprocess_upload
+from .llm_json import extract_json, LLMJSONError
+from .llm_schema import OutputSchema, Object, Array, String, Integer
+from .text_normalise import normalise_resume_pages
+from .model_router import model_router
+from .skill_matcher import get_skill_matcher
+from .contact_extractor import find_contact_fields, find_education_dates, assign_education_dates
 
 
-RESUME_EXTRACTION_PROMPT = """
-Analyze the given OCR-extracted CV text and extract structured information.
-
-RETURN ONLY A VALID JSON OBJECT. NO MARKDOWN, NO CODE BLOCKS, NO EXTRA TEXT.
-
-The JSON structure must be exactly as follows:
-{
-    "personal_info": {
-        "first_name": "string",
-        "last_name": "string",
-        "email": "string",
-        "phone": "string",
-        "linkedin_url": "string",
-        "github_url": "string",
-        "portfolio_url": "string"
-    },
-    "education": [
-        {
-            "degree": "string",
-            "institution": "string",
-            "start_date": "string",
-            "end_date": "string",
-            "gpa": "string"
-        }
-    ],
-    "skills": [
-        {
-            "name": "string",
-            "category": "string"
-        }
-    ],
-    "achievements": [
-        {
-            "title": "string",
-            "description": "string",
-            "date": "string"
-        }
-    ]
-}
+# Read size for uploads; a multiple of 3 so each chunk base64-encodes without padding
+READ_CHUNK_SIZE = 3 * 64 * 1024
+
+
+def iter_document_chunks(document, chunk_size=READ_CHUNK_SIZE):
+    """
+    Yield the raw bytes of `document` in chunks.
+
+    Args:
+        document: an uploaded file object (anything with .read()) or a filesystem path
+    """
+    if isinstance(document, (str, os.PathLike)):
+        with open(document, 'rb') as file:
+            while True:
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        return
+
+    if hasattr(document, 'seek'):
+        document.seek(0)
+    while True:
+        chunk = document.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def encode_document(document, encode=True):
+    """
+    Single pass over the upload: SHA-256 it and base64-encode it chunk by chunk.
+
+    Returns:
+        (hex digest, size in bytes, list of base64 byte chunks or None if encode=False)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    encoded_parts = []
+    carry = b''
+    for chunk in iter_document_chunks(document):
+        digest.update(chunk)
+        size += len(chunk)
+        if not encode:
+            continue
+        if carry:
+            chunk = carry + chunk
+        cut = len(chunk) - len(chunk) % 3
+        encoded_parts.append(base64.b64encode(chunk[:cut]))
+        carry = chunk[cut:]
+    if carry:
+        encoded_parts.append(base64.b64encode(carry))
+    return digest.hexdigest(), size, encoded_parts if encode else None
+
+
+def build_ocr_body(mime_type, encoded_parts, model="mistral-ocr-latest"):
+    """
+    Serialise the OCR request body around the base64 chunks.
+
+    Equivalent to json.dumps() of the usual payload, but the document is joined
+    straight into the body (base64 needs no JSON escaping) instead of first
+    building a data-URL string and then a second serialised copy of it.
+    """
+    head = json.dumps({"model": model, "document": {"type": "document_url"}})[:-2]
+    data_url_prefix = json.dumps(f"data:{mime_type};base64,")[:-1]
+    return b''.join([
+        f'{head}, "document_url": {data_url_prefix}'.encode('utf-8'),
+        *encoded_parts,
+        b'"}}',
+    ])
+
+
+def _nullable_string(max_length, description=''):
+    return String(max_length=max_length, nullable=True, description=description)
+
+
+RESUME_EXTRACTION_OUTPUT = OutputSchema('resume_extraction', {
+    "personal_info": Object({
+        "first_name": _nullable_string(60),
+        "last_name": _nullable_string(60),
+        "email": _nullable_string(120),
+        "phone": _nullable_string(40),
+        "linkedin_url": _nullable_string(200),
+        "github_url": _nullable_string(200),
+        "portfolio_url": _nullable_string(200),
+    }),
+    "education": Array(Object({
+        "degree": _nullable_string(120),
+        "institution": _nullable_string(120),
+        "start_date": _nullable_string(20, "year or month/year"),
+        "end_date": _nullable_string(20),
+        "gpa": _nullable_string(20),
+    }), max_items=8),
+    "skills": Array(Object({
+        "name": String(max_length=60),
+        "category": _nullable_string(40, "e.g. Language, Framework, Tool"),
+    }), max_items=40),
+    "achievements": Array(Object({
+        "title": String(max_length=120),
+        "description": _nullable_string(250),
+        "date": _nullable_string(20),
+    }), max_items=10),
+})
+
+
+def _extraction_prompt(output):
+    return f"""
+Extract structured information from the OCR-extracted CV text.
+
+Return ONLY a JSON object of this shape:
+{output.prompt()}
 
 RULES:
-- Extract ONLY information present in the text.
-- Split full name into first_name and last_name.
-- If a field is missing, use null or empty string.
-- For Education dates, try to extract Year or Month/Year.
-- Categorize skills if possible (e.g. "Language", "Tool").
+- Extract ONLY information present in the text; use null when a field is missing.
+- Split the full name into first_name and last_name.
+- Categorize skills if possible.
 """
 
 
-RESUME_ANALYSIS_PROMPT = """
-You are an expert resume analyst and career coach. Analyze the provided resume text and provide a comprehensive analysis.
-
-CRITICAL: RETURN ONLY VALID JSON. NO MARKDOWN CODE BLOCKS. NO EXTRA TEXT.
-
-When including newlines in string values (e.g., in improved_bullet_example), use escaped newlines (\\n) not literal newlines.
-
-The JSON structure MUST be exactly as follows:
-{
-    "overall_score": 85,
-    "ats_score": 78,
-    "strengths": [
-        "Strong technical skills in multiple programming languages",
-        "Clear demonstration of project impact with metrics",
-        "Relevant industry certifications"
-    ],
-    "weaknesses": [
-        "Missing quantifiable achievements in some roles",
-        "Limited leadership experience mentioned",
-        "Skills section could be better organized"
-    ],
-    "analytics": {
-        "keyword_density": "Good - includes relevant industry keywords and technical terms",
-        "experience_depth": "Strong - demonstrates 5+ years of progressive experience",
-        "skills_balance": "Moderate - good technical skills but soft skills could be more prominent"
-    },
-    "recommendations": [
-        "Add quantifiable metrics to all work experiences (e.g., 'Improved system performance by 40%')",
-        "Include more action verbs at the start of bullet points",
-        "Add a summary section highlighting key achievements",
-        "Reorganize skills by proficiency level or category"
-    ],
-    "career_fields": [
-        {
-            "field": "Backend Development",
-            "match": 92,
-            "reason": "Strong Python, Django, and REST API experience aligns perfectly with backend roles"
-        },
-        {
-            "field": "Data Engineering",
-            "match": 78,
-            "reason": "SQL and Python skills with data pipeline experience make this a natural fit"
-        },
-        {
-            "field": "DevOps Engineering",
-            "match": 65,
-            "reason": "Docker and CI/CD knowledge provides a good foundation, but needs more cloud experience"
-        }
-    ],
-    "improved_bullet_example": "Before: 'Worked on API development'\\nAfter: 'Architected and deployed RESTful APIs handling 10M+ daily requests, reducing response time by 35% and improving system reliability to 99.9% uptime'"
-}
+RESUME_EXTRACTION_PROMPT = _extraction_prompt(RESUME_EXTRACTION_OUTPUT)
+
+
+@lru_cache(maxsize=64)
+def residual_extraction(omitted):
+    """
+    Extraction contract and prompt without the fields in `omitted` (dotted
+    paths already filled in locally), so the model only answers the rest
+    """
+    output = RESUME_EXTRACTION_OUTPUT.without(*omitted)
+    return output, _extraction_prompt(output)
+
+# Appended when the local skill matcher already found skills; the model only
+# has to add the ones the dictionary doesn't know
+DETECTED_SKILLS_HINT = "- These skills were already detected and are added automatically, list only OTHER skills: {skills}"
 
-IMPORTANT: In the "improved_bullet_example" field, use \\n (escaped newline) to separate Before and After, NOT literal newlines.
+# Validation schema for extraction responses (see extract_json)
+RESUME_EXTRACTION_SCHEMA = RESUME_EXTRACTION_OUTPUT.json_schema()
 
-SCORING CRITERIA:
-- overall_score (0-100): Holistic assessment of resume quality
-- ats_score (0-100): How well the resume will perform in Applicant Tracking Systems
 
-ANALYSIS RULES:
-1. Be specific and actionable in all feedback
-2. Include 3-5 strengths and 3-5 weaknesses
-3. Provide realistic scores based on content quality
-4. Make recommendations practical and implementable
-5. Use the improved_bullet_example to show concrete improvement
-6. Consider format, content, keywords, achievements, and clarity
-7. For career_fields, suggest 3-5 career paths the candidate is best suited for based on their skills, experience, and education. Include a match percentage (0-100) and a brief reason explaining why they fit that field
+RESUME_ANALYSIS_OUTPUT = OutputSchema('resume_analysis', {
+    "overall_score": Integer(minimum=0, maximum=100, description="holistic resume quality"),
+    "ats_score": Integer(minimum=0, maximum=100, description="how well it parses in Applicant Tracking Systems"),
+    "strengths": Array(String(max_length=150), min_items=3, max_items=5),
+    "weaknesses": Array(String(max_length=150), min_items=3, max_items=5),
+    "analytics": Object({
+        "keyword_density": String(max_length=150),
+        "experience_depth": String(max_length=150),
+        "skills_balance": String(max_length=150),
+    }, description='rating then short reason, e.g. "Good - includes relevant industry keywords"'),
+    "recommendations": Array(String(max_length=200), min_items=3, max_items=5),
+    "career_fields": Array(Object({
+        "field": String(max_length=60),
+        "match": Integer(minimum=0, maximum=100),
+        "reason": String(max_length=200),
+    }), min_items=3, max_items=5, description="career paths the candidate suits best"),
+    "improved_bullet_example": String(
+        max_length=400, description="\"Before: '...'\\nAfter: '...'\" rewrite of one weak bullet, with metrics"),
+})
+
+RESUME_ANALYSIS_PROMPT = f"""
+You are an expert resume analyst and career coach. Analyze the resume text and return ONLY a JSON object of this shape:
+{RESUME_ANALYSIS_OUTPUT.prompt()}
+
+RULES:
+- Be specific and actionable; base scores realistically on content quality.
+- Consider format, content, keywords, achievements and clarity.
+- Make recommendations practical and implementable.
 
 Analyze the following resume text:
 """
 
+# Validation schema for analysis responses (see extract_json)
+RESUME_ANALYSIS_SCHEMA = RESUME_ANALYSIS_OUTPUT.json_schema()
+
 
 class MistralOCRService:
     """Service class for handling Mistral AI OCR and resume parsing"""
@@ -140,135 +207,306 @@ class MistralOCRService:
             'Content-Type': 'application/json',
             'Authorization': f'Bearer {self.api_key}'
         }
+        # Optional shared limiter (anything with .acquire()) applied to every upstream call
+        self.rate_limiter = None
+        # OCR cache (a database table); None skips it, e.g. in bulk ingestion
+        # workers, where the parent process does the cache reads and writes
+        self.cache = ocr_cache
+
+    def _post(self, url, **kwargs):
+        """POST to the Mistral API, waiting for the rate limiter first if one is set"""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        return requests.post(url, headers=self.headers, timeout=60, **kwargs)
     
-    def extract_text_from_document(self, file_path, mime_type):
+    def extract_text_from_document(self, document, mime_type):
         """
-        Extract text from document using Mistral OCR
+        Extract text from document, using the embedded text layer of digital
+        PDFs where possible and Mistral OCR for everything else. Images are
+        normalised (upright, grayscale, downscaled) before OCR, and the text is
+        normalised (markup, repeated headers/footers, token budget) afterwards.
+        Results are cached by the SHA-256 of the file, so re-uploads skip OCR.
         
         Args:
-            file_path: Path to the uploaded file
+            document: Uploaded file object (or path to the file)
             mime_type: MIME type of the file (e.g., 'application/pdf', 'image/jpeg')
         
         Returns:
             Extracted text as a string
         """
         try:
-            # Read file and encode to base64
-            with open(file_path, 'rb') as file:
-                file_content = file.read()
-                base64_file = base64.b64encode(file_content).decode('utf-8')
-            
-            # Prepare OCR request
-            ocr_payload = {
-                "model": "mistral-ocr-latest",
-                "document": {
-                    "type": "document_url",
-                    "document_url": f"data:{mime_type};base64,{base64_file}"
-                }
-            }
-            
-            # Call Mistral OCR API
-            response = requests.post(
-                self.ocr_url,
-                headers=self.headers,
-                json=ocr_payload,
-                timeout=60
+            is_pdf = mime_type == 'application/pdf'
+            preprocess_image = (
+                mime_type.startswith('image/')
+                and getattr(settings, 'OCR_IMAGE_PREPROCESS_ENABLED', True)
             )
-            
-            if not response.ok:
-                raise Exception(f"Mistral OCR API Error: {response.status_code} - {response.text}")
-            
-            data = response.json()
-            
-            # Extract text from all pages
-            extracted_text = ''
-            if data.get('pages') and isinstance(data['pages'], list):
-                extracted_text = '\n\n'.join(page.get('markdown', '') for page in data['pages'])
+
+            # Hash the upload (and base64-encode it when it may go to OCR as-is)
+            # in one streamed pass. The cache key is always the original upload.
+            digest, file_size, encoded_parts = encode_document(
+                document, encode=not ((is_pdf and HAS_PYPDF) or preprocess_image)
+            )
+
+            cached_text = self.cache.get(digest) if self.cache is not None else None
+            if cached_text is not None:
+                return cached_text
+
+            reader = open_pdf(document) if is_pdf else None
+            if reader is not None:
+                pages = self._extract_pdf_pages(reader)
+            elif preprocess_image:
+                image_data, normalised_mime = preprocess_upload(b''.join(iter_document_chunks(document)))
+                ocr_pages = self._ocr_pages(normalised_mime or mime_type, [base64.b64encode(image_data)])
+                del image_data
+                pages = [ocr_pages[i] for i in sorted(ocr_pages)]
             else:
-                # Fallback if structure is different
-                extracted_text = json.dumps(data)
+                if encoded_parts is None:
+                    _, _, encoded_parts = encode_document(document)
+                ocr_pages = self._ocr_pages(mime_type, encoded_parts)
+                pages = [ocr_pages[i] for i in sorted(ocr_pages)]
+            del encoded_parts
+
+            # Strip markup/headers/footers and fit the LLM token budget
+            extracted_text, stats = normalise_resume_pages(pages)
+            print(f"[OCR] Normalised text: {stats['tokens_before']} -> {stats['tokens_after']} tokens "
+                  f"(-{stats['reduction']:.0%})"
+                  + (f", dropped sections {stats['dropped_sections']}" if stats['dropped_sections'] else ""))
+
+            if self.cache is not None:
+                self.cache.set(digest, extracted_text, file_size=file_size)
             
             return extracted_text
             
         except Exception as e:
             raise Exception(f"OCR extraction failed: {str(e)}")
+
+    def _extract_pdf_pages(self, reader):
+        """
+        Per-page text for a locally readable PDF, capped at RESUME_OCR_MAX_PAGES.
+        Pages with a usable text layer are read locally; the rest are OCRed.
+        """
+        max_pages = getattr(settings, 'RESUME_OCR_MAX_PAGES', 6)
+        page_count = len(reader.pages)
+        if page_count > max_pages:
+            print(f"[OCR] Document has {page_count} pages, only the first {max_pages} are processed")
+
+        texts = [extract_page_text(reader.pages[i]) for i in range(min(page_count, max_pages))]
+        ocr_indexes = [i for i, text in enumerate(texts) if text is None]
+        if ocr_indexes:
+            if len(ocr_indexes) < len(texts):
+                print(f"[OCR] Text layer usable on {len(texts) - len(ocr_indexes)}/{len(texts)} pages, "
+                      f"sending pages {ocr_indexes} to OCR")
+            ocr_texts = self._ocr_pdf_pages(reader, ocr_indexes)
+            for i in ocr_indexes:
+                texts[i] = ocr_texts.get(i, '')
+        return texts
+
+    def _ocr_pdf_pages(self, reader, indexes):
+        """
+        OCR the given PDF pages concurrently in batches of RESUME_OCR_PAGE_BATCH_SIZE
+        using at most RESUME_OCR_MAX_WORKERS parallel requests.
+
+        Each page is also cached on its own (keyed by the hash of the page as a
+        standalone PDF), so a revised CV only re-OCRs the pages that changed.
+
+        Returns:
+            {page index: text}
+        """
+        page_pdfs = {i: pages_to_pdf(reader, [i]) for i in indexes}
+        page_keys = {i: content_hash(data) for i, data in page_pdfs.items()}
+
+        results = {}
+        misses = []
+        for i in indexes:
+            cached_text = self.cache.get(page_keys[i]) if self.cache is not None else None
+            if cached_text is None:
+                misses.append(i)
+            else:
+                results[i] = cached_text
+
+        if not misses:
+            return results
+
+        batch_size = max(1, getattr(settings, 'RESUME_OCR_PAGE_BATCH_SIZE', 1))
+        batches = [misses[start:start + batch_size] for start in range(0, len(misses), batch_size)]
+        max_workers = max(1, min(getattr(settings, 'RESUME_OCR_MAX_WORKERS', 4), len(batches)))
+
+        def ocr_batch(batch):
+            data = page_pdfs[batch[0]] if len(batch) == 1 else pages_to_pdf(reader, batch)
+            return self._ocr_pages('application/pdf', [base64.b64encode(data)])
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for batch, batch_pages in zip(batches, executor.map(ocr_batch, batches)):
+                # Page indexes in the response are positions within the batch PDF
+                for position, i in enumerate(batch):
+                    results[i] = batch_pages.get(position, '')
+
+        # Cache writes stay on the request thread (workers only talk to the OCR API)
+        if self.cache is not None:
+            for i in misses:
+                self.cache.set(page_keys[i], results[i], file_size=len(page_pdfs[i]))
+
+        return results
+
+    def _ocr_pages(self, mime_type, encoded_parts):
+        """
+        Call Mistral OCR for a document
+
+        Returns:
+            {page index: markdown}
+        """
+        # Prepare OCR request
+        ocr_body = build_ocr_body(mime_type, encoded_parts)
+
+        # Call Mistral OCR API
+        response = self._post(self.ocr_url, data=ocr_body)
+
+        if not response.ok:
+            raise Exception(f"Mistral OCR API Error: {response.status_code} - {response.text}")
+
+        data = response.json()
+
+        # Extract text from all pages
+        if data.get('pages') and isinstance(data['pages'], list):
+            return {
+                page.get('index', position): page.get('markdown', '')
+                for position, page in enumerate(data['pages'])
+            }
+
+        # Fallback if structure is different
+        return {0: json.dumps(data)}
     
-    def parse_resume_text(self, extracted_text):
+    def _chat_json(self, task, system_prompt, output, extracted_text, **options):
         """
-        Parse extracted text using Mistral LLM to structure resume data
-        
+        Structured chat completion on the model tier chosen by `model_router`,
+        retried once on the next larger tier if the output fails validation.
+
         Args:
-            extracted_text: Raw text extracted from document
-        
+            task: routing task name ('extraction' or 'analysis')
+            system_prompt: system message
+            output: OutputSchema describing the response
+            extracted_text: resume text (user message)
+            options: extra payload fields (e.g. temperature)
+
         Returns:
-            Structured JSON data
+            Parsed and validated response dict
+
+        Raises:
+            LLMJSONError: the last tier tried still returned invalid output
         """
-        try:
-            # Prepare chat completion request
+        tier = model_router.route(task, extracted_text)
+        escalated = False
+        while True:
             chat_payload = {
-                "model": "mistral-large-latest",
+                "model": model_router.model(tier),
                 "messages": [
-                    {"role": "system", "content": RESUME_EXTRACTION_PROMPT},
+                    {"role": "system", "content": system_prompt},
                     {"role": "user", "content": extracted_text}
-                ]
+                ],
+                "response_format": output.response_format(),
+                "max_tokens": output.max_tokens(),
+                **options
             }
-            
+
             # Call Mistral Chat API
-            response = requests.post(
-                self.chat_url,
-                headers=self.headers,
-                json=chat_payload,
-                timeout=60
-            )
-            
+            start = time.monotonic()
+            response = self._post(self.chat_url, json=chat_payload)
+            elapsed = time.monotonic() - start
+            model_router.record(task, tier, elapsed, escalated=escalated)
+            print(f"[Router] {task} served by {tier} ({chat_payload['model']}) in {elapsed:.1f}s")
+
             if not response.ok:
                 raise Exception(f"Mistral Chat API Error: {response.status_code} - {response.text}")
-            
+
             chat_data = response.json()
-            parsed_text = chat_data['choices'][0]['message']['content']
-            
-            # Try to parse as JSON
+            content = chat_data['choices'][0]['message']['content']
+
             try:
-                # Remove any markdown code blocks if present
-                if '```json' in parsed_text:
-                    parsed_text = parsed_text.split('```json')[1].split('```')[0].strip()
-                elif '```' in parsed_text:
-                    parsed_text = parsed_text.split('```')[1].split('```')[0].strip()
-                
-                structured_data = json.loads(parsed_text)
-                return structured_data
-            except json.JSONDecodeError:
+                return extract_json(content, output.json_schema())
+            except LLMJSONError as e:
+                next_tier = model_router.escalation_tier(tier)
+                if next_tier is None:
+                    raise
+                print(f"[Router] {task} output from {tier} failed validation ({e}), escalating to {next_tier}")
+                tier, escalated = next_tier, True
+
+    def parse_resume_text(self, extracted_text):
+        """
+        Parse extracted text using Mistral LLM to structure resume data
+        
+        Args:
+            extracted_text: Raw text extracted from document
+        
+        Returns:
+            Structured JSON data
+        """
+        try:
+            # Contact fields and education dates found by patterns are left out
+            # of the schema the model has to fill
+            contact_fields, education_dates = {}, None
+            if getattr(settings, 'RESUME_FAST_PATH_ENABLED', True):
+                contact_fields = find_contact_fields(extracted_text)
+                education_dates = find_education_dates(extracted_text)
+            omitted = [f'personal_info.{name}' for name in contact_fields]
+            if education_dates:
+                omitted += ['education.start_date', 'education.end_date']
+            output, system_prompt = residual_extraction(tuple(omitted))
+
+            # Dictionary skills are found locally; the model is told to skip them
+            matcher = get_skill_matcher()
+            detected_skills = matcher.extract(extracted_text)
+            if detected_skills:
+                system_prompt += DETECTED_SKILLS_HINT.format(skills=', '.join(s['name'] for s in detected_skills))
+
+            try:
+                data = self._chat_json('extraction', system_prompt, output, extracted_text)
+            except LLMJSONError as e:
                 # Return raw text if JSON parsing fails
-                return {"raw_text": parsed_text}
+                print(f"[OCR] Could not parse extraction response: {e}")
+                return {"raw_text": e.raw}
+
+            data['skills'] = matcher.merge(detected_skills, data.get('skills'))
+            data['personal_info'] = {**(data.get('personal_info') or {}), **contact_fields}
+            high_confidence = [f'personal_info.{name}' for name in contact_fields]
+            if education_dates:
+                education = data.get('education') or []
+                for index in assign_education_dates(education, extracted_text, education_dates):
+                    high_confidence += [f'education[{index}].start_date', f'education[{index}].end_date']
+                for entry in education:
+                    entry.setdefault('start_date', None)
+                    entry.setdefault('end_date', None)
+            # Fields taken from the text verbatim rather than from the model
+            data['high_confidence'] = high_confidence
+            return data
             
         except Exception as e:
             raise Exception(f"Resume parsing failed: {str(e)}")
     
-    def process_resume(self, file_path, mime_type):
+    def process_resume(self, document, mime_type):
         """
         Complete pipeline: extract text and parse resume
         
         Args:
-            file_path: Path to the uploaded file
+            document: Uploaded file object (or path to the file)
             mime_type: MIME type of the file
         
         Returns:
             Structured resume data
         """
         # Step 1: Extract text using OCR
-        extracted_text = self.extract_text_from_document(file_path, mime_type)
+        extracted_text = self.extract_text_from_document(document, mime_type)
         
         # Step 2: Parse and structure the text
         structured_data = self.parse_resume_text(extracted_text)
         
         return structured_data
     
-    def analyze_resume(self, file_path, mime_type):
+    def analyze_resume(self, document, mime_type):
         """
         Complete pipeline: extract text and analyze resume quality
         
         Args:
-            file_path: Path to the uploaded file
+            document: Uploaded file object (or path to the file)
             mime_type: MIME type of the file
         
         Returns:
@@ -276,72 +514,57 @@ class MistralOCRService:
         """
         try:
             # Step 1: Extract text using OCR
-            extracted_text = self.extract_text_from_document(file_path, mime_type)
-            
-            # Step 2: Analyze the resume
-            chat_payload = {
-                "model": "mistral-large-latest",
-                "messages": [
-                    {"role": "system", "content": RESUME_ANALYSIS_PROMPT},
-                    {"role": "user", "content": extracted_text}
-                ],
-                "temperature": 0.3  # Lower temperature for more consistent analysis
-            }
-            
-            # Call Mistral Chat API
-            response = requests.post(
-                self.chat_url,
-                headers=self.headers,
-                json=chat_payload,
-                timeout=60
-            )
-            
-            if not response.ok:
-                raise Exception(f"Mistral Chat API Error: {response.status_code} - {response.text}")
-            
-            chat_data = response.json()
-            analysis_text = chat_data['choices'][0]['message']['content']
-            
-            # Parse the JSON response
+            extracted_text = self.extract_text_from_document(document, mime_type)
+        except Exception as e:
+            raise Exception(f"Resume analysis failed: {str(e)}")
+
+        # Step 2: Analyze the resume
+        return self.analyze_resume_text(extracted_text)
+
+    def process_full_resume(self, document, mime_type):
+        """
+        One-pass pipeline: OCR once, then run structured extraction and
+        quality analysis concurrently
+        
+        Args:
+            document: Uploaded file object (or path to the file)
+            mime_type: MIME type of the file
+        
+        Returns:
+            {"text": structured resume data, "analysis": analysis data}
+        """
+        extracted_text = self.extract_text_from_document(document, mime_type)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            parse_future = executor.submit(self.parse_resume_text, extracted_text)
+            analysis_future = executor.submit(self.analyze_resume_text, extracted_text)
+            structured_data = parse_future.result()
+            analysis_data = analysis_future.result()
+
+        return {
+            "text": structured_data,
+            "analysis": analysis_data
+        }
+
+    def analyze_resume_text(self, extracted_text):
+        """
+        Analyze resume quality from already-extracted text
+        
+        Args:
+            extracted_text: Raw text extracted from document
+        
+        Returns:
+            Analysis data with scores, strengths, weaknesses, and recommendations
+        """
+        try:
             try:
-                # Remove any markdown code blocks if present
-                if '```json' in analysis_text:
-                    analysis_text = analysis_text.split('```json')[1].split('```')[0].strip()
-                elif '```' in analysis_text:
-                    analysis_text = analysis_text.split('```')[1].split('```')[0].strip()
-                
-                # Remove control characters that break JSON parsing (keep newlines for now)
-                analysis_text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]', '', analysis_text)
-                
-                # Try parsing the JSON
-                try:
-                    analysis_data = json.loads(analysis_text)
-                except json.JSONDecodeError as e:
-                    # If parsing fails due to literal newlines, try to fix them
-                    # This is a fallback in case the model doesn't follow instructions
-                    if 'Invalid control character' in str(e) or 'line' in str(e):
-                        # Use Python's string escaping to handle the text
-                        # Encode and decode to properly escape special characters
-                        import codecs
-                        encoded = codecs.encode(analysis_text, 'unicode_escape').decode('ascii')
-                        # Remove extra escaping that was added
-                        encoded = encoded.replace('\\\\', '\\')
-                        analysis_data = json.loads(encoded)
-                    else:
-                        raise
-                
-                # Validate required fields
-                required_fields = ['overall_score', 'ats_score', 'strengths', 'weaknesses', 
-                                 'analytics', 'recommendations', 'improved_bullet_example']
-                for field in required_fields:
-                    if field not in analysis_data:
-                        raise ValueError(f"Missing required field: {field}")
-                
-                return analysis_data
-                
-            except (json.JSONDecodeError, ValueError) as e:
+                return self._chat_json(
+                    'analysis', RESUME_ANALYSIS_PROMPT, RESUME_ANALYSIS_OUTPUT, extracted_text,
+                    temperature=0.3  # Lower temperature for more consistent analysis
+                )
+            except LLMJSONError as e:
                 # Return error with raw response for debugging
-                raise Exception(f"Failed to parse analysis response: {str(e)}. Raw response: {analysis_text[:500]}")
+                raise Exception(f"Failed to parse analysis response: {str(e)}. Raw response: {e.raw[:500]}")
             
         except Exception as e:
             raise Exception(f"Resume analysis failed: {str(e)}")
@@ -0,0 +1,94 @@
+"""
+Local PDF handling for resume uploads
+Reads the embedded text of born-digital PDFs (Word/LaTeX exports) page by page,
+so only scanned/image pages need to go to remote OCR, and splits those pages
+into small PDFs that can be OCRed (and cached) individually.
+"""
+
+import io
+import re
+from django.conf import settings
+
+try:
+    from pypdf import PdfReader, PdfWriter
+    HAS_PYPDF = True
+except ImportError:
+    HAS_PYPDF = False
+    print("⚠ pypdf not installed. PDFs will always be sent to remote OCR as a whole.")
+
+
+# Characters that show up when a PDF has broken font encodings
+_GARBAGE_RE = re.compile(r'\(cid:\d+\)|�')
+
+
+def page_text_is_usable(text):
+    """
+    Text-density quality check for one page of extracted text.
+
+    A page passes when it has at least PDF_TEXT_MIN_CHARS_PER_PAGE visible
+    characters and most of them are ordinary letters/digits/punctuation rather
+    than undecodable glyphs. Scanned pages (no text layer) and pages whose fonts
+    can't be decoded fail and are sent to OCR instead.
+    """
+    if not text:
+        return False
+
+    visible = re.sub(r'\s+', '', text)
+    if len(visible) < getattr(settings, 'PDF_TEXT_MIN_CHARS_PER_PAGE', 80):
+        return False
+
+    garbage = sum(len(m) for m in _GARBAGE_RE.findall(visible))
+    readable = sum(1 for ch in visible if ch.isalnum() or ch in '.,;:!?@()[]/&%+-–—•·\'"#*|_')
+    ratio = (readable - garbage) / len(visible)
+    return ratio >= getattr(settings, 'PDF_TEXT_MIN_READABLE_RATIO', 0.8)
+
+
+def open_pdf(document):
+    """
+    Open a PDF for local processing.
+
+    Args:
+        document: uploaded file object or path
+
+    Returns:
+        PdfReader, or None when pypdf is unavailable or the PDF can't be read
+        locally (encrypted, corrupt) and must go to OCR as a whole
+    """
+    if not HAS_PYPDF:
+        return None
+
+    try:
+        if hasattr(document, 'seek'):
+            document.seek(0)
+        reader = PdfReader(document)
+        if reader.is_encrypted:
+            return None
+        len(reader.pages)  # force the page tree to parse
+        return reader
+    except Exception as e:
+        print(f"[PDFText] Can't read PDF locally, falling back to whole-document OCR: {e}")
+        return None
+
+
+def extract_page_text(page):
+    """
+    Embedded text of one page when it passes the quality check, else None
+    (the page needs OCR). Always None when PDF_TEXT_LAYER_ENABLED is off.
+    """
+    if not getattr(settings, 'PDF_TEXT_LAYER_ENABLED', True):
+        return None
+    try:
+        text = page.extract_text() or ''
+    except Exception:
+        return None
+    return text.strip() if page_text_is_usable(text) else None
+
+
+def pages_to_pdf(reader, indexes):
+    """Write the given 0-based pages of `reader` into a new standalone PDF (bytes)"""
+    writer = PdfWriter()
+    for index in indexes:
+        writer.add_page(reader.pages[index])
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
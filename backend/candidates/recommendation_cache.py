@@ -0,0 +1,190 @@
+"""
+Recommendation result cache
+Caches (recommendations, skill insights) per normalised skills text (aliases
+resolved), top_n and model version, so repeated searches (the same user refreshing, or popular
+stacks like "python django react") skip cleaning, the TF-IDF transform and
+scoring. A small LRU per process sits in front of a Django cache shared by
+all worker processes.
+
+Keys carry the model version: after a reload, entries of the old model are
+never read again and age out of the shared cache.
+"""
+
+import hashlib
+import threading
+import time
+from collections import Counter, OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+
+from .skill_matcher import get_skill_matcher
+
+
+# Seconds between pushes of this process's hit/miss counts to the shared cache
+STATS_FLUSH_SECONDS = 5
+STATS_KEY = 'recommendations:stats:{}'
+
+
+class RecommendationCache:
+    """
+    Two-level cache for RecommendationService.recommend.
+
+    Settings:
+      - RECOMMENDATION_CACHE_ENABLED: turn the cache off entirely
+      - RECOMMENDATION_CACHE_ALIAS: Django cache shared by the workers, bounded
+        by its own MAX_ENTRIES and TIMEOUT (see CACHES)
+      - RECOMMENDATION_CACHE_LOCAL_ENTRIES: per-process LRU size (0 disables)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = OrderedDict()
+        self._local_version = None
+        self.hits = 0
+        self.local_hits = 0
+        self.misses = 0
+        self._unflushed = Counter()
+        self._flushed_at = time.monotonic()
+
+    @property
+    def enabled(self):
+        return getattr(settings, 'RECOMMENDATION_CACHE_ENABLED', True)
+
+    @property
+    def shared(self):
+        return caches[getattr(settings, 'RECOMMENDATION_CACHE_ALIAS', 'recommendations')]
+
+    @property
+    def local_entries(self):
+        return max(0, int(getattr(settings, 'RECOMMENDATION_CACHE_LOCAL_ENTRIES', 256)))
+
+    def key(self, service, skills, top_n):
+        """
+        Cache key of a request. Skills are normalised to the vectorizer's
+        token sequence (case, punctuation, spacing), which determines the
+        candidate vector, with aliases resolved first ("js" and "javascript"
+        share an entry); order is kept as the vectorizer counts bigrams.
+        """
+        skills = get_skill_matcher().canonical_text(skills)
+        tokens = service.tfidf_skills.build_tokenizer()(service._clean_text(skills))
+        digest = hashlib.sha256(' '.join(tokens).encode('utf-8')).hexdigest()
+        return f'recommendations:{service.model_version}:{int(top_n)}:{digest}'
+
+    def recommend(self, service, skills, top_n=10):
+        """
+        service.recommend(skills, top_n), cached. Aliases ("js", "k8s") count
+        as the canonical skills the model knows. The service raises on errors,
+        so a failed computation is never stored.
+
+        Returns:
+        - (list of recommendations, skill insights dict)
+        """
+        text = get_skill_matcher().skills_text(skills)
+        if not self.enabled or not service.model:
+            return service.recommend(text, top_n)
+        try:
+            key = self.key(service, skills, top_n)
+        except (TypeError, ValueError):
+            return service.recommend(text, top_n)
+
+        with self._lock:
+            if self._local_version != service.model_version:
+                # New model: nothing cached locally can be served any more
+                self._local.clear()
+                self._local_version = service.model_version
+            result = self._local.get(key)
+            if result is not None:
+                self._local.move_to_end(key)
+        if result is not None:
+            self._record('hits', local=True)
+            return result
+
+        try:
+            result = self.shared.get(key)
+        except Exception as e:
+            print(f"[RecommendationCache] Shared cache read failed: {e}")
+            result = None
+        if result is not None:
+            self._record('hits')
+        else:
+            result = service.recommend(text, top_n)
+            self._record('misses')
+            try:
+                self.shared.set(key, result)
+            except Exception as e:
+                print(f"[RecommendationCache] Shared cache write failed: {e}")
+
+        self._remember(key, result)
+        return result
+
+    def _remember(self, key, result):
+        with self._lock:
+            if not self.local_entries:
+                return
+            self._local[key] = result
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_entries:
+                self._local.popitem(last=False)
+
+    def clear(self):
+        """Drop this process's entries (the shared cache is left to expire)"""
+        with self._lock:
+            self._local.clear()
+
+    def stats(self):
+        """
+        Cache metrics: this process's hits (local LRU or shared cache) and
+        misses since start, plus the totals all workers have pushed to the
+        shared cache (every STATS_FLUSH_SECONDS, so slightly behind).
+        """
+        self._flush()
+        with self._lock:
+            hits, local_hits, misses, entries = self.hits, self.local_hits, self.misses, len(self._local)
+        lookups = hits + misses
+        try:
+            totals = self.shared.get_many([STATS_KEY.format('hits'), STATS_KEY.format('misses')])
+        except Exception:
+            totals = {}
+        all_hits, all_misses = totals.get(STATS_KEY.format('hits'), 0), totals.get(STATS_KEY.format('misses'), 0)
+        return {
+            'enabled': self.enabled,
+            'hits': hits,
+            'local_hits': local_hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            'local_entries': entries,
+            'all_workers': {
+                'hits': all_hits,
+                'misses': all_misses,
+                'hit_rate': round(all_hits / (all_hits + all_misses), 4) if all_hits + all_misses else 0.0,
+            },
+        }
+
+    def _record(self, outcome, local=False):
+        with self._lock:
+            if outcome == 'hits':
+                self.hits += 1
+                self.local_hits += local
+            else:
+                self.misses += 1
+            self._unflushed[outcome] += 1
+            due = time.monotonic() - self._flushed_at >= STATS_FLUSH_SECONDS
+        if due:
+            self._flush()
+
+    def _flush(self):
+        """Add this process's unpushed counts to the shared totals"""
+        with self._lock:
+            pending, self._unflushed = self._unflushed, Counter()
+            self._flushed_at = time.monotonic()
+        try:
+            for outcome, count in pending.items():
+                key = STATS_KEY.format(outcome)
+                self.shared.add(key, 0, timeout=None)
+                self.shared.incr(key, count)
+        except Exception as e:
+            print(f"[RecommendationCache] Could not update shared stats: {e}")
+
+
+# Singleton instance
+recommendation_cache = RecommendationCache()
@@ -4,42 +4,141 @@ Uses the trained ML model to provide job recommendations and predictions
 """
 
 import pickle
-import pandas as pd
+import threading
+import time
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
 import os
+from django.conf import settings
+from django.utils import timezone
+from .job_index import JobIndex, select_top_k
+from .model_artifact import current_version, load_artifact
+
+
+# Matches at or below this cosine similarity are not recommended; very low so
+# even a single skill match shows results
+MIN_MATCH_SCORE = 0.001
+
+# Columns of job_profiles served with each recommendation
+JOB_FIELDS = {
+    'required_skills': 'skills_required_cleaned',
+    'responsibilities': 'responsibilities',
+    'education_required': 'educationaL_requirements',
+    'experience_required': 'experiencere_requirement',
+}
+
 
 class RecommendationService:
     """Service to handle job recommendations and resume analysis"""
     
-    def __init__(self):
+    def __init__(self, model=None):
         # Get the path to the dataset folder
         base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
         self.dataset_path = os.path.join(base_dir, 'dataset')
+        self.artifact_dir = getattr(settings, 'RECOMMENDATION_ARTIFACT_DIR', None) or os.path.join(self.dataset_path, 'artifacts')
         
-        # Load the final model
-        self.model = self._load_model()
+        # Load the final model (or use the given model dict)
+        start = time.perf_counter()
+        if model is not None:
+            self.model = model
+            self.model_version = model.get('version', 'custom')
+        else:
+            self.model_version = None
+            self.model = self._load_model()
+        if self.model:
+            self._build_index()
+        self.load_seconds = round(time.perf_counter() - start, 3)
+        self.loaded_at = timezone.now().isoformat()
+
+    def model_marker(self):
+        """
+        Version a fresh load would serve: the CURRENT artifact version, else
+        final_model.pkl's modification time, or None when there is no model
+        """
+        version = current_version(self.artifact_dir)
+        if version:
+            return version
+        try:
+            return f"pickle-{int(os.path.getmtime(os.path.join(self.dataset_path, 'final_model.pkl')))}"
+        except OSError:
+            return None
         
     def _load_model(self):
-        """Load the trained model and related data"""
+        """
+        Load the trained model and related data: the CURRENT memory-mapped
+        artifact when one has been exported, otherwise final_model.pkl
+        """
+        version = current_version(self.artifact_dir)
+        if version:
+            try:
+                model_data = load_artifact(os.path.join(self.artifact_dir, version))
+                self.model_version = version
+                print(f"✓ Recommendation artifact {version} loaded (memory-mapped)")
+                return model_data
+            except Exception as e:
+                print(f"Error loading artifact {version}, falling back to final_model.pkl: {str(e)}")
         try:
             model_path = os.path.join(self.dataset_path, 'final_model.pkl')
+            version = f"pickle-{int(os.path.getmtime(model_path))}"
             with open(model_path, 'rb') as f:
                 model_data = pickle.load(f)
             
+            self.model_version = version
             print("✓ Recommendation model loaded successfully")
             return model_data
         except Exception as e:
             print(f"Error loading model: {str(e)}")
             return None
+
+    def warm(self):
+        """Read through the job index once so a fresh (memory-mapped) model serves its first requests at full speed"""
+        if self.model:
+            self.job_columns.data.sum()
+            self.job_columns.indices.sum()
+            self.recommend('python', 1)
     
-    def get_job_recommendations(self, candidate_skills, top_n=10):
+    def _build_index(self):
+        """
+        Precompute everything per-request scoring needs: the job matrix
+        L2-normalised once (so cosine similarity is a plain dot product) and
+        stored by column for gathering only the candidate's terms, and job
+        metadata as plain lists instead of DataFrame rows. An artifact
+        already holds both, memory-mapped, and is used as is. The columns
+        double as the inverted index (term -> jobs) for top-k retrieval.
+        """
+        self.tfidf_skills = self.model['tfidf_skills']
+        if 'jobs_by_term' in self.model:
+            self.feature_names = self.model['skills_terms']
+            self.job_columns = self.model['jobs_by_term'].T  # CSC view, no copy
+            self.job_titles = self.model['job_fields']['job_title']
+            self.job_fields = self.model['job_fields']
+        else:
+            self.feature_names = self.tfidf_skills.get_feature_names_out()
+            self.job_columns = normalize(self.model['job_skills_matrix'], norm='l2').tocsc()
+            self.job_columns.sort_indices()
+
+            job_profiles = self.model['job_profiles']
+            # Handle column names with BOM character
+            title_column = next((c for c in ('job_position_name', '\ufeffjob_position_name') if c in job_profiles), None)
+            self.job_titles = job_profiles[title_column].tolist() if title_column else ['N/A'] * len(job_profiles)
+            self.job_fields = {
+                name: job_profiles[column].tolist() if column in job_profiles else ['N/A'] * len(job_profiles)
+                for name, column in JOB_FIELDS.items()
+            }
+        self.job_index = JobIndex(self.job_columns)
+
+    def candidate_vector(self, candidate_skills):
+        """L2-normalised TF-IDF vector (1 x vocabulary, sparse) of the candidate's skills"""
+        return normalize(self.tfidf_skills.transform([self._clean_text(candidate_skills)]), norm='l2')
+
+    def get_job_recommendations(self, candidate_skills, top_n=10, candidate_vector=None):
         """
         Get job recommendations based on candidate skills
         
         Parameters:
         - candidate_skills: str, candidate's skills text
         - top_n: int, number of recommendations to return
+        - candidate_vector: optional result of `candidate_vector` to reuse
         
         Returns:
         - list of dict: job recommendations with details
@@ -48,45 +147,84 @@ class RecommendationService:
             return []
         
         try:
-            # Extract components from model
-            tfidf_skills = self.model['tfidf_skills']
-            job_skills_matrix = self.model['job_skills_matrix']
-            job_profiles = self.model['job_profiles']
-            
-            # Clean and preprocess skills
-            candidate_skills = self._clean_text(candidate_skills)
-            
-            # Transform candidate skills
-            candidate_vector = tfidf_skills.transform([candidate_skills])
-            
-            # Calculate cosine similarity with all jobs
-            similarities = cosine_similarity(candidate_vector, job_skills_matrix)[0]
-            
-            # Get top N jobs
-            top_indices = similarities.argsort()[-top_n:][::-1]
-            
-            recommendations = []
-            for idx in top_indices:
-                job = job_profiles.iloc[idx]
-                match_score = float(similarities[idx])
-                
-                # Very low threshold so even a single skill match shows results
-                if match_score > 0.001:
-                    # Handle column names with BOM character
-                    job_title = job.get('job_position_name', job.get('\ufeffjob_position_name', 'N/A'))
-                    recommendations.append({
-                        'job_title': job_title,
-                        'match_score': round(match_score * 100, 2),
-                        'required_skills': job.get('skills_required_cleaned', 'N/A'),
-                        'responsibilities': job.get('responsibilities', 'N/A')[:200] + '...' if job.get('responsibilities', 'N/A') != 'N/A' else 'N/A',
-                        'education_required': job.get('educationaL_requirements', 'N/A'),
-                        'experience_required': job.get('experiencere_requirement', 'N/A')
-                    })
-            
-            return recommendations
+            if candidate_vector is None:
+                candidate_vector = self.candidate_vector(candidate_skills)
+            return self._recommendations(candidate_vector, top_n)
         except Exception as e:
             print(f"Error generating recommendations: {str(e)}")
             return []
+
+    def _recommendations(self, candidate_vector, top_n):
+        """get_job_recommendations for a candidate vector, raising on errors"""
+        candidate_vector = candidate_vector.tocsr()
+        # Cosine similarity = dot product of normalised vectors; the index
+        # only scores jobs that can still make the top N
+        jobs, scores = self.job_index.top_k(candidate_vector.indices, candidate_vector.data, top_n, MIN_MATCH_SCORE)
+        return [self._job_recommendation(int(job), float(score)) for job, score in zip(jobs, scores)]
+
+    def batch_recommendations(self, skills_list, top_n=10, chunk_size=None):
+        """
+        Job recommendations for many candidates at once
+        
+        Parameters:
+        - skills_list: list of str, one skills text per candidate
+        - top_n: int, number of recommendations per candidate
+        - chunk_size: candidates scored per sparse product (default
+          RECOMMENDATION_BATCH_CHUNK_SIZE); bounds memory to chunk x jobs
+        
+        Returns:
+        - list of recommendation lists, in the order of skills_list
+        """
+        if not self.model:
+            return [[] for _ in skills_list]
+
+        chunk_size = max(1, int(chunk_size or getattr(settings, 'RECOMMENDATION_BATCH_CHUNK_SIZE', 64)))
+        # One transform for the whole batch
+        candidates = normalize(
+            self.tfidf_skills.transform([self._clean_text(skills) for skills in skills_list]), norm='l2'
+        ).tocsr()
+        jobs_by_term = self.job_columns.T  # vocabulary x jobs, CSR
+
+        results = []
+        for start in range(0, candidates.shape[0], chunk_size):
+            # candidates x jobs similarities; only jobs sharing a term are stored
+            scores = (candidates[start:start + chunk_size] @ jobs_by_term).tocsr()
+            for row in range(scores.shape[0]):
+                begin, end = scores.indptr[row], scores.indptr[row + 1]
+                results.append(self._top_jobs(scores.data[begin:end], top_n, scores.indices[begin:end]))
+        return results
+
+    def _top_jobs(self, scores, top_n, jobs):
+        """Recommendations for the top N of `scores` (similarity per job in `jobs`)"""
+        jobs, scores = select_top_k(scores, jobs, top_n, MIN_MATCH_SCORE)
+        return [self._job_recommendation(int(job), float(score)) for job, score in zip(jobs, scores)]
+
+    def _job_recommendation(self, idx, match_score):
+        responsibilities = self.job_fields['responsibilities'][idx]
+        return {
+            'job_id': idx,  # catalogue row, e.g. for matching stored candidates to this job
+            'job_title': self.job_titles[idx],
+            'match_score': round(match_score * 100, 2),
+            'required_skills': self.job_fields['required_skills'][idx],
+            'responsibilities': responsibilities[:200] + '...' if isinstance(responsibilities, str) and responsibilities != 'N/A' else 'N/A',
+            'education_required': self.job_fields['education_required'][idx],
+            'experience_required': self.job_fields['experience_required'][idx]
+        }
+
+    def recommend(self, candidate_skills, top_n=10):
+        """
+        Recommendations and skill insights from one shared candidate vector.
+        Unlike get_job_recommendations, errors are raised rather than turned
+        into an empty result, so callers (and the result cache) can tell a
+        failure from "no matching jobs".
+
+        Returns:
+        - (list of recommendations, skill insights dict)
+        """
+        if not self.model:
+            return [], {}
+        vector = self.candidate_vector(candidate_skills)
+        return self._recommendations(vector, top_n), self._skill_insights(vector)
     
     def analyze_resume_quality(self, resume_text):
         """
@@ -177,12 +315,13 @@ class RecommendationService:
                 'quality_assessment': 'Unable to analyze resume quality'
             }
     
-    def get_skill_insights(self, candidate_skills):
+    def get_skill_insights(self, candidate_skills, candidate_vector=None):
         """
         Get insights about candidate skills
         
         Parameters:
         - candidate_skills: str, candidate's skills text
+        - candidate_vector: optional result of `candidate_vector` to reuse
         
         Returns:
         - dict: skill insights
@@ -191,31 +330,31 @@ class RecommendationService:
             return {}
         
         try:
-            # Extract feature names
-            feature_names = self.model['tfidf_skills'].get_feature_names_out()
-            
-            # Transform skills
-            skills_vector = self.model['tfidf_skills'].transform([candidate_skills])
-            
-            # Get top skills
-            skills_array = skills_vector.toarray()[0]
-            top_indices = skills_array.argsort()[-10:][::-1]
-            
-            top_skills = []
-            for idx in top_indices:
-                if skills_array[idx] > 0:
-                    top_skills.append({
-                        'skill': feature_names[idx],
-                        'relevance': round(float(skills_array[idx]), 3)
-                    })
-            
-            return {
-                'top_skills': top_skills,
-                'total_skills_identified': len([s for s in skills_array if s > 0])
-            }
+            if candidate_vector is None:
+                candidate_vector = self.candidate_vector(candidate_skills)
+            return self._skill_insights(candidate_vector)
         except Exception as e:
             print(f"Error getting skill insights: {str(e)}")
             return {}
+
+    def _skill_insights(self, candidate_vector):
+        """get_skill_insights for a candidate vector, raising on errors"""
+        candidate_vector = candidate_vector.tocsr()
+        # Only the non-zero terms; highest weight first
+        weights = candidate_vector.data
+        order = np.lexsort((candidate_vector.indices, -weights))[:10]
+        top_skills = [
+            {
+                'skill': str(self.feature_names[candidate_vector.indices[i]]),
+                'relevance': round(float(weights[i]), 3)
+            }
+            for i in order if weights[i] > 0
+        ]
+        
+        return {
+            'top_skills': top_skills,
+            'total_skills_identified': int(np.count_nonzero(weights > 0))
+        }
     
     def _clean_text(self, text):
         """Clean and normalize text data"""
@@ -237,12 +376,108 @@ class RecommendationService:
         }
         return messages.get(category, f'Resume quality score: {score}%')
 
+class ModelReloader:
+    """
+    Watches the model version marker (artifacts/CURRENT, or final_model.pkl's
+    modification time) and swaps in a new service when it changes. The new
+    model is loaded and warmed in the background before the swap; requests
+    that already hold the old service finish on it.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.reloads = 0
+        self.failed_version = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        threading.Thread(target=self._run, name='recommendation-model-reloader', daemon=True).start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.check()
+            except Exception as e:
+                print(f"[ModelReload] Check failed: {e}")
+
+    def check(self):
+        """
+        Reload if the marker has moved.
+
+        Returns:
+            True when a new model was swapped in
+        """
+        global _recommendation_service
+        with self._lock:
+            current = _recommendation_service
+            if current is None:
+                return False
+            marker = current.model_marker()
+            if not marker or marker in (current.model_version, self.failed_version):
+                return False
+
+            print(f"[ModelReload] Model version changed {current.model_version} -> {marker}, loading in the background")
+            service = RecommendationService()
+            if not service.model or service.model_version != marker:
+                # Broken or half-written export: keep serving the current model
+                self.failed_version = marker
+                print(f"[ModelReload] Could not load {marker}, still serving {current.model_version}")
+                return False
+            service.warm()
+
+            with _recommendation_service_lock:
+                _recommendation_service = service
+            self.reloads += 1
+            print(f"[ModelReload] Now serving {service.model_version} (loaded in {service.load_seconds}s)")
+            return True
+
+
 # Singleton instance
 _recommendation_service = None
+_recommendation_service_lock = threading.Lock()
+# Reloader of this process (threads don't survive fork, so each worker starts its own)
+_reloader = None
+_reloader_pid = None
 
-def get_recommendation_service():
-    """Get or create the recommendation service instance"""
+def get_recommendation_service(watch=True):
+    """
+    Get or create the recommendation service instance (loaded once, even under
+    concurrent first calls). With watch, also starts this process's reloader
+    so retrained models are picked up without a restart; the pre-fork
+    warm-up passes watch=False so no thread is running when workers fork.
+    """
     global _recommendation_service
     if _recommendation_service is None:
-        _recommendation_service = RecommendationService()
+        with _recommendation_service_lock:
+            if _recommendation_service is None:
+                _recommendation_service = RecommendationService()
+    if watch:
+        _start_reloader()
     return _recommendation_service
+
+
+def _start_reloader():
+    global _reloader, _reloader_pid
+    if _reloader_pid == os.getpid():
+        return
+    with _recommendation_service_lock:
+        if _reloader_pid != os.getpid():
+            _reloader = ModelReloader(getattr(settings, 'RECOMMENDATION_RELOAD_INTERVAL', 0))
+            _reloader_pid = os.getpid()
+            if _reloader.interval > 0:
+                _reloader.start()
+
+
+def recommendation_model_status():
+    """Active model version and load timing for health checks (does not load the model)"""
+    service = _recommendation_service
+    if service is None:
+        return {'loaded': False}
+    return {
+        'loaded': bool(service.model),
+        'version': service.model_version,
+        'load_seconds': service.load_seconds,
+        'loaded_at': service.loaded_at,
+        'reloads': _reloader.reloads if _reloader else 0,
+    }
@@ -0,0 +1,170 @@
+"""
+Background resume processing
+Runs the upload -> OCR -> LLM chain for a ResumeJob on a bounded worker pool,
+recording each stage transition on the job so clients can poll it.
+"""
+
+import threading
+import time
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import ResumeJob
+from .ocr_service import MistralOCRService
+
+
+def record_stage(job, stage, **fields):
+    """Move `job` to `stage`, append the transition to its event log and save"""
+    job.stage = stage
+    job.events = job.events + [{'stage': stage, 'at': timezone.now().isoformat()}]
+    for name, value in fields.items():
+        setattr(job, name, value)
+    job.save(update_fields=['stage', 'events', 'updated_at', *fields])
+
+
+def claim_job(job_id, stage, updated_at):
+    """
+    Take over an unfinished job read as (stage, updated_at). The update only
+    matches while the row is unchanged, so when several processes sweep at
+    once exactly one of them gets the job; the new updated_at keeps the
+    others off it for another RESUME_JOB_STALE_SECONDS.
+    """
+    return ResumeJob.objects.filter(pk=job_id, stage=stage, updated_at=updated_at).update(updated_at=timezone.now()) == 1
+
+
+class ResumeJobRunner:
+    """
+    Bounded pool of resume job workers.
+
+    Jobs are resumable: text extracted before a restart is reused, and a
+    stage whose output is already stored on the job is not re-run.
+
+    Settings:
+      - RESUME_JOB_WORKERS: concurrent jobs per process
+      - RESUME_JOBS_EAGER: run jobs inline in the submitting thread (tests)
+      - RESUME_JOB_STALE_SECONDS: unfinished jobs untouched for this long are
+        treated as abandoned by a dead process and picked up again
+      - RESUME_JOB_SWEEP_SECONDS: how often each process looks for them
+        (0 only checks when the runner starts)
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or getattr(settings, 'RESUME_JOB_WORKERS', 4)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='resume-job')
+        self._lock = threading.Lock()
+        self._queued = set()
+
+    def submit(self, job_id):
+        """Queue a job for processing (no-op if it is already queued in this process)"""
+        if getattr(settings, 'RESUME_JOBS_EAGER', False):
+            self.run(job_id)
+            return
+
+        with self._lock:
+            if job_id in self._queued:
+                return
+            self._queued.add(job_id)
+        self._executor.submit(self._run_in_worker, job_id)
+
+    def resume_pending(self):
+        """Claim and re-queue jobs left unfinished by a dead process. Returns how many."""
+        stale_before = timezone.now() - timedelta(seconds=getattr(settings, 'RESUME_JOB_STALE_SECONDS', 600))
+        pending = (
+            ResumeJob.objects.exclude(stage__in=ResumeJob.TERMINAL_STAGES)
+            .filter(updated_at__lt=stale_before)
+            .order_by('created_at').values_list('id', 'stage', 'updated_at')
+        )
+        claimed = [job_id for job_id, stage, updated_at in pending if claim_job(job_id, stage, updated_at)]
+        for job_id in claimed:
+            self.submit(job_id)
+        if claimed:
+            print(f"[ResumeJobs] Resuming {len(claimed)} unfinished job(s)")
+        return len(claimed)
+
+    def start_sweeper(self, interval):
+        """Look for abandoned jobs every `interval` seconds in a background thread"""
+        threading.Thread(target=self._sweep, args=(interval,), name='resume-job-sweeper', daemon=True).start()
+
+    def _sweep(self, interval):
+        while True:
+            time.sleep(interval)
+            close_old_connections()
+            try:
+                self.resume_pending()
+            except Exception as e:
+                print(f"[ResumeJobs] Sweep failed: {e}")
+
+    def _run_in_worker(self, job_id):
+        close_old_connections()
+        try:
+            self.run(job_id)
+        finally:
+            with self._lock:
+                self._queued.discard(job_id)
+            close_old_connections()
+
+    def run(self, job_id):
+        """Process one job through its remaining stages"""
+        job = ResumeJob.objects.filter(pk=job_id).first()
+        if job is None or job.is_finished:
+            return
+
+        try:
+            service = MistralOCRService()
+
+            if not job.extracted_text:
+                with job.file.open('rb') as document:
+                    text = service.extract_text_from_document(document, job.mime_type)
+                record_stage(job, ResumeJob.STAGE_TEXT_EXTRACTED, extracted_text=text)
+
+            steps = {}
+            if job.kind in (ResumeJob.KIND_EXTRACT, ResumeJob.KIND_FULL) and 'text' not in job.result:
+                steps['text'] = (ResumeJob.STAGE_PARSED, service.parse_resume_text)
+            if job.kind in (ResumeJob.KIND_ANALYZE, ResumeJob.KIND_FULL) and 'analysis' not in job.result:
+                steps['analysis'] = (ResumeJob.STAGE_ANALYSED, service.analyze_resume_text)
+
+            # Extraction and analysis only need the text, so run them side by side
+            # and record each stage as it finishes
+            with ThreadPoolExecutor(max_workers=max(len(steps), 1)) as executor:
+                futures = {executor.submit(step, job.extracted_text): key for key, (_, step) in steps.items()}
+                for future in as_completed(futures):
+                    key = futures[future]
+                    record_stage(job, steps[key][0], result={**job.result, key: future.result()})
+
+            self._finish(job, ResumeJob.STAGE_COMPLETED)
+
+        except Exception as e:
+            print(f"[ResumeJobs] Job {job_id} failed: {e}")
+            self._finish(job, ResumeJob.STAGE_FAILED, error=str(e))
+
+    def _finish(self, job, stage, **fields):
+        if job.file:
+            job.file.delete(save=False)
+        record_stage(job, stage, file=None, **fields)
+
+
+# Singleton instance
+_job_runner = None
+_job_runner_lock = threading.Lock()
+
+
+def get_job_runner():
+    """
+    Get or create the job runner. On first use it re-queues unfinished jobs
+    and starts sweeping for abandoned ones; gunicorn's post_fork calls this
+    so every worker does so at startup rather than on its first upload.
+    """
+    global _job_runner
+    if _job_runner is None:
+        with _job_runner_lock:
+            if _job_runner is None:
+                runner = ResumeJobRunner()
+                runner.resume_pending()
+                interval = getattr(settings, 'RESUME_JOB_SWEEP_SECONDS', 60)
+                if interval and not getattr(settings, 'RESUME_JOBS_EAGER', False):
+                    runner.start_sweeper(interval)
+                _job_runner = runner
+    return _job_runner
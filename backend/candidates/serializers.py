@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Person, Education, Skill, Achievement, ResumeReport
+from .models import Person, Education, Skill, Achievement, ResumeReport, ResumeJob
 
 class EducationSerializer(serializers.ModelSerializer):
     class Meta:
@@ -17,29 +17,40 @@ class AchievementSerializer(serializers.ModelSerializer):
         fields = ['title', 'description', 'date']
 
 class PersonSerializer(serializers.ModelSerializer):
+    """
+    Nested CV save. Upserts the Person by email; each child list that is sent
+    replaces that person's existing rows with one bulk insert.
+    """
     education = EducationSerializer(many=True, required=False)
     skills = SkillSerializer(many=True, required=False)
     achievements = AchievementSerializer(many=True, required=False)
 
+    CHILDREN = {
+        'education': Education,
+        'skills': Skill,
+        'achievements': Achievement,
+    }
+
     class Meta:
         model = Person
-        fields = ['first_name', 'last_name', 'email', 'phone', 'linkedin_url', 'github_url', 'portfolio_url', 'education', 'skills', 'achievements']
+        fields = ['first_name', 'last_name', 'email', 'phone', 'linkedin_url', 'github_url', 'portfolio_url', 'resume_text', 'education', 'skills', 'achievements']
+        # Re-saving a known candidate updates it instead of failing the unique check
+        extra_kwargs = {'email': {'validators': []}}
 
     def create(self, validated_data):
-        education_data = validated_data.pop('education', [])
-        skills_data = validated_data.pop('skills', [])
-        achievements_data = validated_data.pop('achievements', [])
-
-        person = Person.objects.create(**validated_data)
+        children = {name: validated_data.pop(name, None) for name in self.CHILDREN}
+        email = validated_data.pop('email')
 
-        for edu_item in education_data:
-            Education.objects.create(person=person, **edu_item)
+        person, self.created = Person.objects.update_or_create(email=email, defaults=validated_data)
 
-        for skill_item in skills_data:
-            Skill.objects.create(person=person, **skill_item)
-
-        for achieve_item in achievements_data:
-            Achievement.objects.create(person=person, **achieve_item)
+        for name, model in self.CHILDREN.items():
+            items = children[name]
+            if items is None:
+                continue
+            if not self.created:
+                model.objects.filter(person=person).delete()
+            if items:
+                model.objects.bulk_create([model(person=person, **item) for item in items])
 
         return person
 
@@ -78,3 +89,27 @@ class ResumeReportSerializer(serializers.ModelSerializer):
             'created_at',
             'updated_at',
         ]
+
+
+class ResumeJobSerializer(serializers.ModelSerializer):
+    """
+    Read-only view of a background resume job: current stage, stage events,
+    and the result (or error) once it has finished.
+    """
+    finished = serializers.BooleanField(source='is_finished', read_only=True)
+
+    class Meta:
+        model = ResumeJob
+        fields = [
+            'id',
+            'kind',
+            'stage',
+            'finished',
+            'file_name',
+            'events',
+            'result',
+            'error',
+            'created_at',
+            'updated_at',
+        ]
+        read_only_fields = fields
@@ -0,0 +1,217 @@
+"""
+Local skill extraction
+Canonical skill dictionary (skill_dictionary.json: name, category, aliases)
+compiled into an Aho-Corasick automaton over word tokens, so every skill and
+alias in a resume is found in one linear pass over the text.
+"""
+
+import json
+import os
+import re
+import threading
+from collections import deque
+from django.conf import settings
+
+
+DEFAULT_DICTIONARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'skill_dictionary.json')
+
+
+class _TokenCharacters(dict):
+    """
+    str.translate table: letters, digits and the characters skill names use
+    (c++, c#, node.js, .net) map to themselves, anything else to a space.
+    Filled in lazily per character seen.
+    """
+
+    def __missing__(self, code):
+        self[code] = code if chr(code).isalnum() or chr(code) in '+#.' else ord(' ')
+        return self[code]
+
+
+_TOKEN_CHARACTERS = _TokenCharacters()
+# A dot only joins a token when a letter/digit follows ("node.js", ".net", not "python.")
+_LOOSE_DOT_RE = re.compile(r'\.(?![^\W_])')
+
+
+def tokenize(text):
+    """Lower-cased word tokens; spaces, hyphens, slashes and punctuation separate them"""
+    return _LOOSE_DOT_RE.sub(' ', text.lower().translate(_TOKEN_CHARACTERS)).split()
+
+
+class SkillMatcher:
+    """
+    Multi-pattern skill matcher.
+
+    Patterns are token sequences, so matches always fall on word boundaries
+    ("java" never matches inside "javascript") and spacing/hyphenation
+    differences ("scikit learn", "scikit-learn") don't matter. Overlapping
+    matches resolve leftmost-longest ("react native" beats "react").
+
+    Args:
+        entries: list of {"name", "category", "aliases", optional "match_name"}.
+            match_name=false leaves out names that are ordinary words or
+            letters ("Go", "R") so only their aliases match.
+    """
+
+    def __init__(self, entries):
+        self.skills = []  # index -> {'name', 'category'}
+        self._goto = [{}]
+        self._output = [()]  # state -> ((pattern length, skill index), ...), longest first
+        self._lookup = {}  # pattern tokens -> skill index
+
+        for entry in entries:
+            index = len(self.skills)
+            self.skills.append({'name': entry['name'], 'category': entry.get('category')})
+            patterns = ([entry['name']] if entry.get('match_name', True) else []) + entry.get('aliases', [])
+            for pattern in patterns:
+                self._add(tuple(tokenize(pattern)), index)
+            # The name always resolves in `canonical`, even when it isn't matched in text
+            self._lookup.setdefault(tuple(tokenize(entry['name'])), index)
+
+        self._vocabulary = {token for state in self._goto for token in state}
+        self._fail = self._build_fail_links()
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def _add(self, tokens, index):
+        if not tokens or tokens in self._lookup:
+            return  # the first entry to claim a pattern keeps it
+        self._lookup[tokens] = index
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._output.append(())
+                self._goto[state][token] = next_state
+            state = next_state
+        self._output[state] = ((len(tokens), index),)
+
+    def _build_fail_links(self):
+        fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = self._goto[fallback].get(token, 0)
+                self._output[next_state] += self._output[fail[next_state]]
+        return fail
+
+    def find(self, text):
+        """
+        Returns:
+            {skill index: occurrences}, in order of first occurrence
+        """
+        found = {}
+        for start, length, index in self._spans(tokenize(text or '')):
+            found[index] = found.get(index, 0) + 1
+        return found
+
+    def _spans(self, tokens):
+        """Matches in `tokens` as (start, length, skill index), leftmost-longest, non-overlapping"""
+        goto, fail, output, vocabulary = self._goto, self._fail, self._output, self._vocabulary
+        matches = []
+        state = 0
+        previous = -1
+        # Only tokens that occur in some pattern can advance the automaton; any
+        # other token sends it back to the root
+        for position, token in [(i, token) for i, token in enumerate(tokens) if token in vocabulary]:
+            if position != previous + 1:
+                state = 0
+            previous = position
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for length, index in output[state]:
+                matches.append((position - length + 1, -length, index))
+
+        # Leftmost-longest, non-overlapping
+        spans = []
+        covered_until = 0
+        for start, negative_length, index in sorted(matches):
+            if start < covered_until:
+                continue
+            covered_until = start - negative_length
+            spans.append((start, -negative_length, index))
+        return spans
+
+    def extract(self, text):
+        """Skills mentioned in `text` as [{'name', 'category'}] (canonical names)"""
+        return [dict(self.skills[index]) for index in self.find(text)]
+
+    def canonical(self, name):
+        """Dictionary entry for a skill name or alias, or None if unknown"""
+        index = self._lookup.get(tuple(tokenize(name or '')))
+        return dict(self.skills[index]) if index is not None else None
+
+    def merge(self, *skill_lists):
+        """
+        Union of skill lists ([{'name', 'category'}, ...]) with known skills
+        renamed to their canonical form, de-duplicated, in first-seen order.
+        A missing category is filled in from the dictionary.
+        """
+        merged = {}
+        for skills in skill_lists:
+            for skill in skills or []:
+                if not isinstance(skill, dict) or not skill.get('name'):
+                    continue
+                known = self.canonical(skill['name'])
+                key = known['name'] if known else ' '.join(tokenize(skill['name'])) or skill['name']
+                if key in merged:
+                    continue
+                if known:
+                    skill = dict(skill, name=known['name'], category=skill.get('category') or known['category'])
+                merged[key] = skill
+        return list(merged.values())
+
+    def skills_text(self, text):
+        """
+        `text` plus the canonical (lower-case) names of skills it only mentions
+        by alias, so "js" and "k8s" count as the terms the recommendation model
+        knows ("js" -> "js javascript"). Names already in the text are not
+        repeated, so text without aliases is returned unchanged and keeps its
+        term weights.
+        """
+        words = set(tokenize(text or ''))
+        names = []
+        for index in self.find(text):
+            name = self.skills[index]['name']
+            if not words.issuperset(tokenize(name)):
+                names.append(name.lower())
+        return ' '.join([text or ''] + names).strip()
+
+    def canonical_text(self, text):
+        """
+        Tokens of `text` with every skill mention replaced by the skill's
+        (lower-case) name, so "JS, k8s" and "javascript kubernetes" read the same.
+        """
+        tokens = tokenize(text or '')
+        resolved = []
+        position = 0
+        for start, length, index in self._spans(tokens):
+            resolved += tokens[position:start] + tokenize(self.skills[index]['name'])
+            position = start + length
+        return ' '.join(resolved + tokens[position:])
+
+
+_skill_matcher = None
+_skill_matcher_lock = threading.Lock()
+
+
+def get_skill_matcher():
+    """Shared matcher built from SKILL_DICTIONARY_PATH on first use"""
+    global _skill_matcher
+    if _skill_matcher is None:
+        with _skill_matcher_lock:
+            if _skill_matcher is None:
+                _skill_matcher = SkillMatcher.from_file(
+                    getattr(settings, 'SKILL_DICTIONARY_PATH', None) or DEFAULT_DICTIONARY_PATH)
+    return _skill_matcher
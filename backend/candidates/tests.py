@@ -1,3 +1,1283 @@
-from django.test import TestCase
+import base64
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from unittest.mock import patch, MagicMock
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .models import OCRCacheEntry, ResumeJob
+from .ocr_cache import ocr_cache, content_hash
+from .ocr_service import MistralOCRService
+
+
+def _ocr_response(*pages):
+    response = MagicMock()
+    response.ok = True
+    response.json.return_value = {'pages': [{'markdown': page} for page in pages]}
+    return response
+
+
+def _make_pdf(pages):
+    """Minimal PDF with one Helvetica text page per string (None = page without a text layer)"""
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', None, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    kids = []
+    for text in pages:
+        lines = (text or '').split('\n')
+        ops = ''.join(f'({line}) Tj 0 -14 Td ' for line in lines) if text else ''
+        stream = f'BT /F1 11 Tf 50 750 Td {ops}ET'.encode('latin-1')
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream))
+        objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+                       b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % len(objects))
+        kids.append(len(objects))
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (b' '.join(b'%d 0 R' % k for k in kids), len(kids))
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def _ocr_request_pages(call):
+    """Decode the PDF sent in a mocked OCR request and return its page texts"""
+    from pypdf import PdfReader
+    data_url = json.loads(call.kwargs['data'])['document']['document_url']
+    pdf = base64.b64decode(data_url.split(',', 1)[1])
+    return [page.extract_text() for page in PdfReader(io.BytesIO(pdf)).pages]
+
+
+@patch.dict(os.environ, {'MISTRAL_API_KEY': 'test-key'})
+class OCRCacheTests(TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.pdf')
+        with os.fdopen(handle, 'wb') as f:
+            f.write(b'%PDF-1.4 resume bytes')
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_identical_upload_skips_ocr(self):
+        service = MistralOCRService()
+        with patch('candidates.ocr_service.requests.post', return_value=_ocr_response('Jane Doe', 'Python')) as post:
+            first = service.extract_text_from_document(self.path, 'application/pdf')
+            hits_before = ocr_cache.hits
+            second = service.extract_text_from_document(self.path, 'application/pdf')
+
+        self.assertEqual(post.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(ocr_cache.hits, hits_before + 1)
+        with open(self.path, 'rb') as f:
+            self.assertEqual(OCRCacheEntry.objects.get(content_hash=content_hash(f.read())).hits, 1)
+
+    @override_settings(OCR_CACHE_MAX_ENTRIES=2)
+    def test_size_cap_evicts_least_recently_used(self):
+        for i in range(3):
+            ocr_cache.set(f'{i:064d}', f'text {i}')
+        self.assertEqual(OCRCacheEntry.objects.count(), 2)
+        self.assertFalse(OCRCacheEntry.objects.filter(content_hash=f'{0:064d}').exists())
+
+    @override_settings(OCR_CACHE_TTL_SECONDS=0)
+    def test_expired_entry_is_a_miss(self):
+        ocr_cache.set('f' * 64, 'stale')
+        self.assertIsNone(ocr_cache.get('f' * 64))
+
+    def test_health_exposes_hit_rate(self):
+        response = APIClient().get(reverse('health_check'))
+        self.assertIn('hit_rate', response.data['ocr_cache'])
+
+
+@patch.dict(os.environ, {'MISTRAL_API_KEY': 'test-key'})
+class ResumePipelineTests(TestCase):
+
+    def test_ocr_once_then_extraction_and_analysis_run_concurrently(self):
+        # Both LLM stages must be in flight at the same time to pass the barrier
+        barrier = threading.Barrier(2, timeout=5)
+
+        def parse(text):
+            barrier.wait()
+            return {'personal_info': {'first_name': text}}
+
+        def analyze(text):
+            barrier.wait()
+            return {'overall_score': 80}
+
+        service = MistralOCRService()
+        with patch.object(service, 'extract_text_from_document', return_value='Jane') as extract, \
+                patch.object(service, 'parse_resume_text', side_effect=parse), \
+                patch.object(service, 'analyze_resume_text', side_effect=analyze):
+            result = service.process_full_resume('cv.pdf', 'application/pdf')
+
+        extract.assert_called_once()
+        self.assertEqual(result['text']['personal_info']['first_name'], 'Jane')
+        self.assertEqual(result['analysis']['overall_score'], 80)
+
+    def test_pipeline_endpoint_returns_both_payloads(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        f = SimpleUploadedFile('cv.pdf', b'%PDF-1.4', 'application/pdf')
+        with patch('candidates.ocr_service.MistralOCRService.process_full_resume') as m:
+            m.return_value = {'text': {'skills': []}, 'analysis': {'overall_score': 70}}
+            response = APIClient().post(reverse('resume_pipeline'), {'file': f})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data), {'text', 'analysis'})
+
+
+@patch.dict(os.environ, {'MISTRAL_API_KEY': 'test-key'})
+class StreamingUploadTests(TestCase):
+
+    def test_ocr_reads_straight_from_uploaded_file(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from .ocr_service import READ_CHUNK_SIZE
+        data = os.urandom(READ_CHUNK_SIZE * 2 + 7)  # spans chunks with a non-multiple-of-3 tail
+        upload = SimpleUploadedFile('cv.pdf', data, 'application/pdf')
+
+        with patch('candidates.ocr_service.requests.post', return_value=_ocr_response('text')) as post:
+            MistralOCRService().extract_text_from_document(upload, 'application/pdf')
+
+        body = json.loads(post.call_args.kwargs['data'])
+        self.assertEqual(body['model'], 'mistral-ocr-latest')
+        self.assertEqual(
+            body['document']['document_url'],
+            'data:application/pdf;base64,' + base64.b64encode(data).decode('ascii'),
+        )
+        self.assertTrue(OCRCacheEntry.objects.filter(content_hash=content_hash(data)).exists())
+
+
+EXPERIENCE_TEXT = (
+    'Jane Doe - Senior Backend Engineer\n'
+    'Built Django REST APIs serving 2M requests per day\n'
+    'Led migration from MySQL to PostgreSQL, cut query latency by 40%'
+)
+
+
+@patch.dict(os.environ, {'MISTRAL_API_KEY': 'test-key'})
+class PDFTextLayerTests(TestCase):
+
+    def test_born_digital_pdf_skips_remote_ocr(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        upload = SimpleUploadedFile('cv.pdf', _make_pdf([EXPERIENCE_TEXT, EXPERIENCE_TEXT]), 'application/pdf')
+        with patch('candidates.ocr_service.requests.post') as post:
+            text = MistralOCRService().extract_text_from_document(upload, 'application/pdf')
+        post.assert_not_called()
+        self.assertIn('Led migration from MySQL', text)
+
+    def test_mixed_document_ocrs_only_image_pages(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        last_page = EXPERIENCE_TEXT.replace('Senior Backend Engineer', 'Tech Lead')
+        upload = SimpleUploadedFile('cv.pdf', _make_pdf([EXPERIENCE_TEXT, None, last_page]), 'application/pdf')
+        response = _ocr_response('Scanned certificate')
+        with patch('candidates.ocr_service.requests.post', return_value=response) as post:
+            text = MistralOCRService().extract_text_from_document(upload, 'application/pdf')
+
+        post.assert_called_once()
+        self.assertEqual(len(_ocr_request_pages(post.call_args)), 1)
+        pages = text.split('\n\n')
+        self.assertEqual(pages[1], 'Scanned certificate')
+        self.assertIn('Jane Doe', pages[0])
+        self.assertIn('Jane Doe', pages[2])
+
+    def test_density_check_rejects_sparse_or_undecodable_text(self):
+        from .pdf_text import page_text_is_usable
+        self.assertTrue(page_text_is_usable(EXPERIENCE_TEXT))
+        self.assertFalse(page_text_is_usable('Page 1'))
+        self.assertFalse(page_text_is_usable('(cid:12)(cid:44)(cid:71) ' * 20))
+
+
+@patch.dict(os.environ, {'MISTRAL_API_KEY': 'test-key'})
+@override_settings(PDF_TEXT_LAYER_ENABLED=False, RESUME_OCR_MAX_WORKERS=3)
+class PageParallelOCRTests(TestCase):
+
+    def _fake_ocr(self, *args, **kwargs):
+        return _ocr_response(*('OCR ' + text for text in _ocr_request_pages(MagicMock(args=args, kwargs=kwargs))))
+
+    def test_pages_are_ocred_concurrently_and_reassembled_in_order(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        barrier = threading.Barrier(3, timeout=5)
+
+        def fake_ocr(*args, **kwargs):
+            barrier.wait()
+            return self._fake_ocr(*args, **kwargs)
+
+        upload = SimpleUploadedFile('cv.pdf', _make_pdf(['one', 'two', 'three']), 'application/pdf')
+        with patch('candidates.ocr_service.requests.post', side_effect=fake_ocr) as post:
+            text = MistralOCRService().extract_text_from_document(upload, 'application/pdf')
+
+        self.assertEqual(post.call_count, 3)
+        self.assertEqual([page.strip() for page in text.split('\n\n')], ['OCR one', 'OCR two', 'OCR three'])
+
+    @override_settings(RESUME_OCR_MAX_PAGES=2)
+    def test_page_cap_stops_after_max_pages(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        upload = SimpleUploadedFile('cv.pdf', _make_pdf(['one', 'two', 'portfolio', 'more']), 'application/pdf')
+        with patch('candidates.ocr_service.requests.post', side_effect=self._fake_ocr) as post:
+            text = MistralOCRService().extract_text_from_document(upload, 'application/pdf')
+        self.assertEqual(post.call_count, 2)
+        self.assertNotIn('portfolio', text)
+
+    def test_revised_cv_only_reocrs_changed_pages(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        service = MistralOCRService()
+        with patch('candidates.ocr_service.requests.post', side_effect=self._fake_ocr) as post:
+            service.extract_text_from_document(
+                SimpleUploadedFile('v1.pdf', _make_pdf(['one', 'two']), 'application/pdf'), 'application/pdf')
+            post.reset_mock()
+            text = service.extract_text_from_document(
+                SimpleUploadedFile('v2.pdf', _make_pdf(['one', 'two revised']), 'application/pdf'), 'application/pdf')
+
+        post.assert_called_once()
+        self.assertIn('OCR one', text)
+        self.assertIn('OCR two revised', text)
+
+
+def _make_photo(size=(4000, 3000), orientation=None):
+    """Noisy RGB JPEG roughly like a phone photo of a CV"""
+    from PIL import Image
+    image = Image.effect_noise(size, 40).convert('RGB')
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=95, exif=exif)
+    return buffer.getvalue()
+
+
+@patch.dict(os.environ, {'MISTRAL_API_KEY': 'test-key'})
+class ImagePreprocessTests(TestCase):
+
+    def _ocr_payload(self, call):
+        document_url = json.loads(call.kwargs['data'])['document']['document_url']
+        header, encoded = document_url.split(',', 1)
+        return header, base64.b64decode(encoded)
+
+    def test_photo_is_normalised_before_ocr(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        data = _make_photo(orientation=6)  # rotated 90°: stored landscape, displayed portrait
+        upload = SimpleUploadedFile('cv.jpg', data, 'image/jpeg')
+
+        with patch('candidates.ocr_service.requests.post', return_value=_ocr_response('text')) as post:
+            MistralOCRService().extract_text_from_document(upload, 'image/jpeg')
+
+        from PIL import Image
+        header, payload = self._ocr_payload(post.call_args)
+        image = Image.open(io.BytesIO(payload))
+        self.assertEqual(header, 'data:image/jpeg;base64')
+        self.assertEqual(image.mode, 'L')
+        self.assertLess(image.width, image.height)
+        self.assertLessEqual(image.height, round(11.69 * 200))
+        self.assertLess(len(payload), len(data))
+        # The cache is keyed on the original upload, not the normalised image
+        self.assertTrue(OCRCacheEntry.objects.filter(content_hash=content_hash(data)).exists())
+
+    @override_settings(OCR_IMAGE_PREPROCESS_ENABLED=False)
+    def test_preprocessing_can_be_disabled(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        data = _make_photo(size=(800, 600))
+        with patch('candidates.ocr_service.requests.post', return_value=_ocr_response('text')) as post:
+            MistralOCRService().extract_text_from_document(SimpleUploadedFile('cv.jpg', data, 'image/jpeg'), 'image/jpeg')
+        self.assertEqual(self._ocr_payload(post.call_args)[1], data)
+
+    def test_undecodable_image_is_sent_unchanged(self):
+        from .image_preprocess import preprocess_upload
+        self.assertEqual(preprocess_upload(b'not an image'), (b'not an image', None))
+
+
+@patch.dict(os.environ, {'MISTRAL_API_KEY': 'test-key'})
+@override_settings(RESUME_JOBS_EAGER=True, MEDIA_ROOT=tempfile.mkdtemp())
+class ResumeJobTests(TestCase):
+
+    def _upload(self, kind='full'):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        upload = SimpleUploadedFile('cv.pdf', _make_pdf([EXPERIENCE_TEXT]), 'application/pdf')
+        with self.captureOnCommitCallbacks(execute=True):
+            return APIClient().post(reverse('resume_job_create'), {'file': upload, 'kind': kind})
+
+    @patch('candidates.ocr_service.MistralOCRService.analyze_resume_text', return_value={'overall_score': 80})
+    @patch('candidates.ocr_service.MistralOCRService.parse_resume_text', return_value={'skills': [{'name': 'Django'}]})
+    def test_job_runs_through_stages(self, parse, analyze):
+        response = self._upload()
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['stage'], 'received')
+
+        job = APIClient().get(response.data['status_url']).data
+        stages = [event['stage'] for event in job['events']]
+        self.assertEqual(stages[:2], ['received', 'text_extracted'])
+        self.assertCountEqual(stages[2:4], ['parsed', 'analysed'])
+        self.assertEqual(stages[-1], 'completed')
+        self.assertEqual(job['result'], {'text': {'skills': [{'name': 'Django'}]}, 'analysis': {'overall_score': 80}})
+        self.assertFalse(ResumeJob.objects.get(pk=job['id']).file)  # upload removed once done
+
+    @patch('candidates.ocr_service.MistralOCRService.parse_resume_text', side_effect=Exception('Mistral Chat API Error: 503'))
+    def test_failure_is_recorded_on_the_job(self, parse):
+        response = self._upload(kind='extract')
+        job = ResumeJob.objects.get(pk=response.data['job_id'])
+        self.assertEqual(job.stage, 'failed')
+        self.assertIn('503', job.error)
+        self.assertIn('Led migration', job.extracted_text)
+
+    @patch('candidates.ocr_service.MistralOCRService.analyze_resume_text', return_value={'overall_score': 75})
+    @patch('candidates.ocr_service.MistralOCRService.extract_text_from_document')
+    def test_unfinished_job_resumes_from_last_stage(self, extract, analyze):
+        from datetime import timedelta
+        from django.utils import timezone
+        from .resume_jobs import ResumeJobRunner
+        job = ResumeJob.objects.create(kind='analyze', file_name='cv.pdf', mime_type='application/pdf',
+                                       stage='text_extracted', extracted_text=EXPERIENCE_TEXT)
+        ResumeJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(ResumeJobRunner(max_workers=1).resume_pending(), 1)
+
+        job.refresh_from_db()
+        extract.assert_not_called()
+        self.assertEqual(job.stage, 'completed')
+        self.assertEqual(job.result, {'analysis': {'overall_score': 75}})
+
+    @patch('candidates.ocr_service.MistralOCRService.analyze_resume_text', return_value={'overall_score': 80})
+    def test_status_has_retry_after_until_finished(self, analyze):
+        job = ResumeJob.objects.create(kind='analyze', file_name='cv.pdf', mime_type='application/pdf')
+        response = APIClient().get(reverse('resume_job_detail', args=[job.id]))
+        self.assertEqual(response['Retry-After'], '2')
+
+        finished = APIClient().get(self._upload(kind='analyze').data['status_url'])
+        self.assertEqual(finished.data['stage'], 'completed')
+        self.assertFalse(finished.has_header('Retry-After'))
+
+    def test_stale_job_is_claimed_once(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from .resume_jobs import ResumeJobRunner
+        job = ResumeJob.objects.create(kind='analyze', file_name='cv.pdf', mime_type='application/pdf')
+        ResumeJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+
+        runners = [ResumeJobRunner(max_workers=1), ResumeJobRunner(max_workers=1)]
+        with patch.object(ResumeJobRunner, 'submit') as submit:
+            claimed = [runner.resume_pending() for runner in runners]
+        self.assertEqual(claimed, [1, 0])
+        submit.assert_called_once_with(job.id)
+
+    def test_rejects_unknown_kind(self):
+        self.assertEqual(self._upload(kind='translate').status_code, 400)
+
+
+LLM_OUTPUT_CORPUS = os.path.join(os.path.dirname(__file__), 'testdata', 'llm_outputs.json')
+
+
+@patch.dict(os.environ, {'MISTRAL_API_KEY': 'test-key'})
+class LLMJSONExtractionTests(TestCase):
+
+    def _schemas(self):
+        from interview.analysis_service import INTERVIEW_ANALYSIS_SCHEMA
+        from .ocr_service import RESUME_ANALYSIS_SCHEMA, RESUME_EXTRACTION_SCHEMA
+        return {
+            'analysis': RESUME_ANALYSIS_SCHEMA,
+            'extraction': RESUME_EXTRACTION_SCHEMA,
+            'interview': INTERVIEW_ANALYSIS_SCHEMA,
+        }
+
+    def test_corpus(self):
+        from .llm_json import extract_json, LLMJSONError
+        schemas = self._schemas()
+        with open(LLM_OUTPUT_CORPUS, encoding='utf-8') as f:
+            corpus = json.load(f)
+
+        for case in corpus:
+            with self.subTest(case['name']):
+                if 'error' in case:
+                    with self.assertRaisesRegex(LLMJSONError, case['error']):
+                        extract_json(case['raw'], schemas[case['schema']])
+                else:
+                    self.assertEqual(extract_json(case['raw'], schemas[case['schema']]), case['expected'])
+
+    def test_analysis_accepts_literal_newlines(self):
+        with open(LLM_OUTPUT_CORPUS, encoding='utf-8') as f:
+            raw = next(case['raw'] for case in json.load(f) if case['name'] == 'literal_newline_in_fenced_string')
+        response = MagicMock(ok=True)
+        response.json.return_value = {'choices': [{'message': {'content': raw}}]}
+        with patch('candidates.ocr_service.requests.post', return_value=response):
+            analysis = MistralOCRService().analyze_resume_text('resume text')
+        self.assertTrue(analysis['improved_bullet_example'].startswith("Before: 'Worked on APIs'\nAfter:"))
+
+
+@patch.dict(os.environ, {'MISTRAL_API_KEY': 'test-key'})
+class OutputSchemaTests(TestCase):
+
+    def test_analysis_request_is_schema_constrained_and_bounded(self):
+        from .ocr_service import RESUME_ANALYSIS_OUTPUT
+        with open(LLM_OUTPUT_CORPUS, encoding='utf-8') as f:
+            raw = next(case['raw'] for case in json.load(f) if case['name'] == 'clean')
+        response = MagicMock(ok=True)
+        response.json.return_value = {'choices': [{'message': {'content': raw}}]}
+        with patch('candidates.ocr_service.requests.post', return_value=response) as post:
+            MistralOCRService().analyze_resume_text('resume text')
+
+        payload = post.call_args.kwargs['json']
+        self.assertEqual(payload['response_format']['type'], 'json_schema')
+        self.assertEqual(payload['response_format']['json_schema']['schema'], RESUME_ANALYSIS_OUTPUT.json_schema())
+        self.assertEqual(payload['max_tokens'], RESUME_ANALYSIS_OUTPUT.max_tokens())
+        self.assertNotIn('"overall_score": 85', payload['messages'][0]['content'])  # no example JSON in the prompt
+
+    def test_max_tokens_covers_a_response_at_every_cap(self):
+        from .llm_schema import CHARS_PER_TOKEN, Array, Object, Integer
+        from .ocr_service import RESUME_ANALYSIS_OUTPUT
+
+        def largest(field):
+            if isinstance(field, Object):
+                return {name: largest(child) for name, child in field.fields.items()}
+            if isinstance(field, Array):
+                return [largest(field.items)] * field.max_items
+            if isinstance(field, Integer):
+                return field.maximum
+            return 'x' * field.max_length
+
+        biggest = json.dumps(largest(RESUME_ANALYSIS_OUTPUT.root), separators=(',', ':'))
+        self.assertLessEqual(len(biggest) / CHARS_PER_TOKEN, RESUME_ANALYSIS_OUTPUT.max_tokens())
+
+    def test_field_types_must_size_their_output(self):
+        from .llm_schema import Field
+
+        class Boolean(Field):
+            json_type = 'boolean'
+
+        with self.assertRaises(TypeError):
+            Boolean()
+
+    def test_out_of_range_score_fails_validation(self):
+        from .llm_json import extract_json, LLMJSONError
+        from .ocr_service import RESUME_ANALYSIS_SCHEMA
+        with open(LLM_OUTPUT_CORPUS, encoding='utf-8') as f:
+            raw = next(case['raw'] for case in json.load(f) if case['name'] == 'clean')
+        with self.assertRaisesRegex(LLMJSONError, 'ats_score'):
+            extract_json(raw.replace('"ats_score": 72', '"ats_score": 720'), RESUME_ANALYSIS_SCHEMA)
+
+
+OCR_MARKDOWN_PAGES = [
+    "# JANE DOE\n![img-0.jpeg](img-0.jpeg)\njane@example.com | [github.com/janedoe](https://github.com/janedoe)\n\n"
+    "## EXPERIENCE\n**Senior Backend Engineer**, Acme    2019 - 2023\n- Built   Django REST APIs\n\n\n\n"
+    "| Skill | Level |\n|---|---|\n| Python | Expert |\n\nJane Doe - Curriculum Vitae\nPage 1 of 3",
+    "## EDUCATION\nBSc Computer Science, University of Leeds, 2015\n\nJane Doe - Curriculum Vitae\nPage 2 of 3",
+    "## HOBBIES\nChess, hiking and film photography on weekends\n\nJane Doe - Curriculum Vitae\nPage 3 of 3",
+]
+
+
+class TextNormalisationTests(TestCase):
+
+    def test_strips_markup_and_repeated_page_furniture(self):
+        from .text_normalise import normalise_resume_pages
+        text, stats = normalise_resume_pages(OCR_MARKDOWN_PAGES, max_tokens=0)
+
+        for noise in ('![', '|---|', '**', '#', 'Page 1 of 3', 'Curriculum Vitae', '    '):
+            self.assertNotIn(noise, text)
+        self.assertIn('https://github.com/janedoe', text)
+        self.assertIn('Python - Expert', text)
+        self.assertIn('Chess', text)
+        self.assertNotIn('\n\n\n', text)
+        self.assertLess(stats['tokens_after'], stats['tokens_before'])
+        self.assertGreater(stats['reduction'], 0)
+
+    def test_two_page_cv_keeps_repeated_dates(self):
+        from .text_normalise import normalise_resume_pages
+        pages = [
+            "## EXPERIENCE\nSenior Engineer, Acme\n2019 - 2023\nBuilt APIs\nEngineer, Initech\n2015 - 2019",
+            "Led a team of four\n2019 - 2023\n## EDUCATION\nBSc, Leeds\n2015 - 2019\nPage 2 of 2",
+        ]
+        text, _ = normalise_resume_pages(pages, max_tokens=0)
+        self.assertEqual(text.count('2019 - 2023'), 2)
+        self.assertEqual(text.count('2015 - 2019'), 2)
+        self.assertNotIn('Page 2', text)
+
+    def test_only_same_edge_repeats_are_stripped(self):
+        from .text_normalise import remove_repeated_edges
+        pages = [
+            "Jane Doe\nSummary\nline a\nline b\nline c\nline d\nJane Doe | CV | 1/3",
+            "Contact\nline e\nline f\nline g\nline h\nJane Doe\nJane Doe | CV | 2/3",
+            "Jane Doe\nline i\nline j\nline k\nline l\nline m\nJane Doe | CV | 3/3",
+        ]
+        kept = remove_repeated_edges(pages)
+        self.assertTrue(all('Jane Doe | CV' not in '\n'.join(lines) for lines in kept))
+        self.assertEqual(['Jane Doe' in lines for lines in kept], [True, True, True])
+
+    def test_budget_drops_hobbies_before_core_sections(self):
+        from .text_normalise import normalise_resume_pages
+        text, stats = normalise_resume_pages(OCR_MARKDOWN_PAGES, max_tokens=60)
+
+        self.assertEqual(stats['dropped_sections'], ['HOBBIES'])
+        self.assertNotIn('Chess', text)
+        for kept in ('jane@example.com', 'Django REST APIs', 'University of Leeds'):
+            self.assertIn(kept, text)
+        self.assertLessEqual(stats['tokens_after'], 60)
+
+
+def _chat_response(content):
+    response = MagicMock(ok=True)
+    response.json.return_value = {'choices': [{'message': {'content': content}}]}
+    return response
+
+
+@patch.dict(os.environ, {'MISTRAL_API_KEY': 'test-key'})
+class ModelRouterTests(TestCase):
+
+    def test_rules_pick_tier_by_task_size_and_latency(self):
+        from .model_router import ModelRouter
+        router = ModelRouter()
+        short_cv, long_cv = 'x' * 2000, 'x' * 8000
+
+        self.assertEqual(router.route('extraction', long_cv), 'small')
+        self.assertEqual(router.route('analysis', short_cv), 'small')
+        self.assertEqual(router.route('analysis', long_cv), 'large')
+
+        for _ in range(5):
+            router.record('analysis', 'large', 55.0)
+        self.assertEqual(router.route('analysis', long_cv), 'small')
+        self.assertEqual(router.stats()['served'], {'analysis:large': 5})
+
+    def test_slow_tier_is_retried_once_its_latency_expires(self):
+        from .model_router import ModelRouter
+        router, long_cv = ModelRouter(), 'x' * 8000
+        for _ in range(5):
+            router.record('analysis', 'large', 55.0)
+        self.assertEqual(router.route('analysis', long_cv), 'small')
+
+        with patch('candidates.model_router.time.monotonic', return_value=time.monotonic() + 301):
+            self.assertEqual(router.route('analysis', long_cv), 'large')
+            router.record('analysis', 'large', 4.0)
+            self.assertEqual(router.stats()['latency_seconds']['large'], 4.0)
+
+    @override_settings(LLM_ROUTING_RULES=[{'tier': 'large'}])
+    def test_rules_come_from_settings(self):
+        from .model_router import ModelRouter
+        self.assertEqual(ModelRouter().route('extraction', 'short'), 'large')
+
+    def test_invalid_extraction_escalates_to_large_model(self):
+        from .model_router import ModelRouter
+        valid = json.dumps({'personal_info': {'first_name': 'Jane'}, 'education': [], 'skills': [], 'achievements': []})
+        responses = [_chat_response('{"skills": []}'), _chat_response(valid)]
+        router = ModelRouter()
+
+        with patch('candidates.ocr_service.model_router', router), \
+                patch('candidates.ocr_service.requests.post', side_effect=responses) as post:
+            data = MistralOCRService().parse_resume_text('Jane Doe, Python developer')
+
+        self.assertEqual(data['personal_info']['first_name'], 'Jane')
+        self.assertEqual([c.kwargs['json']['model'] for c in post.call_args_list],
+                         ['mistral-small-latest', 'mistral-large-latest'])
+        stats = router.stats()
+        self.assertEqual(stats['served'], {'extraction:small': 1, 'extraction:large': 1})
+        self.assertEqual(stats['escalations'], {'extraction': 1})
+
+
+class SaveCVTests(TestCase):
+
+    def setUp(self):
+        from accounts.models import CustomUser
+        self.client = APIClient()
+        self.client.force_authenticate(user=CustomUser.objects.create_user(
+            username='cv', email='cv@e.com', password='Password123!'))
+
+    def _cv(self, email, size):
+        return {
+            'first_name': 'Jane', 'last_name': 'Doe', 'email': email,
+            'education': [{'degree': f'Degree {i}', 'institution': 'Leeds'} for i in range(size)],
+            'skills': [{'name': f'Skill {i}', 'category': 'Tool'} for i in range(size)],
+            'achievements': [{'title': f'Award {i}'} for i in range(size)],
+        }
+
+    def _save(self, data):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('save_cv'), data, 'json')
+        return response, len(queries)
+
+    def test_query_count_is_constant_regardless_of_list_sizes(self):
+        small, small_queries = self._save(self._cv('small@e.com', 1))
+        large, large_queries = self._save(self._cv('large@e.com', 40))
+        self.assertEqual((small.status_code, large.status_code), (201, 201))
+        self.assertEqual(small_queries, large_queries)
+
+        from .models import Person
+        person = Person.objects.get(email='large@e.com')
+        self.assertEqual((person.education.count(), person.skills.count(), person.achievements.count()), (40, 40, 40))
+
+    def test_resave_upserts_person_and_replaces_children(self):
+        from .models import Person
+        first, _ = self._save(self._cv('jane@e.com', 3))
+        _, small_update_queries = self._save(self._cv('jane@e.com', 1))
+        data = dict(self._cv('jane@e.com', 30), first_name='Janet')
+        second, large_update_queries = self._save(data)
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(first.data['person_id'], second.data['person_id'])
+        self.assertEqual(small_update_queries, large_update_queries)
+        person = Person.objects.get(email='jane@e.com')
+        self.assertEqual(person.first_name, 'Janet')
+        self.assertEqual(person.skills.count(), 30)
+        self.assertEqual(Person.objects.count(), 1)
+
+
+def _cv_text(name, email):
+    return (f'{name}\n{email}\nSenior backend engineer with eight years of experience building Django\n'
+            'services, PostgreSQL schemas and data pipelines for recruitment platforms.\nSkills: Python, Django')
+
+
+def _fake_extraction(url, **kwargs):
+    """Chat response built from the CV text in the request, like a well-behaved model"""
+    import re
+    text = kwargs['json']['messages'][1]['content']
+    email = re.search(r'\S+@\S+', text)
+    return _chat_response(json.dumps({
+        'personal_info': {'first_name': text.split()[0], 'last_name': text.split()[1],
+                          'email': email.group() if email else None},
+        'education': [{'degree': 'BSc', 'institution': 'Leeds'}],
+        'skills': [{'name': 'Python', 'category': 'Language'}, {'name': 'Django', 'category': 'Framework'}],
+        'achievements': [],
+    }))
+
+
+@patch.dict(os.environ, {'MISTRAL_API_KEY': 'test-key'})
+@override_settings(RESUME_INGEST_RATE_LIMIT=1000)
+class ResumeIngestionTests(TestCase):
+
+    def _write(self, directory, name, data):
+        path = os.path.join(directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    def test_directory_import_bulk_inserts_and_resumes_from_checkpoint(self):
+        from .ingestion import ResumeIngester
+        from .models import Person
+        directory = tempfile.mkdtemp()
+        self._write(directory, 'a/jane.pdf', _make_pdf([_cv_text('Jane Doe', 'jane@e.com')]))
+        self._write(directory, 'b/john.pdf', _make_pdf([_cv_text('John Roe', 'john@e.com')]))
+        self._write(directory, 'b/no_email.pdf', _make_pdf([_cv_text('Anon Ymous', 'no address given')]))
+        self._write(directory, 'notes.txt', b'not a CV')
+        checkpoint = os.path.join(directory, 'checkpoint.json')
+
+        with patch('candidates.ocr_service.requests.post', side_effect=_fake_extraction) as post:
+            first = ResumeIngester(processes=0, checkpoint_path=checkpoint).ingest(directory)
+            self.assertEqual(post.call_count, 3)
+            second = ResumeIngester(processes=0, checkpoint_path=checkpoint).ingest(directory)
+            self.assertEqual(post.call_count, 4)  # only the failed CV is retried
+
+        self.assertEqual((first['imported'], first['failed'], first['skipped']), (2, 1, 0))
+        self.assertEqual(first['errors'][0]['file'], os.path.join('b', 'no_email.pdf'))
+        self.assertEqual((second['imported'], second['failed'], second['skipped']), (0, 1, 2))
+        self.assertEqual(Person.objects.count(), 2)
+        self.assertEqual(
+            list(Person.objects.get(email='jane@e.com').skills.values_list('name', flat=True)),
+            ['Django', 'PostgreSQL', 'ETL', 'Python'])
+
+    def test_archive_import_updates_existing_candidates(self):
+        import zipfile
+        from .ingestion import ResumeIngester
+        from .models import Person, Skill
+        person = Person.objects.create(email='jane@e.com', first_name='J')
+        Skill.objects.create(person=person, name='COBOL')
+        archive = os.path.join(tempfile.mkdtemp(), 'cvs.zip')
+        with zipfile.ZipFile(archive, 'w') as f:
+            f.writestr('jane.pdf', _make_pdf([_cv_text('Jane Doe', 'jane@e.com')]))
+
+        with patch('candidates.ocr_service.requests.post', side_effect=_fake_extraction):
+            summary = ResumeIngester(processes=0).ingest(archive)
+
+        self.assertEqual(summary['imported'], 1)
+        person.refresh_from_db()
+        self.assertEqual(person.first_name, 'Jane')
+        self.assertEqual(sorted(person.skills.values_list('name', flat=True)), ['Django', 'ETL', 'PostgreSQL', 'Python'])
+
+    def test_ocr_cache_is_used_from_the_parent_only(self):
+        from .ingestion import ResumeIngester
+        directory = tempfile.mkdtemp()
+        data = _make_pdf([_cv_text('Jane Doe', 'jane@e.com')])
+        self._write(directory, 'jane.pdf', data)
+        threads = set()
+
+        def on_thread(method):
+            def wrapper(*args, **kwargs):
+                threads.add(threading.current_thread())
+                return method(*args, **kwargs)
+            return wrapper
+
+        with patch('candidates.ocr_service.requests.post', side_effect=_fake_extraction), \
+                patch.object(ocr_cache, 'get', on_thread(ocr_cache.get)), \
+                patch.object(ocr_cache, 'set', on_thread(ocr_cache.set)), \
+                patch.object(MistralOCRService, 'extract_text_from_document', autospec=True,
+                             side_effect=MistralOCRService.extract_text_from_document) as extract:
+            ResumeIngester(processes=0).ingest(directory)
+            ResumeIngester(processes=0).ingest(directory)
+
+        self.assertEqual(extract.call_count, 1)  # the second run reads the cache
+        self.assertEqual(OCRCacheEntry.objects.get(content_hash=content_hash(data)).hits, 1)
+        self.assertEqual(threads, {threading.main_thread()})
+
+    def test_missing_api_key_fails_before_ingesting(self):
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+        with patch.dict(os.environ, {'MISTRAL_KEY': '', 'MISTRAL_API_KEY': ''}):
+            with self.assertRaises(CommandError):
+                call_command('ingest_resumes', tempfile.mkdtemp(), processes=0)
+
+    def test_token_bucket_spaces_requests_after_the_burst(self):
+        from .ingestion import TokenBucket
+        bucket = TokenBucket(rate=20, burst=2)
+        start = time.monotonic()
+        for _ in range(4):
+            bucket.acquire()
+        # 2 from the burst, then one every 50ms
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+
+class SkillMatcherTests(TestCase):
+
+    def setUp(self):
+        from .skill_matcher import get_skill_matcher
+        self.matcher = get_skill_matcher()
+
+    def _names(self, text):
+        return [skill['name'] for skill in self.matcher.extract(text)]
+
+    def test_aliases_resolve_on_word_boundaries_longest_first(self):
+        text = ('Stack: JS, React Native, Java, ML (scikit learn), k8s on AWS, Postgres & PL/SQL. '
+                'Studied in Spring 2019; R&D go-live lead.')
+        self.assertEqual(self._names(text), [
+            'JavaScript', 'React Native', 'Java', 'Machine Learning', 'scikit-learn',
+            'Kubernetes', 'AWS', 'PostgreSQL', 'SQL',
+        ])
+        self.assertEqual(self._names('C++ and C# on .NET, Node.js'), ['C++', 'C#', '.NET', 'Node.js'])
+
+    def test_covers_the_recommendation_model_vocabulary(self):
+        from .skill_matcher import tokenize
+        path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                            'dataset', 'feature_info.json')
+        with open(path) as f:
+            vocabulary = json.load(f)['skills_features']
+        for term in ['python', 'java', 'sql', 'mysql', 'excel', 'autocad', 'quickbooks', 'linux',
+                     'machine learning', 'deep learning', 'data science', 'project management', 'ms office']:
+            self.assertIn(term, vocabulary)
+            self.assertTrue(self.matcher.extract(term), term)
+        # Canonical names feed the recommender in its own vocabulary
+        self.assertEqual(self.matcher.skills_text('ml, k8s'), 'ml, k8s machine learning kubernetes')
+        self.assertEqual(self.matcher.skills_text('js'), 'js javascript')
+        self.assertEqual(self.matcher.skills_text('python'), 'python')
+        self.assertEqual(self.matcher.skills_text('Python Excel Communication'), 'Python Excel Communication')
+        self.assertEqual(self.matcher.canonical_text('JS, k8s on AWS'), 'javascript kubernetes on aws')
+        self.assertEqual(tokenize('Machine-Learning'), ['machine', 'learning'])
+
+    def test_ranking_unchanged_without_aliases(self):
+        from .recommendation_service import RecommendationService
+        service = RecommendationService(model=_recommendation_model(RecommendationServiceTests.JOB_SKILLS))
+        for skills in ('SQL, Excel reporting', 'autocad drawing', 'python pandas'):
+            self.assertEqual(service.recommend(self.matcher.skills_text(skills), 5), service.recommend(skills, 5))
+
+    @patch.dict(os.environ, {'MISTRAL_API_KEY': 'test-key'})
+    def test_llm_is_told_detected_skills_and_results_are_merged(self):
+        content = json.dumps({'personal_info': {}, 'education': [], 'achievements': [],
+                              'skills': [{'name': 'js', 'category': None}, {'name': 'Storybook', 'category': 'Tool'}]})
+        with patch('candidates.ocr_service.requests.post', return_value=_chat_response(content)) as post:
+            data = MistralOCRService().parse_resume_text('Built Django APIs in Python with JavaScript front ends')
+
+        system_prompt = post.call_args.kwargs['json']['messages'][0]['content']
+        self.assertIn('already detected', system_prompt)
+        self.assertIn('Django, Python, JavaScript', system_prompt)
+        self.assertEqual(data['skills'], [
+            {'name': 'Django', 'category': 'Framework'},
+            {'name': 'Python', 'category': 'Language'},
+            {'name': 'JavaScript', 'category': 'Language'},
+            {'name': 'Storybook', 'category': 'Tool'},
+        ])
+
+
+RESUME_FIXTURES = os.path.join(os.path.dirname(__file__), 'testdata', 'resume_fixtures.json')
+
+
+class ContactFastPathTests(TestCase):
+
+    def setUp(self):
+        with open(RESUME_FIXTURES, encoding='utf-8') as f:
+            self.fixtures = json.load(f)
+
+    def test_fixture_contact_fields_and_education_dates(self):
+        from .contact_extractor import CONTACT_FIELDS, find_contact_fields, find_education_dates, assign_education_dates
+        for fixture in self.fixtures:
+            with self.subTest(fixture['name']):
+                expected = fixture['expected']
+                found = find_contact_fields(fixture['text'])
+                self.assertEqual(found, {name: expected['personal_info'][name] for name in CONTACT_FIELDS
+                                         if expected['personal_info'][name]})
+
+                ranges = find_education_dates(fixture['text'])
+                if ranges is None:
+                    continue  # left to the LLM
+                # Entries in reverse order: dates follow the institution, not the position
+                entries = [{'degree': e['degree'], 'institution': e['institution']} for e in expected['education']][::-1]
+                assign_education_dates(entries, fixture['text'], ranges)
+                self.assertEqual(entries, expected['education'][::-1])
+
+        # A lone graduation year is not a range, so the LLM keeps the dates
+        self.assertIsNone(find_education_dates('Education\nBSc, Leeds, 2014\n\nExperience\nAcme, 2015 - 2020'))
+
+    def test_portfolio_url_only_from_header(self):
+        from .contact_extractor import find_contact_fields
+        body = 'Experience\nBackend Engineer, Acme (https://acme.example.com), 2019 - 2023'
+        self.assertNotIn('portfolio_url', find_contact_fields('Jane Doe\njane@example.com\n\n' + body))
+        found = find_contact_fields('Jane Doe\njane@example.com | https://janedoe.dev\n\n' + body)
+        self.assertEqual(found['portfolio_url'], 'https://janedoe.dev')
+
+    @patch.dict(os.environ, {'MISTRAL_API_KEY': 'test-key'})
+    def test_llm_only_gets_the_residual_schema(self):
+        from .ocr_service import RESUME_EXTRACTION_OUTPUT
+        fixture = self.fixtures[0]
+        content = json.dumps({
+            'personal_info': {'first_name': 'Jane', 'last_name': 'Doe'},
+            'education': [{'degree': 'MSc Data Science', 'institution': 'University of Edinburgh', 'gpa': None},
+                          {'degree': 'BSc Computer Science', 'institution': 'University of Leeds', 'gpa': None}],
+            'skills': [], 'achievements': [],
+        })
+        with patch('candidates.ocr_service.requests.post', return_value=_chat_response(content)) as post:
+            data = MistralOCRService().parse_resume_text(fixture['text'])
+
+        payload = post.call_args.kwargs['json']
+        schema = payload['response_format']['json_schema']['schema']['properties']
+        self.assertEqual(list(schema['personal_info']['properties']), ['first_name', 'last_name', 'portfolio_url'])
+        self.assertNotIn('start_date', schema['education']['items']['properties'])
+        self.assertNotIn('"email"', payload['messages'][0]['content'])
+        self.assertLess(payload['max_tokens'], RESUME_EXTRACTION_OUTPUT.max_tokens())
+
+        self.assertEqual(data['personal_info']['email'], 'jane.doe@example.com')
+        self.assertEqual(data['personal_info']['github_url'], 'https://github.com/janedoe')
+        self.assertEqual([(e['start_date'], e['end_date']) for e in data['education']], [('2015', '2016'), ('2011', '2015')])
+        self.assertIn('personal_info.phone', data['high_confidence'])
+        self.assertIn('education[1].end_date', data['high_confidence'])
+
+
+def _recommendation_model(job_skills):
+    """Minimal model dict in the shape of dataset/final_model.pkl"""
+    import pandas as pd
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    tfidf = TfidfVectorizer()
+    matrix = tfidf.fit_transform(job_skills)
+    profiles = pd.DataFrame({
+        '﻿job_position_name': [f'Job {i}' for i in range(len(job_skills))],
+        'skills_required_cleaned': job_skills,
+        'responsibilities': ['Build things ' * 30 if i % 2 else float('nan') for i in range(len(job_skills))],
+        'educationaL_requirements': ['BSc'] * len(job_skills),
+        'experiencere_requirement': ['2 years'] * len(job_skills),
+    })
+    return {'tfidf_skills': tfidf, 'job_skills_matrix': matrix, 'job_profiles': profiles}
+
+
+class RecommendationServiceTests(TestCase):
+
+    JOB_SKILLS = [
+        'python django sql', 'java spring sql', 'python machine learning pandas', 'excel accounting',
+        'python django', 'javascript react css', 'sql excel reporting', 'python sql', 'autocad drawing',
+        'python django sql',
+    ]
+
+    def setUp(self):
+        from .recommendation_service import RecommendationService
+        self.model = _recommendation_model(self.JOB_SKILLS)
+        self.service = RecommendationService(model=self.model)
+
+    def test_matches_dense_cosine_ranking(self):
+        from sklearn.metrics.pairwise import cosine_similarity
+        skills = 'Python, SQL, Django and some Excel'
+        vector = self.model['tfidf_skills'].transform([self.service._clean_text(skills)])
+        similarities = cosine_similarity(vector, self.model['job_skills_matrix'])[0]
+        # Stable sort: ties (jobs 0 and 9) keep catalogue order
+        expected = [i for i in sorted(range(len(similarities)), key=lambda i: -similarities[i])[:5]
+                    if similarities[i] > 0.001]
+
+        recommendations = self.service.get_job_recommendations(skills, top_n=5)
+        self.assertEqual([r['job_title'] for r in recommendations], [f'Job {i}' for i in expected])
+        self.assertEqual([r['match_score'] for r in recommendations],
+                         [round(similarities[i] * 100, 2) for i in expected])
+        # Missing (NaN) responsibilities show as N/A, the rest are cut to 200 characters
+        self.assertEqual([r['responsibilities'] for r in recommendations],
+                         [('Build things ' * 30)[:200] + '...' if i % 2 else 'N/A' for i in expected])
+
+    def test_shared_vector_insights_and_edge_cases(self):
+        recommendations, insights = self.service.recommend('python django', top_n='3')
+        self.assertEqual(len(recommendations), 3)
+        self.assertEqual([s['skill'] for s in insights['top_skills']], ['django', 'python'])
+        self.assertEqual(insights['total_skills_identified'], 2)
+        # No known term: nothing above the threshold
+        self.assertEqual(self.service.recommend('underwater basket weaving', top_n=5), ([], {
+            'top_skills': [], 'total_skills_identified': 0}))
+        self.assertEqual(len(self.service.get_job_recommendations('sql', top_n=50)), 5)
+
+    def test_batch_matches_single_requests_across_chunks(self):
+        skills_list = ['python django sql', 'excel', 'react css javascript', 'nothing known', 'sql', '']
+        batch = self.service.batch_recommendations(skills_list, top_n=3, chunk_size=4)
+        self.assertEqual(batch, [self.service.get_job_recommendations(skills, top_n=3) for skills in skills_list])
+        self.assertEqual(batch[3], [])
+
+    def test_batch_endpoint_by_skills_and_person_ids(self):
+        from accounts.models import CustomUser
+        from .models import Person, Skill
+        client = APIClient()
+        url = reverse('job_recommendations_batch')
+        self.assertEqual(client.post(url, {'candidates': ['python']}, format='json').status_code, 401)
+        client.force_authenticate(user=CustomUser.objects.create_user(
+            username='recruiter', email='r@e.com', password='Password123!'))
+
+        person = Person.objects.create(first_name='Jane', last_name='Doe', email='jane@e.com')
+        Skill.objects.bulk_create([Skill(person=person, name='Excel'), Skill(person=person, name='Accounting')])
+        with patch('candidates.recommendation_service._recommendation_service', self.service):
+            response = client.post(url, {'candidates': ['python django', 'autocad'], 'top_n': 2}, format='json')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['total_candidates'], 2)
+            self.assertEqual(response.data['results'][1]['index'], 1)
+            self.assertEqual([r['job_title'] for r in response.data['results'][1]['recommendations']], ['Job 8'])
+
+            # Skills + existing ids, inside the request savepoint
+            with self.assertNumQueries(4):
+                response = client.post(url, {'person_ids': [person.id, person.id + 100]}, format='json')
+            self.assertEqual(response.data['missing_person_ids'], [person.id + 100])
+            self.assertEqual(response.data['results'][0]['person_id'], person.id)
+            self.assertEqual(response.data['results'][0]['recommendations'][0]['job_title'], 'Job 3')
+
+            with override_settings(RECOMMENDATION_BATCH_MAX=1):
+                self.assertEqual(client.post(url, {'candidates': ['a', 'b']}, format='json').status_code, 400)
+            self.assertEqual(client.post(url, {'candidates': ['a'], 'top_n': 'all'}, format='json').status_code, 400)
+            with patch.object(self.service, 'batch_recommendations', return_value=[[]]) as batch:
+                client.post(url, {'candidates': ['python'], 'top_n': 10 ** 6}, format='json')
+            self.assertEqual(batch.call_args.args[1], 50)
+
+
+class ModelArtifactTests(TestCase):
+
+    def setUp(self):
+        import numpy as np
+        from scipy.sparse import hstack
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.preprocessing import LabelEncoder
+        jobs = RecommendationServiceTests.JOB_SKILLS
+        self.model = _recommendation_model(jobs)
+        responsibilities = TfidfVectorizer(ngram_range=(1, 2)).fit(jobs)
+        features = hstack([self.model['tfidf_skills'].transform(jobs * 5), responsibilities.transform(jobs * 5)])
+        encoder = LabelEncoder()
+        labels = encoder.fit_transform(np.random.default_rng(0).choice(['Low', 'Medium', 'High'], len(jobs) * 5))
+        self.model.update(
+            model=RandomForestClassifier(n_estimators=20, max_depth=5, random_state=0).fit(features, labels),
+            tfidf_responsibilities=responsibilities, label_encoder=encoder)
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_artifact_serves_the_same_results_as_the_pickle(self):
+        from .model_artifact import export_artifact, load_artifact
+        from .recommendation_service import RecommendationService
+        artifact = load_artifact(export_artifact(self.model, self.directory, version='v1'))
+        # Read-only views of the mapped files, not copies
+        self.assertFalse(artifact['jobs_by_term'].data.flags.writeable)
+
+        from_pickle, from_artifact = RecommendationService(model=self.model), RecommendationService(model=artifact)
+        for skills in ['python sql', 'excel accounting', 'react']:
+            self.assertEqual(from_artifact.recommend(skills, 5), from_pickle.recommend(skills, 5))
+            self.assertEqual(from_artifact.analyze_resume_quality(skills + ' django'),
+                             from_pickle.analyze_resume_quality(skills + ' django'))
+        self.assertEqual(from_artifact.batch_recommendations(['python', 'sql'], 3),
+                         from_pickle.batch_recommendations(['python', 'sql'], 3))
+        self.assertEqual(from_artifact.model_version, 'v1')
+
+    def test_command_exports_and_service_loads_current_version(self):
+        import pickle
+        from django.core.management import call_command
+        from .recommendation_service import RecommendationService
+        model_path = os.path.join(self.directory, 'final_model.pkl')
+        with open(model_path, 'wb') as f:
+            pickle.dump(self.model, f)
+        output = os.path.join(self.directory, 'artifacts')
+        for version in ('v1', 'v2'):
+            call_command('export_recommendation_artifact', model=model_path, output=output, artifact_version=version,
+                         stdout=io.StringIO())
+
+        with open(os.path.join(output, 'CURRENT')) as f:
+            self.assertEqual(f.read().strip(), 'v2')
+        with override_settings(RECOMMENDATION_ARTIFACT_DIR=output):
+            service = RecommendationService()
+        self.assertEqual(service.model_version, 'v2')
+        self.assertEqual(service.get_job_recommendations('autocad', 1)[0]['job_title'], 'Job 8')
+
+
+class JobIndexTests(TestCase):
+
+    def test_pruned_top_k_matches_exhaustive_scoring(self):
+        import numpy as np
+        from scipy.sparse import diags, random as sparse_random
+        from sklearn.preprocessing import normalize
+        from .job_index import JobIndex, select_top_k
+        rng = np.random.default_rng(0)
+        # Skewed term weights so long, low-weight posting lists can be pruned
+        matrix = sparse_random(3000, 300, density=0.05, random_state=0, format='csc')
+        matrix = normalize((matrix @ diags(1.0 / np.arange(1, 301))).tocsr()).tocsc()
+        matrix.sort_indices()
+        index = JobIndex(matrix)
+
+        with patch('candidates.job_index.PRUNING_MIN_JOBS', 0), patch('candidates.job_index.EXHAUSTIVE_POSTINGS', 0), \
+                patch('candidates.job_index.SEED_JOBS', 20):
+            for _ in range(30):
+                terms = np.sort(rng.choice(300, size=rng.integers(2, 15), replace=False))
+                weights = normalize(rng.random((1, len(terms))))[0]
+                for k in (1, 10):
+                    expected = select_top_k(index.scores(terms, weights), np.arange(3000), k, 0.001)
+                    jobs, scores = index.top_k(terms, weights, k, 0.001)
+                    self.assertEqual(jobs.tolist(), expected[0].tolist())
+                    self.assertEqual(scores.tolist(), expected[1].tolist())
+
+
+class CandidateIndexTests(TestCase):
+
+    def setUp(self):
+        from accounts.models import CustomUser
+        from .models import Person, Skill
+        from .recommendation_service import RecommendationService
+        self.service = RecommendationService(model=_recommendation_model(RecommendationServiceTests.JOB_SKILLS))
+        self.alice = Person.objects.create(first_name='Alice', email='alice@e.com', resume_text='Wrote SQL for reporting')
+        self.bob = Person.objects.create(first_name='Bob', email='bob@e.com')
+        self.carol = Person.objects.create(first_name='Carol', email='carol@e.com',
+                                           resume_text='Frontend developer: React, CSS and JS')
+        Skill.objects.bulk_create([Skill(person=self.alice, name='Python'), Skill(person=self.alice, name='Django'),
+                                   Skill(person=self.bob, name='Excel'), Skill(person=self.bob, name='Accounting')])
+        self.client = APIClient()
+        self.admin = CustomUser.objects.create_user(username='admin', email='a@e.com', password='Password123!',
+                                                    is_staff=True)
+
+    def _match(self, data):
+        return self.client.post(reverse('candidate_matches'), data, format='json')
+
+    def test_index_tracks_saves_other_processes_and_deletes(self):
+        from django.utils import timezone
+        from .candidate_index import CandidateIndex
+        from .models import Person
+        index = CandidateIndex(self.service)
+
+        def ranked(job_text):
+            return [person_id for person_id, _ in index.top_candidates(index.job_vector(job_text), 5)]
+
+        self.assertEqual(ranked('python django sql'), [self.alice.id])
+        # "JS" counts as javascript through the skill dictionary
+        self.assertEqual(ranked('javascript react'), [self.carol.id])
+
+        # Saved through SaveCVView: re-indexed once the transaction commits
+        self.client.force_authenticate(user=self.admin)
+        with patch('candidates.candidate_index._candidate_index', index), \
+                self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response = self.client.post(reverse('save_cv'), {
+                'email': 'bob@e.com', 'skills': [{'name': 'Pandas'}, {'name': 'Machine Learning'}]}, 'json')
+        self.assertEqual((response.status_code, len(callbacks)), (200, 1))
+        self.assertEqual(ranked('machine learning pandas'), [self.bob.id])
+        self.assertEqual(ranked('excel accounting'), [])
+
+        # Saved by another process: picked up by the next sync, merged or not
+        Person.objects.filter(id=self.carol.id).update(resume_text='Excel', updated_at=timezone.now())
+        with patch('candidates.candidate_index.MERGE_PENDING_ROWS', 2):
+            self.assertEqual(index.sync(), 1)
+            self.assertEqual(index.sync(), 0)
+        self.assertEqual(ranked('excel'), [self.carol.id])
+
+        alice_id = self.alice.id
+        self.alice.delete()
+        index.update([alice_id])
+        self.assertEqual(ranked('python django sql'), [])
+        self.assertEqual(len(index), 2)
+
+    def test_endpoint_by_description_and_catalogue_job(self):
+        self.assertEqual(self._match({'job_description': 'python'}).status_code, 401)
+        with patch('candidates.recommendation_service._recommendation_service', self.service), \
+                patch('candidates.candidate_index._candidate_index', None):
+            self.client.force_authenticate(user=self.admin)
+            response = self._match({'job_description': 'Senior Python/Django engineer, SQL'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([c['person_id'] for c in response.data['candidates']], [self.alice.id])
+            self.assertEqual(response.data['candidates'][0]['skills'], ['Python', 'Django'])
+
+            # job_id as returned with recommendations
+            job = self.service.get_job_recommendations('excel accounting', top_n=1)[0]
+            response = self._match({'job_id': job['job_id'], 'top_n': 3})
+            self.assertEqual(response.data['job']['job_title'], job['job_title'])
+            self.assertEqual([c['first_name'] for c in response.data['candidates']], ['Bob'])
+
+            self.assertEqual(self._match({'job_id': 99}).status_code, 400)
+            self.assertEqual(self._match({}).status_code, 400)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'recommendations': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'recommendation-tests'},
+})
+class RecommendationCacheTests(TestCase):
+
+    def setUp(self):
+        from django.core.cache import caches
+        from .recommendation_service import RecommendationService
+        caches['recommendations'].clear()
+        self.service = RecommendationService(model=_recommendation_model(RecommendationServiceTests.JOB_SKILLS))
+
+    def test_hits_across_processes_and_model_versions(self):
+        from .recommendation_cache import RecommendationCache
+        cache, other_worker = RecommendationCache(), RecommendationCache()
+        expected = self.service.recommend('python, django', 3)
+
+        with patch.object(self.service, 'recommend', wraps=self.service.recommend) as recommend:
+            self.assertEqual(cache.recommend(self.service, 'python, django', 3), expected)
+            # Same tokens: case, punctuation and spacing don't matter
+            self.assertEqual(cache.recommend(self.service, '  Python;DJANGO ', '3'), expected)
+            self.assertEqual(other_worker.recommend(self.service, 'python django', 3), expected)
+            self.assertEqual(recommend.call_count, 1)
+
+            # Token order, top_n and the model version are part of the key
+            cache.recommend(self.service, 'django python', 3)
+            cache.recommend(self.service, 'python django', 2)
+            self.service.model_version = 'v2'
+            cache.recommend(self.service, 'python django', 3)
+            self.assertEqual(recommend.call_count, 4)
+
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['local_hits'], stats['misses'], stats['local_entries']), (1, 1, 4, 1))
+        other_worker.stats()
+        self.assertEqual(cache.stats()['all_workers'], {'hits': 2, 'misses': 4, 'hit_rate': 0.3333})
+
+        with override_settings(RECOMMENDATION_CACHE_ENABLED=False), \
+                patch.object(self.service, 'recommend', return_value=([], {})) as recommend:
+            cache.recommend(self.service, 'python django', 3)
+            self.assertEqual(recommend.call_count, 1)
+
+    def test_endpoint_serves_repeated_searches_from_cache(self):
+        from .recommendation_cache import recommendation_cache
+        recommendation_cache.clear()
+        client = APIClient()
+        with patch('candidates.recommendation_service._recommendation_service', self.service), \
+                patch.object(self.service, 'recommend', wraps=self.service.recommend) as recommend:
+            first = client.post(reverse('job_recommendations'), {'skills': 'Excel, accounting', 'top_n': 2}, format='json')
+            second = client.post(reverse('job_recommendations'), {'skills': 'excel accounting', 'top_n': 2}, format='json')
+        self.assertEqual(recommend.call_count, 1)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(first.data['recommendations'][0]['job_title'], 'Job 3')
+        self.assertGreaterEqual(client.get(reverse('health_check')).data['recommendation_cache']['hits'], 1)
+
+    def test_aliases_share_an_entry(self):
+        from .recommendation_cache import RecommendationCache
+        cache = RecommendationCache()
+        with patch.object(self.service, 'recommend', wraps=self.service.recommend) as recommend:
+            first = cache.recommend(self.service, 'JS, react', 3)
+            self.assertEqual(cache.recommend(self.service, 'javascript react', 3), first)
+            self.assertEqual(recommend.call_count, 1)
+        recommend.assert_called_once_with('JS, react javascript', 3)
+        self.assertEqual(first[0][0]['job_title'], 'Job 5')
+
+    def test_endpoint_validates_top_n(self):
+        client = APIClient()
+        with patch('candidates.recommendation_service._recommendation_service', self.service):
+            response = client.post(reverse('job_recommendations'), {'skills': 'python', 'top_n': 'many'}, format='json')
+            self.assertEqual(response.status_code, 400)
+            response = client.post(reverse('job_recommendations'), {'skills': 'python', 'top_n': 10 ** 6}, format='json')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['total_recommendations'], len(self.service.recommend('python', 50)[0]))
+            response = client.post(reverse('job_recommendations'), {'skills': 'python', 'top_n': -3}, format='json')
+            self.assertEqual(response.data['total_recommendations'], 1)
+
+    def test_errors_are_not_cached(self):
+        from .recommendation_cache import RecommendationCache
+        cache = RecommendationCache()
+        with patch.object(self.service.job_index, 'top_k', side_effect=MemoryError('index unavailable')):
+            with self.assertRaises(MemoryError):
+                cache.recommend(self.service, 'python django', 3)
+        self.assertEqual(cache.recommend(self.service, 'python django', 3), self.service.recommend('python django', 3))
+        self.assertEqual(cache.stats()['misses'], 1)
+
+
+class WarmupTests(TestCase):
+
+    def test_server_processes_only(self):
+        from .apps import is_server_process
+        self.assertTrue(is_server_process(['/venv/bin/gunicorn', '-c', 'gunicorn.conf.py', 'config.wsgi']))
+        self.assertTrue(is_server_process(['manage.py', 'runserver', '--noreload']))
+        self.assertFalse(is_server_process(['manage.py', 'test', 'candidates']))
+        self.assertFalse(is_server_process(['benchmarks/bench_recommendations.py']))
+        with patch.dict(os.environ, {'RUN_MAIN': 'true'}):
+            self.assertTrue(is_server_process(['manage.py', 'runserver']))
+
+    def test_concurrent_first_calls_load_the_model_once(self):
+        from . import recommendation_service
+        from .warmup import warm_up
+        service = recommendation_service.RecommendationService(model=_recommendation_model(['python sql']))
+        barrier = threading.Barrier(8)
+
+        def slow_load(*args, **kwargs):
+            time.sleep(0.05)
+            return service
+
+        def first_call():
+            barrier.wait()
+            recommendation_service.get_recommendation_service()
+
+        with patch.object(recommendation_service, '_recommendation_service', None), \
+                patch.object(recommendation_service, 'RecommendationService', side_effect=slow_load) as loader:
+            threads = [threading.Thread(target=first_call) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(loader.call_count, 1)
+            self.assertEqual(set(warm_up()), {'recommendation_model', 'skill_matcher'})
+            self.assertEqual(loader.call_count, 1)
+
+
+class ModelReloadTests(TestCase):
+
+    def setUp(self):
+        from .model_artifact import export_artifact
+        self.directory = tempfile.mkdtemp()
+        self.export = lambda skills, version: export_artifact(_recommendation_model(skills), self.directory, version)
+        self.export(['python sql', 'excel'], 'v1')
+        self.settings_override = override_settings(RECOMMENDATION_ARTIFACT_DIR=self.directory)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        import shutil
+        self.settings_override.disable()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_new_version_is_swapped_in_and_reported_by_health(self):
+        from . import recommendation_service
+        from .model_artifact import set_current_version
+        reloader = recommendation_service.ModelReloader(interval=0)
+        with patch.object(recommendation_service, '_recommendation_service', None), \
+                patch.object(recommendation_service, '_reloader', reloader):
+            old = recommendation_service.get_recommendation_service(watch=False)
+            self.assertFalse(reloader.check())
+
+            self.export(['python sql', 'excel', 'autocad drawing'], 'v2')
+            self.assertTrue(reloader.check())
+            new = recommendation_service.get_recommendation_service(watch=False)
+            self.assertEqual(new.model_version, 'v2')
+            self.assertEqual(new.get_job_recommendations('autocad', 1)[0]['job_title'], 'Job 2')
+            # A request still holding the old service finishes on it
+            self.assertEqual(old.get_job_recommendations('autocad', 1), [])
+
+            health = APIClient().get(reverse('health_check')).data['recommendation_model']
+            self.assertEqual((health['version'], health['reloads']), ('v2', 1))
+            self.assertGreaterEqual(health['load_seconds'], 0)
+
+            # A broken export is not swapped in, and not retried until the marker moves again
+            os.makedirs(os.path.join(self.directory, 'v3'))
+            set_current_version(self.directory, 'v3')
+            self.assertFalse(reloader.check())
+            self.assertEqual(recommendation_service.get_recommendation_service(watch=False).model_version, 'v2')
+            with patch.object(recommendation_service, 'RecommendationService') as loader:
+                self.assertFalse(reloader.check())
+                loader.assert_not_called()
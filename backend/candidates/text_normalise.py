@@ -0,0 +1,230 @@
+"""
+Resume text normalisation
+Shrinks OCR markdown / PDF text before it is sent to the chat model: strips
+markup noise, drops duplicate pages and headers/footers repeated across pages, collapses
+whitespace and, if the text is still over the token budget, drops the least
+useful sections first (hobbies before experience).
+"""
+
+import math
+import re
+from django.conf import settings
+
+
+# Rough tokens for English prose + markdown; good enough for budgeting and reporting
+CHARS_PER_TOKEN = 4
+
+# How many lines at the top/bottom of each page are header/footer candidates
+EDGE_LINES = 3
+# Fewest pages on which a repeated top/bottom line is taken for a header/footer
+MIN_REPEATED_PAGES = 3
+
+_IMAGE_RE = re.compile(r'!\[[^\]]*\]\([^)]*\)')
+_LINK_RE = re.compile(r'\[([^\]]*)\]\(([^)\s]*)\)')
+_HTML_TAG_RE = re.compile(r'</?(?:br|p|div|span|sup|sub|b|i|u|strong|em)\b[^>]*>', re.I)
+_TABLE_RULE_RE = re.compile(r'^\s*\|?\s*:?-{2,}:?\s*(?:\|\s*:?-{2,}:?\s*)*\|?\s*$')
+_EMPHASIS_RE = re.compile(r'(\*\*|__|~~|`)')
+_HEADING_RE = re.compile(r'^[ \t]*#{1,6}[ \t]*', re.M)
+_PAGE_NUMBER_RE = re.compile(r'^\s*(?:page\s*)?-?\s*\d{1,3}\s*(?:(?:of|/)\s*\d{1,3})?\s*-?\s*$', re.I)
+_PAGE_REF_RE = re.compile(r'\bpage\s*\d{1,3}(?:\s*(?:of|/)\s*\d{1,3})?\b|\b\d{1,3}\s*(?:of|/)\s*\d{1,3}\b', re.I)
+_SPACES_RE = re.compile(r'[ \t\u00a0]+')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+
+# Section priority when truncating: lower is kept longer. Text before the
+# first heading (name, contact details) is always priority 0.
+SECTION_PRIORITIES = [
+    (re.compile(r'experience|employment|work history|career history|professional background'), 1),
+    (re.compile(r'skills|technologies|tech stack|competenc|expertise'), 1),
+    (re.compile(r'education|qualifications|academic'), 1),
+    (re.compile(r'summary|profile|objective|about'), 2),
+    (re.compile(r'projects|portfolio'), 2),
+    (re.compile(r'certific|licen[cs]es|achievements|awards|honou?rs'), 2),
+    (re.compile(r'publications|research|volunteer|languages|courses|training'), 3),
+    (re.compile(r'interests|hobbies|activities|references|personal'), 4),
+]
+UNKNOWN_SECTION_PRIORITY = 3
+
+# Lines that look like a section title: a markdown heading, or a short line
+# of letters in upper case / ending with a colon
+_SECTION_TITLE_RE = re.compile(r'^(?:#{1,6}\s*(?P<md>.+)|(?P<upper>[A-Z][A-Z &/-]{2,40})|(?P<colon>[A-Za-z][A-Za-z &/-]{2,40}):)\s*$')
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _link_text(match):
+    """Markdown link -> plain text, keeping the URL (LinkedIn/GitHub links matter)"""
+    label, url = match.group(1).strip(), match.group(2)
+    if not label or url.rstrip('/').endswith(label.rstrip('/')):
+        return url
+    return f'{label} ({url})'
+
+
+def strip_markup(text):
+    """Remove images, HTML tags, table pipes and emphasis, keeping link URLs"""
+    text = _IMAGE_RE.sub('', text)
+    text = _LINK_RE.sub(_link_text, text)
+    text = _HTML_TAG_RE.sub('\n', text)
+
+    lines = []
+    for line in text.split('\n'):
+        if _TABLE_RULE_RE.match(line):
+            continue
+        if line.lstrip().startswith('|'):
+            cells = [cell.strip() for cell in line.strip().strip('|').split('|')]
+            line = ' - '.join(cell for cell in cells if cell)
+        lines.append(_EMPHASIS_RE.sub('', line))
+    return '\n'.join(lines)
+
+
+def _edge_key(line):
+    """
+    Comparison key for header/footer lines: case-folded, with the numbers of
+    a page reference ("Page 3 of 5", "3/5") wildcarded. Other digits (dates
+    such as "2015 - 2019") must match exactly.
+    """
+    return _PAGE_REF_RE.sub(lambda match: re.sub(r'\d+', '#', match.group(0)), line.strip().lower())
+
+
+def remove_repeated_edges(pages):
+    """
+    Drop header/footer lines repeated across pages, plus bare page numbers.
+
+    A line counts as a running header (footer) when it is among the top
+    (bottom) EDGE_LINES lines of every page, and the document has at least
+    MIN_REPEATED_PAGES pages: on one or two pages a repeat is as likely to
+    be content (two jobs with the same dates) as page furniture.
+    """
+    page_lines = [page.split('\n') for page in pages]
+
+    # Indexes of the first/last EDGE_LINES non-blank lines of each page
+    tops, bottoms = [], []
+    for lines in page_lines:
+        filled = [index for index, line in enumerate(lines) if line.strip()]
+        tops.append(filled[:EDGE_LINES])
+        bottoms.append(filled[-EDGE_LINES:])
+
+    drop = [set() for _ in pages]
+    if len(pages) >= MIN_REPEATED_PAGES:
+        for edges in (tops, bottoms):
+            keys = [{_edge_key(lines[i]) for i in indexes} for lines, indexes in zip(page_lines, edges)]
+            repeated = set.intersection(*keys)
+            for page, (lines, indexes) in enumerate(zip(page_lines, edges)):
+                drop[page].update(i for i in indexes if _edge_key(lines[i]) in repeated)
+
+    return [
+        [
+            line for index, line in enumerate(lines)
+            if index not in dropped and not _PAGE_NUMBER_RE.match(line)
+        ]
+        for lines, dropped in zip(page_lines, drop)
+    ]
+
+
+def collapse_whitespace(text):
+    text = '\n'.join(_SPACES_RE.sub(' ', line).strip() for line in text.split('\n'))
+    return _BLANK_LINES_RE.sub('\n\n', text).strip()
+
+
+def _section_priority(title):
+    title = title.lower()
+    for pattern, priority in SECTION_PRIORITIES:
+        if pattern.search(title):
+            return priority
+    return UNKNOWN_SECTION_PRIORITY
+
+
+def split_sections(text):
+    """Split text into [(priority, section text)] at section title lines"""
+    sections = []
+    current, priority = [], 0
+    for line in text.split('\n'):
+        match = _SECTION_TITLE_RE.match(line)
+        if match and current:
+            title = match.group('md') or match.group('upper') or match.group('colon')
+            sections.append((priority, '\n'.join(current)))
+            current, priority = [], _section_priority(title)
+        current.append(line)
+    if current:
+        sections.append((priority, '\n'.join(current)))
+    return sections
+
+
+def truncate_to_budget(text, max_tokens):
+    """
+    Fit `text` into `max_tokens` by dropping whole sections, lowest priority
+    (and, within a priority, latest) first; if one section is still too long,
+    keep its leading lines. Original section order is preserved.
+
+    Returns:
+        (text, list of dropped/cut section titles)
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text, []
+
+    sections = split_sections(text)
+    kept = list(range(len(sections)))
+    dropped = []
+    removal_order = sorted(kept, key=lambda i: (-sections[i][0], -i))
+
+    def size():
+        return estimate_tokens('\n'.join(sections[i][1] for i in kept))
+
+    for index in removal_order:
+        if size() <= max_tokens or len(kept) == 1:
+            break
+        kept.remove(index)
+        dropped.append(_HEADING_RE.sub('', sections[index][1].split('\n', 1)[0]).strip())
+
+    result = '\n'.join(sections[i][1] for i in kept)
+    if estimate_tokens(result) > max_tokens:
+        cut = result[:max_tokens * CHARS_PER_TOKEN]
+        result = cut[:cut.rfind('\n')] if '\n' in cut else cut
+        dropped.append('(truncated)')
+    return result, dropped
+
+
+def normalise_resume_pages(pages, max_tokens=None):
+    """
+    Full normalisation stage for one document.
+
+    Args:
+        pages: list of page texts (OCR markdown or PDF text layer), in order
+        max_tokens: token budget (default RESUME_TEXT_TOKEN_BUDGET; None/0 = unlimited)
+
+    Returns:
+        (text, stats) where stats has tokens_before, tokens_after, reduction
+        (fraction saved) and dropped_sections
+    """
+    raw = '\n\n'.join(pages)
+    tokens_before = estimate_tokens(raw)
+
+    if not getattr(settings, 'RESUME_TEXT_NORMALISE_ENABLED', True):
+        return raw, {'tokens_before': tokens_before, 'tokens_after': tokens_before,
+                     'reduction': 0.0, 'dropped_sections': []}
+
+    # Duplicate pages (double-fed scans, repeated exports) add nothing
+    unique_pages, seen = [], set()
+    for page in map(strip_markup, pages):
+        key = collapse_whitespace(page)
+        if key and key not in seen:
+            seen.add(key)
+            unique_pages.append(page)
+
+    pages = remove_repeated_edges(unique_pages)
+    text = collapse_whitespace('\n\n'.join('\n'.join(lines) for lines in pages))
+
+    budget = max_tokens if max_tokens is not None else getattr(settings, 'RESUME_TEXT_TOKEN_BUDGET', 3000)
+    dropped = []
+    if budget:
+        text, dropped = truncate_to_budget(text, budget)
+
+    text = _BLANK_LINES_RE.sub('\n\n', _HEADING_RE.sub('', text)).strip()
+    tokens_after = estimate_tokens(text)
+    return text, {
+        'tokens_before': tokens_before,
+        'tokens_after': tokens_after,
+        'reduction': round(1 - tokens_after / tokens_before, 4) if tokens_before else 0.0,
+        'dropped_sections': dropped,
+    }
@@ -4,7 +4,12 @@ from .views import (
     OCRExtractView, 
     HealthCheckView, 
     ResumeAnalysisView,
+    ResumePipelineView,
+    ResumeJobCreateView,
+    ResumeJobDetailView,
     JobRecommendationsView,
+    BatchJobRecommendationsView,
+    CandidateMatchView,
     ResumeQualityView,
     ResumeReportSaveView,
     ResumeReportListView,
@@ -14,8 +19,13 @@ urlpatterns = [
     path('save/', SaveCVView.as_view(), name='save_cv'),
     path('ocr/extract/', OCRExtractView.as_view(), name='ocr_extract'),
     path('analyze/', ResumeAnalysisView.as_view(), name='resume_analysis'),
+    path('pipeline/', ResumePipelineView.as_view(), name='resume_pipeline'),
+    path('jobs/', ResumeJobCreateView.as_view(), name='resume_job_create'),
+    path('jobs/<uuid:job_id>/', ResumeJobDetailView.as_view(), name='resume_job_detail'),
     path('health/', HealthCheckView.as_view(), name='health_check'),
     path('recommendations/', JobRecommendationsView.as_view(), name='job_recommendations'),
+    path('recommendations/batch/', BatchJobRecommendationsView.as_view(), name='job_recommendations_batch'),
+    path('recommendations/candidates/', CandidateMatchView.as_view(), name='candidate_matches'),
     path('quality/', ResumeQualityView.as_view(), name='resume_quality'),
     
     # Resume reports endpoints
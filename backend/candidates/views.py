@@ -2,28 +2,91 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.parsers import MultiPartParser, FormParser
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
+from django.conf import settings
 from django.db import transaction
-from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
-import os
-from .serializers import PersonSerializer, ResumeReportSerializer
+from django.urls import reverse
+from django.utils import timezone
+from .serializers import PersonSerializer, ResumeReportSerializer, ResumeJobSerializer
 from .ocr_service import MistralOCRService
-from .models import ResumeReport
+from .ocr_cache import ocr_cache
+from .model_router import model_router
+from .recommendation_cache import recommendation_cache
+from .models import Person, Skill, ResumeReport, ResumeJob
+from .resume_jobs import get_job_runner
+from .skill_matcher import get_skill_matcher
+
+ALLOWED_RESUME_TYPES = ['application/pdf', 'image/jpeg', 'image/jpg', 'image/png']
+MAX_RESUME_SIZE = 10 * 1024 * 1024  # 10MB
+MAX_CANDIDATE_MATCHES = 100
+MAX_BATCH_RECOMMENDATIONS = 50  # top_n cap, per candidate in batches
+
+
+def _validate_resume_upload(request):
+    """
+    Return (uploaded_file, None) for a valid resume upload, or (None, error Response)
+    """
+    # Check if file is present
+    if 'file' not in request.FILES:
+        return None, Response({
+            "error": "No file uploaded"
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    uploaded_file = request.FILES['file']
+
+    # Validate file type
+    if uploaded_file.content_type not in ALLOWED_RESUME_TYPES:
+        return None, Response({
+            "error": "Invalid file type. Only PDF and images (JPEG, PNG) are allowed."
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    # Validate file size (10MB limit)
+    if uploaded_file.size > MAX_RESUME_SIZE:
+        return None, Response({
+            "error": "File size exceeds 10MB limit"
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    return uploaded_file, None
+
+
+def _upstream_error_response(error, default_message):
+    """Map a Mistral/OCR pipeline exception to an API error response"""
+    error_message = str(error)
+
+    # Handle specific API errors
+    if '401' in error_message or 'Unauthorized' in error_message:
+        return Response({
+            "error": "Invalid Mistral API Key. Please check your backend .env file.",
+            "details": error_message
+        }, status=status.HTTP_401_UNAUTHORIZED)
+    elif '400' in error_message:
+        return Response({
+            "error": "Bad Request. The file might be corrupted or the model is unavailable.",
+            "details": error_message
+        }, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        return Response({
+            "error": default_message,
+            "details": error_message
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 
 class SaveCVView(APIView):
     def post(self, request):
+        from .candidate_index import refresh_candidates
         try:
             with transaction.atomic():
                 serializer = PersonSerializer(data=request.data)
                 if serializer.is_valid():
                     person = serializer.save()
+                    # Re-index the candidate once the save is visible to other connections
+                    transaction.on_commit(lambda: refresh_candidates([person.id]))
                     return Response({
-                        "message": "CV data saved successfully",
+                        "message": "CV data saved successfully" if serializer.created else "CV data updated successfully",
                         "person_id": person.id
-                    }, status=status.HTTP_201_CREATED)
+                    }, status=status.HTTP_201_CREATED if serializer.created else status.HTTP_200_OK)
                 else:
                     return Response({
                         "error": "Validation failed",
@@ -48,57 +111,23 @@ class OCRExtractView(APIView):
         Extract and parse resume data from uploaded file
         """
         try:
-            # Check if file is present
-            if 'file' not in request.FILES:
-                return Response({
-                    "error": "No file uploaded"
-                }, status=status.HTTP_400_BAD_REQUEST)
+            uploaded_file, error_response = _validate_resume_upload(request)
+            if error_response:
+                return error_response
             
-            uploaded_file = request.FILES['file']
+            # Initialize OCR service
+            ocr_service = MistralOCRService()
             
-            # Validate file type
-            allowed_types = ['application/pdf', 'image/jpeg', 'image/jpg', 'image/png']
-            if uploaded_file.content_type not in allowed_types:
-                return Response({
-                    "error": "Invalid file type. Only PDF and images (JPEG, PNG) are allowed."
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Validate file size (10MB limit)
-            if uploaded_file.size > 10 * 1024 * 1024:
-                return Response({
-                    "error": "File size exceeds 10MB limit"
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Save file temporarily
-            file_name = default_storage.save(
-                f'temp/{uploaded_file.name}',
-                ContentFile(uploaded_file.read())
+            # Process the resume
+            structured_data = ocr_service.process_resume(
+                uploaded_file,
+                uploaded_file.content_type
             )
-            file_path = default_storage.path(file_name)
             
-            try:
-                # Initialize OCR service
-                ocr_service = MistralOCRService()
-                
-                # Process the resume
-                structured_data = ocr_service.process_resume(
-                    file_path,
-                    uploaded_file.content_type
-                )
-                
-                # Return structured data
-                return Response({
-                    "text": structured_data
-                }, status=status.HTTP_200_OK)
-                
-            finally:
-                # Clean up temporary file
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-                    # Also remove the parent directory if empty
-                    parent_dir = os.path.dirname(file_path)
-                    if os.path.exists(parent_dir) and not os.listdir(parent_dir):
-                        os.rmdir(parent_dir)
+            # Return structured data
+            return Response({
+                "text": structured_data
+            }, status=status.HTTP_200_OK)
         
         except ValueError as e:
             # API key not configured
@@ -108,24 +137,7 @@ class OCRExtractView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
         except Exception as e:
-            error_message = str(e)
-            
-            # Handle specific API errors
-            if '401' in error_message or 'Unauthorized' in error_message:
-                return Response({
-                    "error": "Invalid Mistral API Key. Please check your backend .env file.",
-                    "details": error_message
-                }, status=status.HTTP_401_UNAUTHORIZED)
-            elif '400' in error_message:
-                return Response({
-                    "error": "Bad Request. The file might be corrupted or the model is unavailable.",
-                    "details": error_message
-                }, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                return Response({
-                    "error": "Failed to extract text from document",
-                    "details": error_message
-                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return _upstream_error_response(e, "Failed to extract text from document")
 
 
 class HealthCheckView(APIView):
@@ -135,9 +147,14 @@ class HealthCheckView(APIView):
     permission_classes = [AllowAny]  # Allow public access for health check
     
     def get(self, request):
+        from .recommendation_service import recommendation_model_status
         return Response({
             "status": "OK",
-            "message": "OCR service is running"
+            "message": "OCR service is running",
+            "ocr_cache": ocr_cache.stats(),
+            "model_router": model_router.stats(),
+            "recommendation_model": recommendation_model_status(),
+            "recommendation_cache": recommendation_cache.stats()
         }, status=status.HTTP_200_OK)
 
 
@@ -153,55 +170,21 @@ class ResumeAnalysisView(APIView):
         Analyze resume and return comprehensive feedback
         """
         try:
-            # Check if file is present
-            if 'file' not in request.FILES:
-                return Response({
-                    "error": "No file uploaded"
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            uploaded_file = request.FILES['file']
-            
-            # Validate file type
-            allowed_types = ['application/pdf', 'image/jpeg', 'image/jpg', 'image/png']
-            if uploaded_file.content_type not in allowed_types:
-                return Response({
-                    "error": "Invalid file type. Only PDF and images (JPEG, PNG) are allowed."
-                }, status=status.HTTP_400_BAD_REQUEST)
+            uploaded_file, error_response = _validate_resume_upload(request)
+            if error_response:
+                return error_response
             
-            # Validate file size (10MB limit)
-            if uploaded_file.size > 10 * 1024 * 1024:
-                return Response({
-                    "error": "File size exceeds 10MB limit"
-                }, status=status.HTTP_400_BAD_REQUEST)
+            # Initialize OCR service
+            ocr_service = MistralOCRService()
             
-            # Save file temporarily
-            file_name = default_storage.save(
-                f'temp/{uploaded_file.name}',
-                ContentFile(uploaded_file.read())
+            # Analyze the resume
+            analysis_data = ocr_service.analyze_resume(
+                uploaded_file,
+                uploaded_file.content_type
             )
-            file_path = default_storage.path(file_name)
             
-            try:
-                # Initialize OCR service
-                ocr_service = MistralOCRService()
-                
-                # Analyze the resume
-                analysis_data = ocr_service.analyze_resume(
-                    file_path,
-                    uploaded_file.content_type
-                )
-                
-                # Return analysis data
-                return Response(analysis_data, status=status.HTTP_200_OK)
-                
-            finally:
-                # Clean up temporary file
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-                    # Also remove the parent directory if empty
-                    parent_dir = os.path.dirname(file_path)
-                    if os.path.exists(parent_dir) and not os.listdir(parent_dir):
-                        os.rmdir(parent_dir)
+            # Return analysis data
+            return Response(analysis_data, status=status.HTTP_200_OK)
         
         except ValueError as e:
             # API key not configured
@@ -211,24 +194,108 @@ class ResumeAnalysisView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
         except Exception as e:
-            error_message = str(e)
-            
-            # Handle specific API errors
-            if '401' in error_message or 'Unauthorized' in error_message:
-                return Response({
-                    "error": "Invalid Mistral API Key. Please check your backend .env file.",
-                    "details": error_message
-                }, status=status.HTTP_401_UNAUTHORIZED)
-            elif '400' in error_message:
-                return Response({
-                    "error": "Bad Request. The file might be corrupted or the model is unavailable.",
-                    "details": error_message
-                }, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                return Response({
-                    "error": "Failed to analyze resume",
-                    "details": error_message
-                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return _upstream_error_response(e, "Failed to analyze resume")
+
+
+class ResumePipelineView(APIView):
+    """
+    Full resume submission in one pass: OCR the upload once, then run
+    structured extraction and quality analysis concurrently
+    """
+    parser_classes = (MultiPartParser, FormParser)
+    permission_classes = [AllowAny]  # Allow public access, same as OCR/analysis
+
+    def post(self, request):
+        """
+        Return {"text": structured resume data, "analysis": analysis data}
+        """
+        try:
+            uploaded_file, error_response = _validate_resume_upload(request)
+            if error_response:
+                return error_response
+
+            ocr_service = MistralOCRService()
+            result = ocr_service.process_full_resume(
+                uploaded_file,
+                uploaded_file.content_type
+            )
+            return Response(result, status=status.HTTP_200_OK)
+
+        except ValueError as e:
+            # API key not configured
+            return Response({
+                "error": "Resume service not configured properly",
+                "details": str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        except Exception as e:
+            return _upstream_error_response(e, "Failed to process resume")
+
+
+class ResumeJobCreateView(APIView):
+    """
+    Queue resume processing in the background. Returns immediately with a job
+    id and status_url; clients poll the status endpoint, waiting the seconds
+    in its Retry-After header between polls, until the job finishes.
+    """
+    parser_classes = (MultiPartParser, FormParser)
+    permission_classes = [AllowAny]  # Allow public access, same as OCR/analysis
+
+    def post(self, request):
+        uploaded_file, error_response = _validate_resume_upload(request)
+        if error_response:
+            return error_response
+
+        kind = request.data.get('kind', ResumeJob.KIND_FULL)
+        if kind not in dict(ResumeJob.KIND_CHOICES):
+            return Response({
+                "error": f"Invalid kind. Choose one of: {', '.join(dict(ResumeJob.KIND_CHOICES))}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            job = ResumeJob(
+                user=request.user if request.user.is_authenticated else None,
+                kind=kind,
+                file_name=uploaded_file.name,
+                mime_type=uploaded_file.content_type,
+                events=[{'stage': ResumeJob.STAGE_RECEIVED, 'at': timezone.now().isoformat()}],
+            )
+            job.file.save(uploaded_file.name, uploaded_file, save=False)
+            job.save()
+        except Exception as e:
+            return Response({
+                "error": "Failed to queue resume job",
+                "details": str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        # Requests are atomic; workers must not look for the job before it is committed
+        transaction.on_commit(lambda: get_job_runner().submit(job.id))
+
+        return Response({
+            "job_id": str(job.id),
+            "stage": job.stage,
+            "status_url": reverse('resume_job_detail', args=[job.id]),
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class ResumeJobDetailView(APIView):
+    """
+    Poll a background resume job. While it is unfinished the response carries
+    a Retry-After header (RESUME_JOB_POLL_SECONDS) telling the client when to
+    poll again; each response has the full stage history.
+    """
+    permission_classes = [AllowAny]  # job ids are unguessable UUIDs
+
+    def get(self, request, job_id):
+        job = ResumeJob.objects.filter(pk=job_id).first()
+        if job is None:
+            return Response({
+                "error": "Job not found"
+            }, status=status.HTTP_404_NOT_FOUND)
+        response = Response(ResumeJobSerializer(job).data, status=status.HTTP_200_OK)
+        if not job.is_finished:
+            response['Retry-After'] = str(getattr(settings, 'RESUME_JOB_POLL_SECONDS', 2))
+        return response
 
 
 @method_decorator(csrf_exempt, name='dispatch')
@@ -248,7 +315,11 @@ class JobRecommendationsView(APIView):
             
             # Get candidate skills from request
             skills = request.data.get('skills', '')
-            top_n = request.data.get('top_n', 5)
+            try:
+                top_n = int(request.data.get('top_n', 5))
+            except (TypeError, ValueError):
+                return Response({"error": "top_n must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+            top_n = max(1, min(top_n, MAX_BATCH_RECOMMENDATIONS))
             
             if not skills:
                 return Response({
@@ -258,11 +329,9 @@ class JobRecommendationsView(APIView):
             # Get recommendation service
             rec_service = get_recommendation_service()
             
-            # Get recommendations
-            recommendations = rec_service.get_job_recommendations(skills, top_n)
-            
-            # Get skill insights
-            skill_insights = rec_service.get_skill_insights(skills)
+            # Get recommendations and skill insights (one candidate vector for
+            # both), reusing the result of an identical earlier request
+            recommendations, skill_insights = recommendation_cache.recommend(rec_service, skills, top_n)
             
             return Response({
                 "recommendations": recommendations,
@@ -277,6 +346,160 @@ class JobRecommendationsView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class BatchJobRecommendationsView(APIView):
+    """
+    Job recommendations for many candidates in one request
+
+    POST body (one of):
+      - candidates: list of skills strings
+      - person_ids: list of saved CV (Person) ids; their skills are used
+    Optional top_n (default 5, at most MAX_BATCH_RECOMMENDATIONS). At most
+    RECOMMENDATION_BATCH_MAX candidates.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        from .recommendation_service import get_recommendation_service
+
+        candidates = request.data.get('candidates')
+        person_ids = request.data.get('person_ids')
+        if not isinstance(candidates, list) and not isinstance(person_ids, list):
+            return Response({
+                "error": "Provide a list of candidates (skills strings) or person_ids"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            top_n = int(request.data.get('top_n', 5))
+        except (TypeError, ValueError):
+            return Response({"error": "top_n must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        top_n = max(1, min(top_n, MAX_BATCH_RECOMMENDATIONS))
+
+        max_batch = getattr(settings, 'RECOMMENDATION_BATCH_MAX', 1000)
+        size = len(candidates if isinstance(candidates, list) else person_ids)
+        if size > max_batch:
+            return Response({
+                "error": f"Too many candidates (limit {max_batch}).",
+                "details": "Split the list across several requests."
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(candidates, list):
+            try:
+                person_ids = [int(person_id) for person_id in person_ids]
+            except (TypeError, ValueError):
+                return Response({"error": "person_ids must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+
+        missing = []
+        if isinstance(candidates, list):
+            keys = [{"index": i} for i in range(len(candidates))]
+            skills_list = [str(skills or '') for skills in candidates]
+        else:
+            # One query for every person's skills
+            skills_by_person = {}
+            for person_id, name in Skill.objects.filter(person_id__in=person_ids).values_list('person_id', 'name'):
+                skills_by_person.setdefault(person_id, []).append(name)
+            existing = set(Person.objects.filter(id__in=person_ids).values_list('id', flat=True))
+            missing = [person_id for person_id in person_ids if person_id not in existing]
+            found = [person_id for person_id in person_ids if person_id in existing]
+            keys = [{"person_id": person_id} for person_id in found]
+            skills_list = [', '.join(skills_by_person.get(person_id, [])) for person_id in found]
+
+        try:
+            # Aliases ("js", "k8s") count as the canonical skills the model knows
+            matcher = get_skill_matcher()
+            results = get_recommendation_service().batch_recommendations(
+                [matcher.skills_text(skills) for skills in skills_list], top_n)
+        except Exception as e:
+            print(f"[Recommendations] Batch error: {e}")
+            return Response({
+                "error": "Failed to generate recommendations",
+                "details": str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        response = {
+            "results": [dict(key, recommendations=recommendations) for key, recommendations in zip(keys, results)],
+            "total_candidates": len(results),
+        }
+        if missing:
+            response["missing_person_ids"] = missing
+        return Response(response, status=status.HTTP_200_OK)
+
+
+class CandidateMatchView(APIView):
+    """
+    Stored candidates (saved CVs) that best match a job
+
+    POST body (one of):
+      - job_description: free text of the job's skills and requirements
+      - job_id: a catalogue job (the job_id of a recommendation)
+    Optional top_n (default 10, at most MAX_CANDIDATE_MATCHES).
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        from .candidate_index import get_candidate_index
+
+        job_description = request.data.get('job_description')
+        job_id = request.data.get('job_id')
+        try:
+            top_n = min(max(int(request.data.get('top_n', 10)), 1), MAX_CANDIDATE_MATCHES)
+        except (TypeError, ValueError):
+            return Response({"error": "top_n must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        if not job_description and job_id is None:
+            return Response({
+                "error": "Provide a job_description or a job_id"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            index = get_candidate_index()
+            if index is None:
+                return Response({
+                    "error": "Recommendation model not available"
+                }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+            job = None
+            if job_description:
+                job_text = str(job_description)
+            else:
+                service = index.service
+                try:
+                    job_id = int(job_id)
+                    if not 0 <= job_id < len(service.job_titles):
+                        raise ValueError
+                except (TypeError, ValueError):
+                    return Response({"error": "Unknown job_id"}, status=status.HTTP_400_BAD_REQUEST)
+                job_text = service.job_fields['required_skills'][job_id]
+                job = {"job_id": job_id, "job_title": service.job_titles[job_id], "required_skills": job_text}
+
+            matches = index.top_candidates(index.job_vector(job_text), top_n)
+            people = Person.objects.filter(id__in=[person_id for person_id, _ in matches]).prefetch_related('skills')
+            people = {person.id: person for person in people}
+            gone = [person_id for person_id, _ in matches if person_id not in people]
+            if gone:
+                # Deleted since they were indexed
+                index.update(gone)
+        except Exception as e:
+            print(f"[CandidateMatch] Error: {e}")
+            return Response({
+                "error": "Failed to match candidates",
+                "details": str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        candidates = [
+            {
+                "person_id": person_id,
+                "first_name": people[person_id].first_name,
+                "last_name": people[person_id].last_name,
+                "email": people[person_id].email,
+                "match_score": round(score * 100, 2),
+                "skills": [skill.name for skill in people[person_id].skills.all()],
+            }
+            for person_id, score in matches if person_id in people
+        ]
+        response = {"candidates": candidates, "total_candidates": len(candidates)}
+        if job:
+            response["job"] = job
+        return Response(response, status=status.HTTP_200_OK)
+
+
 @method_decorator(csrf_exempt, name='dispatch')
 class ResumeQualityView(APIView):
     """
@@ -0,0 +1,32 @@
+"""
+Process start-up warm-up
+Builds the recommendation service and skill matcher before the first request.
+Run from CandidatesConfig.ready, so under gunicorn with preload_app the master
+loads them once before forking and workers share the pages copy-on-write.
+"""
+
+import time
+
+
+def warm_up():
+    """
+    Load the recommendation model and skill matcher now.
+
+    Returns:
+        {component: seconds}
+    """
+    from .recommendation_service import get_recommendation_service
+    from .skill_matcher import get_skill_matcher
+
+    timings = {}
+    start = time.perf_counter()
+    service = get_recommendation_service(watch=False)
+    timings['recommendation_model'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    get_skill_matcher()
+    timings['skill_matcher'] = time.perf_counter() - start
+
+    print(f"[Warmup] Recommendation model {service.model_version or 'unavailable'} in "
+          f"{timings['recommendation_model']:.2f}s, skill matcher in {timings['skill_matcher']:.2f}s")
+    return timings
@@ -0,0 +1,34 @@
+"""
+Resumable checkpoints for batch jobs
+Shared by interview re-scoring (interview/rescoring.py) and bulk resume
+ingestion (candidates/ingestion.py).
+"""
+
+import json
+import os
+
+
+class Checkpoint:
+    """
+    Set of already processed keys persisted to a JSON file.
+    Writes go through a temp file + os.replace so a crash never leaves a torn file.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.done = set()
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.done = set(json.load(f).get('done', []))
+
+    def __contains__(self, key):
+        return key in self.done
+
+    def add_many(self, keys):
+        self.done.update(keys)
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'done': sorted(self.done)}, f)
+        os.replace(tmp_path, self.path)
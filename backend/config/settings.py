@@ -1,5 +1,7 @@
 from pathlib import Path
+import json
 import os
+import tempfile
 from datetime import timedelta
 from dotenv import load_dotenv
 
@@ -211,10 +213,136 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # Replace this with your own key or set the env var in production.
 MISTRAL_API_KEY = os.environ.get("MISTRAL_API_KEY")
 
+# OCR result cache (keyed by SHA-256 of the uploaded file)
+OCR_CACHE_ENABLED = os.getenv('OCR_CACHE_ENABLED', 'True') == 'True'
+OCR_CACHE_TTL_SECONDS = int(os.getenv('OCR_CACHE_TTL_SECONDS', 30 * 24 * 3600))
+OCR_CACHE_MAX_ENTRIES = int(os.getenv('OCR_CACHE_MAX_ENTRIES', 5000))
+
+# Local text-layer extraction for born-digital PDFs (pages failing the
+# density check are still sent to remote OCR)
+PDF_TEXT_LAYER_ENABLED = os.getenv('PDF_TEXT_LAYER_ENABLED', 'True') == 'True'
+PDF_TEXT_MIN_CHARS_PER_PAGE = int(os.getenv('PDF_TEXT_MIN_CHARS_PER_PAGE', 80))
+PDF_TEXT_MIN_READABLE_RATIO = float(os.getenv('PDF_TEXT_MIN_READABLE_RATIO', 0.8))
+
+# OCR of multi-page PDFs: pages beyond the cap are ignored, the rest are OCRed
+# in batches of RESUME_OCR_PAGE_BATCH_SIZE pages with a bounded worker pool
+RESUME_OCR_MAX_PAGES = int(os.getenv('RESUME_OCR_MAX_PAGES', 6))
+RESUME_OCR_PAGE_BATCH_SIZE = int(os.getenv('RESUME_OCR_PAGE_BATCH_SIZE', 1))
+RESUME_OCR_MAX_WORKERS = int(os.getenv('RESUME_OCR_MAX_WORKERS', 4))
+
+# JPEG/PNG uploads are rotated upright, converted to grayscale, downscaled to
+# OCR_IMAGE_TARGET_DPI (for an A4 page) and recompressed before OCR
+OCR_IMAGE_PREPROCESS_ENABLED = os.getenv('OCR_IMAGE_PREPROCESS_ENABLED', 'True') == 'True'
+OCR_IMAGE_TARGET_DPI = int(os.getenv('OCR_IMAGE_TARGET_DPI', 200))
+OCR_IMAGE_JPEG_QUALITY = int(os.getenv('OCR_IMAGE_JPEG_QUALITY', 80))
+OCR_IMAGE_PREPROCESS_WORKERS = int(os.getenv('OCR_IMAGE_PREPROCESS_WORKERS', 2))
+
+# Extracted resume text is cleaned (markup, repeated headers/footers, whitespace)
+# and cut to RESUME_TEXT_TOKEN_BUDGET tokens, dropping low-value sections first
+RESUME_TEXT_NORMALISE_ENABLED = os.getenv('RESUME_TEXT_NORMALISE_ENABLED', 'True') == 'True'
+RESUME_TEXT_TOKEN_BUDGET = int(os.getenv('RESUME_TEXT_TOKEN_BUDGET', 3000))
+
+# Model routing for resume extraction/analysis (see candidates/model_router.py).
+# Tiers are ordered small -> large; rules are tried in order, first match wins.
+# Override the rules with a JSON list in LLM_ROUTING_RULES.
+LLM_MODEL_TIERS = {
+    'small': os.getenv('LLM_SMALL_MODEL', 'mistral-small-latest'),
+    'large': os.getenv('LLM_LARGE_MODEL', 'mistral-large-latest'),
+}
+LLM_ROUTING_RULES = json.loads(os.getenv('LLM_ROUTING_RULES', 'null')) or [
+    # Extraction is mostly copying fields; escalates to large if validation fails
+    {'task': 'extraction', 'tier': 'small'},
+    # Short CVs (about a page) don't need the large model for analysis
+    {'task': 'analysis', 'max_input_tokens': 800, 'tier': 'small'},
+    # Large model while it is responsive, otherwise degrade to small
+    {'task': 'analysis', 'max_latency': 30, 'tier': 'large'},
+    {'tier': 'small'},
+]
+LLM_ESCALATE_ON_INVALID = os.getenv('LLM_ESCALATE_ON_INVALID', 'True') == 'True'
+# A tier's latency is forgotten this long after its last call, so a tier
+# skipped for being slow (max_latency) gets traffic and is measured again
+LLM_LATENCY_TTL_SECONDS = int(os.getenv('LLM_LATENCY_TTL_SECONDS', 300))
+
+# Contact fields (email, phone, links) and education date ranges are taken from
+# the text with patterns and left out of the extraction schema sent to the LLM
+RESUME_FAST_PATH_ENABLED = os.getenv('RESUME_FAST_PATH_ENABLED', 'True') == 'True'
+
+# Batch job recommendations: candidates per request, and candidates scored per
+# sparse product (memory is bounded by chunk size x job catalogue size)
+RECOMMENDATION_BATCH_MAX = int(os.getenv('RECOMMENDATION_BATCH_MAX', 1000))
+RECOMMENDATION_BATCH_CHUNK_SIZE = int(os.getenv('RECOMMENDATION_BATCH_CHUNK_SIZE', 64))
+
+# Memory-mapped recommendation artifacts (export_recommendation_artifact /
+# dataset/main.py); the version named in <dir>/CURRENT is loaded, falling back
+# to dataset/final_model.pkl. Empty means dataset/artifacts
+RECOMMENDATION_ARTIFACT_DIR = os.getenv('RECOMMENDATION_ARTIFACT_DIR', '')
+
+# Load the recommendation model and skill matcher when a server process starts
+# (before gunicorn forks workers with preload_app) instead of on first request
+RECOMMENDATION_WARMUP = os.getenv('RECOMMENDATION_WARMUP', 'True') == 'True'
+
+# Seconds between checks of the model version marker (artifacts/CURRENT or
+# final_model.pkl's mtime); a new version is loaded in the background and
+# swapped in without restarting workers. 0 disables
+RECOMMENDATION_RELOAD_INTERVAL = float(os.getenv('RECOMMENDATION_RELOAD_INTERVAL', 30))
+
+# Recommendation/skill-insight results, cached per (normalised skills, top_n,
+# model version): a per-process LRU of RECOMMENDATION_CACHE_LOCAL_ENTRIES in
+# front of the RECOMMENDATION_CACHE_ALIAS cache shared by all workers (a
+# bounded file cache by default; point RECOMMENDATION_CACHE_BACKEND/LOCATION
+# at e.g. django.core.cache.backends.redis.RedisCache to share across hosts)
+RECOMMENDATION_CACHE_ENABLED = os.getenv('RECOMMENDATION_CACHE_ENABLED', 'True') == 'True'
+RECOMMENDATION_CACHE_ALIAS = 'recommendations'
+RECOMMENDATION_CACHE_LOCAL_ENTRIES = int(os.getenv('RECOMMENDATION_CACHE_LOCAL_ENTRIES', 256))
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    RECOMMENDATION_CACHE_ALIAS: {
+        'BACKEND': os.getenv('RECOMMENDATION_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('RECOMMENDATION_CACHE_LOCATION',
+                              os.path.join(tempfile.gettempdir(), 'recommendation-cache')),
+        'TIMEOUT': int(os.getenv('RECOMMENDATION_CACHE_TTL_SECONDS', 24 * 3600)),
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('RECOMMENDATION_CACHE_MAX_ENTRIES', 10000))},
+    },
+}
+
+# Canonical skills + aliases for local skill extraction (candidates/skill_matcher.py);
+# defaults to candidates/skill_dictionary.json
+SKILL_DICTIONARY_PATH = os.getenv('SKILL_DICTIONARY_PATH')
+
+# Background resume jobs (POST /api/candidates/jobs/): bounded worker pool per
+# process; unfinished jobs idle for RESUME_JOB_STALE_SECONDS are claimed and
+# picked up again by a sweep every RESUME_JOB_SWEEP_SECONDS
+RESUME_JOB_WORKERS = int(os.getenv('RESUME_JOB_WORKERS', 4))
+RESUME_JOB_STALE_SECONDS = int(os.getenv('RESUME_JOB_STALE_SECONDS', 600))
+RESUME_JOB_SWEEP_SECONDS = int(os.getenv('RESUME_JOB_SWEEP_SECONDS', 60))
+RESUME_JOBS_EAGER = os.getenv('RESUME_JOBS_EAGER', 'False') == 'True'
+# Retry-After sent to clients polling an unfinished job
+RESUME_JOB_POLL_SECONDS = int(os.getenv('RESUME_JOB_POLL_SECONDS', 2))
+
+# Bulk CV import (ingest_resumes command): worker processes x threads per process,
+# all sharing one upstream budget of RESUME_INGEST_RATE_LIMIT requests/second
+RESUME_INGEST_PROCESSES = int(os.getenv('RESUME_INGEST_PROCESSES', 2))
+RESUME_INGEST_THREADS = int(os.getenv('RESUME_INGEST_THREADS', 4))
+RESUME_INGEST_RATE_LIMIT = float(os.getenv('RESUME_INGEST_RATE_LIMIT', 1))
+RESUME_INGEST_BURST = int(os.getenv('RESUME_INGEST_BURST', 5))
+
 # Groq API key for Whisper-based speech-to-text
 # You can also override this via the GROQ_API_KEY env var.
 GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
 
+# Interview analysis provider: 'mistral' (live API) or 'stub' (offline heuristic scoring)
+INTERVIEW_ANALYSIS_PROVIDER = os.getenv('INTERVIEW_ANALYSIS_PROVIDER', 'mistral')
+
+# Bulk interview re-scoring (staff endpoint + rescore_interviews command)
+INTERVIEW_RESCORE_CONCURRENCY = int(os.getenv('INTERVIEW_RESCORE_CONCURRENCY', 4))
+INTERVIEW_RESCORE_MAX_CONCURRENCY = int(os.getenv('INTERVIEW_RESCORE_MAX_CONCURRENCY', 16))
+INTERVIEW_RESCORE_MAX_BATCH = int(os.getenv('INTERVIEW_RESCORE_MAX_BATCH', 200))
+# Seconds one staff re-score request may spend on analyses; keep it under
+# GUNICORN_TIMEOUT so the worker is not killed mid-run
+INTERVIEW_RESCORE_REQUEST_SECONDS = int(os.getenv('INTERVIEW_RESCORE_REQUEST_SECONDS', 90))
+
 # Media files for generated TTS audio
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
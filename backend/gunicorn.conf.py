@@ -0,0 +1,28 @@
+"""
+Gunicorn settings
+    gunicorn -c gunicorn.conf.py config.wsgi
+
+preload_app imports Django once in the master, where CandidatesConfig.ready
+warms up the recommendation model and skill matcher; the forked workers then
+share those pages copy-on-write instead of each loading their own copy.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', 1))
+# OCR/LLM calls can take a while
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+preload_app = True
+
+
+def post_fork(server, worker):
+    # Database connections opened in the master must not be shared by workers
+    from django.db import connections
+    connections.close_all()
+
+    # Pick up resume jobs a previous process left unfinished, and keep sweeping
+    # for them (threads don't survive fork, so each worker starts its own)
+    from candidates.resume_jobs import get_job_runner
+    get_job_runner()
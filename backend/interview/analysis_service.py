@@ -0,0 +1,261 @@
+"""
+Interview Analysis Service
+Scores interview transcripts with Mistral AI, or with the offline stub provider
+"""
+
+import requests
+from django.conf import settings
+
+from candidates.llm_json import extract_json
+
+
+MISTRAL_CHAT_URL = "https://api.mistral.ai/v1/chat/completions"
+# Seconds to wait for one analysis from the API
+ANALYSIS_TIMEOUT_SECONDS = 45
+
+_SCORE = {"type": "number"}
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+
+# Expected shape of the analysis response (see build_analysis_prompt)
+INTERVIEW_ANALYSIS_SCHEMA = {
+    "type": "object",
+    "required": ["overall_score", "tone_analysis", "skill_scores", "strengths", "improvements", "detailed_feedback"],
+    "properties": {
+        "overall_score": _SCORE,
+        "tone_analysis": {
+            "type": "object",
+            "properties": {
+                "dominant_tone": {"type": "string"},
+                "confidence_score": _SCORE,
+                "tone_tags": _STRING_LIST,
+                "sentiment": {"type": "string"},
+            },
+        },
+        "skill_scores": {"type": "object"},
+        "strengths": _STRING_LIST,
+        "improvements": _STRING_LIST,
+        "detailed_feedback": {"type": "string"},
+    },
+}
+
+
+def conversation_from_history(history):
+    """
+    Convert stored `InterviewSession.history` into the conversation format
+    accepted by the analysis endpoint ([{"role": "user"|"ai", "content": "..."}]).
+    Previous analysis entries are dropped.
+    """
+    conversation = []
+    for msg in history or []:
+        if not isinstance(msg, dict):
+            continue
+        role = msg.get("role")
+        if role == "user":
+            conversation.append({"role": "user", "content": msg.get("content", "")})
+        elif role in ("assistant", "ai"):
+            conversation.append({"role": "ai", "content": msg.get("content", "")})
+    return conversation
+
+
+def build_analysis_prompt(conversation, interview_type):
+    """Build the evaluator prompt for a transcript"""
+    transcript_lines = []
+    for msg in conversation:
+        role_label = "Candidate" if msg.get("role") == "user" else "Interviewer"
+        transcript_lines.append(f"{role_label}: {msg.get('content', '')}")
+    transcript_text = "\n".join(transcript_lines)
+
+    type_context = (
+        "This was a TECHNICAL interview focusing on programming, algorithms, and system design."
+        if interview_type == "technical"
+        else "This was a BEHAVIORAL interview focusing on soft skills, leadership, and past experiences."
+    )
+
+    return f"""You are an expert interview coach and evaluator. Analyze the following interview transcript and return ONLY a valid JSON object (no extra text, no markdown, no code fences).
+
+{type_context}
+
+CRITICAL SCORING RULES:
+1. If the candidate provides extremely short, unhelpful, or no meaningful responses (e.g., total words spoken is very low, or they just say "I don't know", stay silent, etc.), YOU MUST SEVERELY PENALIZE their `overall_score` and `skill_scores`. Their scores should be extremely low (e.g., 10-35).
+2. DO NOT give a high score or generic positive feedback if the candidate barely participated.
+3. If they give bad or empty responses, their strengths should explicitly state "Requires more active participation" or "Minimal engagement", and improvements should focus on "Need to provide detailed responses to questions", "Avoid remaining silent or giving one-word answers".
+
+TRANSCRIPT:
+{transcript_text}
+
+Return this exact JSON structure:
+{{
+  "overall_score": <integer 0-100, heavily penalized if minimal/no response>,
+  "tone_analysis": {{
+    "dominant_tone": "<one word: confident|nervous|enthusiastic|hesitant|calm|anxious|assertive|uncertain|unresponsive>",
+    "confidence_score": <integer 0-100>,
+    "tone_tags": ["<tag1>", "<tag2>", "<tag3>"],
+    "sentiment": "<positive|neutral|negative|n/a>"
+  }},
+  "skill_scores": {{
+    "communication": <integer 0-100>,
+    "response_quality": <integer 0-100>,
+    "engagement": <integer 0-100>,
+    "{"technical_depth" if interview_type == "technical" else "empathy_and_self_awareness"}": <integer 0-100>
+  }},
+  "strengths": ["<strength 1>", "<strength 2>", "<strength 3>"],
+  "improvements": ["<area 1>", "<area 2>", "<area 3>"],
+  "detailed_feedback": "<2-3 sentence paragraph of personalized feedback>"
+}}"""
+
+
+class InterviewAnalysisService:
+    """
+    Service class for scoring interview transcripts.
+
+    The provider is taken from `settings.INTERVIEW_ANALYSIS_PROVIDER`:
+      - 'mistral': calls the Mistral chat completions API
+      - 'stub': offline heuristic scoring (no network), used in tests and dry runs
+    """
+
+    PROVIDERS = ('mistral', 'stub')
+
+    def __init__(self, provider=None):
+        self.provider = provider or getattr(settings, 'INTERVIEW_ANALYSIS_PROVIDER', 'mistral')
+        if self.provider not in self.PROVIDERS:
+            raise ValueError(f"Unknown interview analysis provider: {self.provider}")
+
+        self.api_key = getattr(settings, 'MISTRAL_API_KEY', None)
+        if self.provider == 'mistral' and not self.api_key:
+            raise ValueError("MISTRAL_API_KEY not configured")
+
+    def analyze(self, conversation, interview_type="technical", duration=15, session_id=None):
+        """
+        Score a transcript.
+
+        Args:
+            conversation: [{"role": "user"|"ai", "content": "..."}]
+            interview_type: 'technical' or 'behavioral'
+            duration: interview duration in minutes
+            session_id: interview session identifier
+
+        Returns:
+            Analysis dict including session meta-info
+
+        Raises:
+            requests.exceptions.RequestException: upstream call failed
+            LLMJSONError: upstream returned malformed or incomplete JSON
+        """
+        if self.provider == 'stub':
+            return fallback_analysis(conversation, interview_type, duration, session_id)
+
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+        payload = {
+            "model": "mistral-small-latest",
+            "messages": [{"role": "user", "content": build_analysis_prompt(conversation, interview_type)}],
+            "temperature": 0.3,
+            "max_tokens": 700,
+            "response_format": {"type": "json_object"},
+        }
+
+        resp = requests.post(MISTRAL_CHAT_URL, headers=headers, json=payload, timeout=ANALYSIS_TIMEOUT_SECONDS)
+        resp.raise_for_status()
+        resp_json = resp.json()
+
+        raw_content = ""
+        if resp_json.get("choices"):
+            raw_content = resp_json["choices"][0]["message"].get("content", "")
+
+        analysis = extract_json(raw_content, INTERVIEW_ANALYSIS_SCHEMA)
+        _attach_meta(analysis, conversation, interview_type, duration, session_id)
+        return analysis
+
+
+def _attach_meta(analysis, conversation, interview_type, duration, session_id):
+    analysis["session_id"] = session_id
+    analysis["interview_type"] = interview_type
+    analysis["duration"] = duration
+    analysis["question_count"] = sum(1 for m in conversation if m.get("role") == "ai")
+    analysis["response_count"] = sum(1 for m in conversation if m.get("role") == "user")
+
+
+def fallback_analysis(conversation, interview_type, duration, session_id):
+    """
+    Returns a basic heuristic analysis when the AI call fails,
+    so the frontend always gets a usable response.
+    """
+    user_turns = [m for m in conversation if m.get("role") == "user"]
+    ai_turns = [m for m in conversation if m.get("role") == "ai"]
+    total_words = sum(len(m.get("content", "").split()) for m in user_turns)
+    avg_words = total_words // max(len(user_turns), 1)
+
+    # Penalize if there's no or almost no response
+    if total_words < 20:
+        return {
+            "overall_score": 25,
+            "tone_analysis": {
+                "dominant_tone": "unresponsive",
+                "confidence_score": 20,
+                "tone_tags": ["silent", "disengaged", "hesitant"],
+                "sentiment": "negative",
+            },
+            "skill_scores": {
+                "communication": 15,
+                "response_quality": 10,
+                "engagement": 10,
+                "technical_depth" if interview_type == "technical" else "empathy_and_self_awareness": 10,
+            },
+            "strengths": [
+                "Attended the interview session"
+            ],
+            "improvements": [
+                "Needs to actively engage with the questions",
+                "Must provide actual, detailed responses rather than remaining silent or using one-word answers",
+                "Practice speaking confidently and elaborating on key points"
+            ],
+            "detailed_feedback": (
+                "The candidate provided little to no substantial responses during the interview. "
+                "It is critical to actively engage with the interviewer and provide detailed examples. "
+                "Without sufficient communication, it is impossible to evaluate skills effectively."
+            ),
+            "session_id": session_id,
+            "interview_type": interview_type,
+            "duration": duration,
+            "question_count": len(ai_turns),
+            "response_count": len(user_turns),
+        }
+
+    comm_score = min(100, 50 + avg_words)  # longer answers = better communication proxy
+    return {
+        "overall_score": 70,
+        "tone_analysis": {
+            "dominant_tone": "calm",
+            "confidence_score": 65,
+            "tone_tags": ["composed", "thoughtful", "engaged"],
+            "sentiment": "positive",
+        },
+        "skill_scores": {
+            "communication": comm_score,
+            "response_quality": 68,
+            "engagement": 72,
+            "technical_depth" if interview_type == "technical" else "empathy_and_self_awareness": 65,
+        },
+        "strengths": [
+            "Participated actively throughout the session",
+            "Maintained clear communication",
+            "Demonstrated willingness to engage with questions",
+        ],
+        "improvements": [
+            "Aim to provide more specific examples in answers",
+            "Elaborate further on key technical/behavioral points",
+            "Practice structuring answers with a clear beginning, middle, and end",
+        ],
+        "detailed_feedback": (
+            "You completed the interview with a solid performance. "
+            "Focus on providing more detailed and structured answers to stand out further. "
+            "Keep practicing to build confidence and fluency."
+        ),
+        "session_id": session_id,
+        "interview_type": interview_type,
+        "duration": duration,
+        "question_count": len(ai_turns),
+        "response_count": len(user_turns),
+    }
@@ -0,0 +1,51 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+
+from interview.analysis_service import InterviewAnalysisService
+from interview.rescoring import InterviewRescorer, filter_queryset, TARGETS
+
+
+class Command(BaseCommand):
+    help = "Re-analyse stored interviews with the current analysis prompt and write the scores back in bulk."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', choices=TARGETS, default='reports',
+                            help="Re-score InterviewReport rows (default) or InterviewSession histories.")
+        parser.add_argument('--ids', nargs='*', help="Report ids or session ids to re-score.")
+        parser.add_argument('--user', type=int, help="Only reports belonging to this user id.")
+        parser.add_argument('--interview-type', help="Only reports of this interview type.")
+        parser.add_argument('--since', help="Only interviews created on/after this ISO date.")
+        parser.add_argument('--until', help="Only interviews created before this ISO date.")
+        parser.add_argument('--concurrency', type=int, help="Concurrent upstream analysis calls.")
+        parser.add_argument('--batch-size', type=int, default=50, help="Rows per bulk write / checkpoint.")
+        parser.add_argument('--checkpoint', help="Checkpoint file; re-running with the same file resumes.")
+        parser.add_argument('--provider', choices=('mistral', 'stub'), help="Override INTERVIEW_ANALYSIS_PROVIDER.")
+
+    def handle(self, *args, **options):
+        try:
+            queryset = filter_queryset(
+                options['target'],
+                ids=options['ids'],
+                user=options['user'],
+                interview_type=options['interview_type'],
+                created_after=options['since'],
+                created_before=options['until'],
+            )
+            rescorer = InterviewRescorer(
+                concurrency=options['concurrency'],
+                checkpoint_path=options['checkpoint'],
+                batch_size=options['batch_size'],
+                service=InterviewAnalysisService(provider=options['provider']),
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        summary = rescorer.rescore(options['target'], queryset)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Re-scored {summary['processed']} {summary['target']} "
+            f"({summary['failed']} failed, {summary['skipped']} skipped) in "
+            f"{summary['elapsed_seconds']}s - {summary['interviews_per_minute']} interviews/min"
+        ))
+        if summary['errors']:
+            self.stdout.write(json.dumps(summary['errors'], indent=2))
@@ -0,0 +1,37 @@
+from django.db import migrations, models
+
+
+def drop_duplicate_reports(apps, schema_editor):
+    """Keep only the newest report per (user, session_id); blank session ids become NULL"""
+    InterviewReport = apps.get_model("interview", "InterviewReport")
+    InterviewReport.objects.filter(session_id="").update(session_id=None)
+    seen = set()
+    duplicates = []
+    reports = (
+        InterviewReport.objects.exclude(session_id=None)
+        .order_by("user_id", "session_id", "-updated_at", "-created_at")
+        .values_list("id", "user_id", "session_id")
+    )
+    for report_id, user_id, session_id in reports.iterator():
+        if (user_id, session_id) in seen:
+            duplicates.append(report_id)
+        else:
+            seen.add((user_id, session_id))
+    InterviewReport.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("interview", "0004_interviewreport_interview_type_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_reports, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="interviewreport",
+            constraint=models.UniqueConstraint(
+                fields=("user", "session_id"), name="unique_interview_report_per_session"
+            ),
+        ),
+    ]
@@ -99,3 +99,7 @@ class InterviewReport(models.Model):
             models.Index(fields=['user', 'created_at']),
             models.Index(fields=['overall_score']),
         ]
+        constraints = [
+            # One report per interview session; reports without a session_id are not constrained
+            models.UniqueConstraint(fields=['user', 'session_id'], name='unique_interview_report_per_session'),
+        ]
@@ -0,0 +1,245 @@
+"""
+Bulk Interview Re-scoring
+Re-analyses stored interviews after a prompt/rubric change, with a bounded
+worker pool, resumable checkpoints and bulk write-back.
+"""
+
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime, parse_date
+
+from config.checkpoint import Checkpoint
+from .analysis_service import InterviewAnalysisService, conversation_from_history
+from .models import InterviewSession, InterviewReport
+
+
+TARGETS = ('reports', 'sessions')
+
+REPORT_FIELDS = [
+    'overall_score',
+    'tone_analysis',
+    'skill_scores',
+    'strengths',
+    'improvements',
+    'detailed_feedback',
+    'question_count',
+    'response_count',
+]
+
+
+def _parse_when(value):
+    if not value:
+        return None
+    parsed = parse_datetime(value) if isinstance(value, str) else value
+    if parsed is None and isinstance(value, str):
+        parsed_date = parse_date(value)
+        if parsed_date is None:
+            raise ValueError(f"Invalid date: {value}")
+        parsed = datetime.combine(parsed_date, datetime.min.time())
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def filter_queryset(target, ids=None, user=None, interview_type=None, created_after=None, created_before=None):
+    """
+    Build the queryset of interviews to re-score.
+
+    Args:
+        target: 'reports' (InterviewReport) or 'sessions' (InterviewSession)
+        ids: optional list of primary keys (reports) or session_ids (sessions)
+        user: optional user id (reports only)
+        interview_type: optional interview type (reports only)
+        created_after / created_before: optional ISO dates or datetimes
+
+    Returns:
+        QuerySet ordered by creation time
+    """
+    if target not in TARGETS:
+        raise ValueError(f"target must be one of {', '.join(TARGETS)}")
+
+    if target == 'reports':
+        queryset = InterviewReport.objects.all()
+        if ids:
+            queryset = queryset.filter(id__in=ids)
+        if user:
+            queryset = queryset.filter(user_id=user)
+        if interview_type:
+            queryset = queryset.filter(interview_type=interview_type)
+    else:
+        if user or interview_type:
+            raise ValueError("user and interview_type filters only apply to reports")
+        queryset = InterviewSession.objects.all()
+        if ids:
+            queryset = queryset.filter(session_id__in=ids)
+
+    after = _parse_when(created_after)
+    before = _parse_when(created_before)
+    if after:
+        queryset = queryset.filter(created_at__gte=after)
+    if before:
+        queryset = queryset.filter(created_at__lt=before)
+
+    return queryset.order_by('created_at')
+
+
+class InterviewRescorer:
+    """
+    Re-analyse a set of interviews and write the results back in bulk.
+
+    Transcripts are loaded up front on the calling thread, so worker threads only
+    talk to the analysis provider and never touch the database.
+    """
+
+    def __init__(self, concurrency=None, checkpoint_path=None, batch_size=50, service=None):
+        max_concurrency = getattr(settings, 'INTERVIEW_RESCORE_MAX_CONCURRENCY', 16)
+        concurrency = concurrency or getattr(settings, 'INTERVIEW_RESCORE_CONCURRENCY', 4)
+        self.concurrency = max(1, min(int(concurrency), max_concurrency))
+        self.batch_size = max(1, int(batch_size))
+        self.checkpoint = Checkpoint(checkpoint_path)
+        self.service = service or InterviewAnalysisService()
+
+    def rescore(self, target, queryset):
+        """
+        Args:
+            target: 'reports' or 'sessions'
+            queryset: result of `filter_queryset`
+
+        Returns:
+            Summary dict with processed/failed/skipped counts and throughput
+        """
+        if target == 'reports':
+            jobs, skipped = self._report_jobs(queryset)
+        else:
+            jobs, skipped = self._session_jobs(queryset)
+
+        started = time.monotonic()
+        processed = 0
+        errors = []
+        pending = []
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {
+                executor.submit(self._analyze, job): job
+                for job in jobs
+            }
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    pending.append((job, future.result()))
+                except Exception as e:
+                    print(f"[Rescore] Failed {job['key']}: {e}")
+                    errors.append({'id': job['key'], 'error': str(e)})
+
+                if len(pending) >= self.batch_size:
+                    processed += self._flush(target, pending)
+                    pending = []
+
+            if pending:
+                processed += self._flush(target, pending)
+
+        elapsed = time.monotonic() - started
+        per_minute = processed / elapsed * 60 if elapsed > 0 else 0.0
+        summary = {
+            'target': target,
+            'processed': processed,
+            'failed': len(errors),
+            'skipped': skipped,
+            'concurrency': self.concurrency,
+            'elapsed_seconds': round(elapsed, 3),
+            'interviews_per_minute': round(per_minute, 2),
+            'errors': errors,
+        }
+        print(f"[Rescore] {target}: {processed} re-scored, {len(errors)} failed, "
+              f"{skipped} skipped, {summary['interviews_per_minute']} interviews/min")
+        return summary
+
+    def _analyze(self, job):
+        return self.service.analyze(
+            job['conversation'],
+            job['interview_type'],
+            job['duration'],
+            job['session_id'],
+        )
+
+    def _report_jobs(self, queryset):
+        reports = [r for r in queryset if str(r.id) not in self.checkpoint]
+        sessions = InterviewSession.objects.in_bulk(
+            {r.session_id for r in reports if r.session_id},
+            field_name='session_id',
+        )
+
+        jobs = []
+        skipped = 0
+        for report in reports:
+            session = sessions.get(report.session_id)
+            conversation = conversation_from_history(session.history) if session else []
+            if not conversation:
+                skipped += 1
+                continue
+            jobs.append({
+                'key': str(report.id),
+                'obj': report,
+                'conversation': conversation,
+                'interview_type': report.interview_type or 'technical',
+                'duration': report.duration,
+                'session_id': report.session_id,
+            })
+        return jobs, skipped
+
+    def _session_jobs(self, queryset):
+        jobs = []
+        skipped = 0
+        for session in queryset:
+            if session.session_id in self.checkpoint:
+                continue
+            history = session.history if isinstance(session.history, list) else []
+            conversation = conversation_from_history(history)
+            if not conversation:
+                skipped += 1
+                continue
+            previous = next(
+                (m['content'] for m in reversed(history)
+                 if isinstance(m, dict) and m.get('role') == 'analysis' and isinstance(m.get('content'), dict)),
+                {},
+            )
+            jobs.append({
+                'key': session.session_id,
+                'obj': session,
+                'conversation': conversation,
+                'interview_type': previous.get('interview_type') or 'technical',
+                'duration': previous.get('duration', 15),
+                'session_id': session.session_id,
+            })
+        return jobs, skipped
+
+    def _flush(self, target, pending):
+        if target == 'reports':
+            now = timezone.now()
+            reports = []
+            for job, analysis in pending:
+                report = job['obj']
+                for field in REPORT_FIELDS:
+                    if field in analysis:
+                        setattr(report, field, analysis[field])
+                report.updated_at = now
+                reports.append(report)
+            InterviewReport.objects.bulk_update(reports, REPORT_FIELDS + ['updated_at'])
+        else:
+            sessions = []
+            for job, analysis in pending:
+                session = job['obj']
+                history = [
+                    m for m in session.history
+                    if not (isinstance(m, dict) and m.get('role') == 'analysis')
+                ]
+                history.append({"role": "analysis", "content": analysis})
+                session.history = history
+                sessions.append(session)
+            InterviewSession.objects.bulk_update(sessions, ['history'])
+
+        self.checkpoint.add_many(job['key'] for job, _ in pending)
+        return len(pending)
@@ -1,3 +1,147 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from accounts.models import CustomUser
+from .models import InterviewSession, InterviewReport
+from .rescoring import InterviewRescorer, filter_queryset
+
+
+LONG_ANSWER = "I would use a hash map to index the records and then sort the keys before merging the two result lists together"
+
+
+def _make_report(user, session_id, score=10):
+    return InterviewReport.objects.create(
+        user=user, session_id=session_id, interview_type='technical', overall_score=score,
+        duration=10, question_count=0, response_count=0, tone_analysis={}, skill_scores={},
+        strengths=[], improvements=[], detailed_feedback='old',
+    )
+
+
+@override_settings(INTERVIEW_ANALYSIS_PROVIDER='stub')
+class InterviewRescoreTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(username='cand', email='cand@e.com', password='Password123!')
+        self.staff = CustomUser.objects.create_user(username='staff', email='staff@e.com', password='Password123!', is_staff=True)
+        for i in range(3):
+            InterviewSession.objects.create(session_id=f'rs{i}', history=[
+                {'role': 'assistant', 'content': 'Explain how you would merge two lists.'},
+                {'role': 'user', 'content': LONG_ANSWER},
+            ])
+            _make_report(self.user, f'rs{i}')
+
+    def test_rescore_reports_bulk_updates_scores(self):
+        summary = InterviewRescorer(concurrency=2).rescore('reports', filter_queryset('reports'))
+        self.assertEqual(summary['processed'], 3)
+        self.assertEqual(summary['failed'], 0)
+        self.assertIn('interviews_per_minute', summary)
+        for report in InterviewReport.objects.all():
+            self.assertEqual(report.overall_score, 70)
+            self.assertEqual(report.question_count, 1)
+            self.assertEqual(report.response_count, 1)
+
+    def test_rescore_sessions_replaces_previous_analysis(self):
+        session = InterviewSession.objects.get(session_id='rs0')
+        session.history.append({'role': 'analysis', 'content': {'overall_score': 1}})
+        session.save()
+
+        InterviewRescorer().rescore('sessions', filter_queryset('sessions', ids=['rs0']))
+
+        session.refresh_from_db()
+        analyses = [m for m in session.history if m['role'] == 'analysis']
+        self.assertEqual(len(analyses), 1)
+        self.assertEqual(analyses[0]['content']['overall_score'], 70)
+
+    def test_checkpoint_resumes_without_reprocessing(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'rescore.json')
+            first = InterviewRescorer(checkpoint_path=path, batch_size=1).rescore('reports', filter_queryset('reports'))
+            self.assertEqual(first['processed'], 3)
+            with open(path) as f:
+                self.assertEqual(len(json.load(f)['done']), 3)
+
+            second = InterviewRescorer(checkpoint_path=path).rescore('reports', filter_queryset('reports'))
+            self.assertEqual(second['processed'], 0)
+
+    def test_rescore_endpoint_is_staff_only(self):
+        self.client.force_authenticate(user=self.staff)
+        response = self.client.post(reverse('interview-report-rescore'), {'target': 'reports', 'concurrency': 2}, 'json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['processed'], 3)
+
+        # Last: the view is non-atomic, so DRF's error handler marks the test's transaction for rollback
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.post(reverse('interview-report-rescore'), {}, 'json').status_code, 403)
+
+    def test_rescore_endpoint_rejects_bad_input(self):
+        self.client.force_authenticate(user=self.staff)
+        url = reverse('interview-report-rescore')
+        self.assertEqual(self.client.post(url, {'ids': ['not-a-uuid']}, 'json').status_code, 400)
+        self.assertEqual(self.client.post(url, {'concurrency': 'many'}, 'json').status_code, 400)
+
+    @override_settings(INTERVIEW_RESCORE_REQUEST_SECONDS=90)
+    def test_rescore_endpoint_caps_batch_to_request_time(self):
+        self.client.force_authenticate(user=self.staff)
+        response = self.client.post(reverse('interview-report-rescore'), {'concurrency': 1}, 'json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('limit 2', response.data['error'])
+
+    def test_rescore_command(self):
+        call_command('rescore_interviews', '--target', 'sessions', '--provider', 'stub', stdout=open(os.devnull, 'w'))
+        self.assertTrue(all(
+            any(m['role'] == 'analysis' for m in s.history) for s in InterviewSession.objects.all()
+        ))
+
+
+@override_settings(INTERVIEW_ANALYSIS_PROVIDER='stub')
+class AnalyzeAndSaveReportTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(username='cand', email='cand@e.com', password='Password123!')
+        self.payload = {
+            'session_id': 'save1',
+            'interview_type': 'technical',
+            'duration': 10,
+            'conversation': [{'role': 'ai', 'content': 'Q'}, {'role': 'user', 'content': LONG_ANSWER}],
+            'save_report': True,
+        }
+
+    def test_analyze_saves_report_in_same_request(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(reverse('interview-analyze'), self.payload, 'json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        report = InterviewReport.objects.get(user=self.user, session_id='save1')
+        self.assertEqual(response.data['report_id'], str(report.id))
+        self.assertEqual(report.overall_score, response.data['overall_score'])
+
+    def test_retries_upsert_instead_of_duplicating(self):
+        self.client.force_authenticate(user=self.user)
+        first = self.client.post(reverse('interview-analyze'), self.payload, 'json')
+        second = self.client.post(reverse('interview-analyze'), self.payload, 'json')
+        self.assertEqual(first.data['report_id'], second.data['report_id'])
+
+        resave = dict(second.data, overall_score=55)
+        self.assertEqual(self.client.post(reverse('interview-report-save'), resave, 'json').status_code, 200)
+        self.assertEqual(InterviewReport.objects.filter(user=self.user, session_id='save1').count(), 1)
+        self.assertEqual(InterviewReport.objects.get(session_id='save1').overall_score, 55)
+
+    def test_save_view_creates_then_updates(self):
+        self.client.force_authenticate(user=self.user)
+        report = dict(self.client.post(reverse('interview-analyze'), self.payload, 'json').data, session_id='save2')
+        self.assertEqual(self.client.post(reverse('interview-report-save'), report, 'json').status_code, 201)
+        self.assertEqual(self.client.post(reverse('interview-report-save'), report, 'json').status_code, 200)
+        self.assertEqual(InterviewReport.objects.filter(user=self.user, session_id='save2').count(), 1)
+
+    def test_anonymous_analysis_does_not_save(self):
+        response = self.client.post(reverse('interview-analyze'), self.payload, 'json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('report_id', response.data)
+        self.assertFalse(InterviewReport.objects.exists())
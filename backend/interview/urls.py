@@ -8,6 +8,7 @@ from .views import (
     InterviewSignupListView,
     InterviewReportSaveView,
     InterviewReportListView,
+    InterviewRescoreView,
 )
 
 urlpatterns = [
@@ -24,4 +25,5 @@ urlpatterns = [
     # Interview reports endpoints
     path('reports/save/', InterviewReportSaveView.as_view(), name='interview-report-save'),
     path('reports/', InterviewReportListView.as_view(), name='interview-report-list'),
+    path('reports/rescore/', InterviewRescoreView.as_view(), name='interview-report-rescore'),
 ]
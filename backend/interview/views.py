@@ -2,11 +2,17 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, generics, permissions
 from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.utils.decorators import method_decorator
+from rest_framework.exceptions import ValidationError
 from .models import InterviewSession, InterviewSignup, InterviewReport
 from .serializers import InterviewSignupSerializer, InterviewSessionSerializer, InterviewReportSerializer
+from .analysis_service import ANALYSIS_TIMEOUT_SECONDS, InterviewAnalysisService, fallback_analysis
+from .rescoring import InterviewRescorer, filter_queryset
 from accounts.models import CustomUser
+from candidates.llm_json import LLMJSONError
 import requests
-import json
 from rest_framework.permissions import AllowAny, IsAuthenticated
 
 
@@ -355,13 +361,17 @@ class SpeechToTextView(APIView):
 
 class AnalyzeInterviewView(APIView):
     """
-    Analyzes a completed interview transcript using Mistral AI.
+    Analyzes a completed interview transcript using Mistral AI
+    (or the offline stub provider, see INTERVIEW_ANALYSIS_PROVIDER).
 
     POST body:
       - session_id: str
       - conversation: [{"role": "user"|"ai", "content": "..."}]
       - interview_type: "technical" | "behavioral"
       - duration: int (minutes)
+      - save_report: bool (optional) - when true and the caller is authenticated,
+        the InterviewReport is created/updated in the same request, keyed on
+        (user, session_id), and its id is returned as `report_id`
 
     Returns a structured JSON analysis with:
       - overall_score (0-100)
@@ -372,6 +382,7 @@ class AnalyzeInterviewView(APIView):
       - detailed_feedback: str
       - question_count: int
       - response_count: int
+      - report_id: str (only when save_report was requested)
     """
 
     permission_classes = [AllowAny]
@@ -381,6 +392,7 @@ class AnalyzeInterviewView(APIView):
         conversation = request.data.get("conversation", [])
         interview_type = request.data.get("interview_type") or request.data.get("interviewType", "technical")
         duration = request.data.get("duration", 15)
+        save_report = str(request.data.get("save_report", "")).lower() in ("1", "true", "yes")
 
         print(f"[AnalyzeInterview] session={session_id}, type={interview_type}, turns={len(conversation)}")
 
@@ -390,95 +402,17 @@ class AnalyzeInterviewView(APIView):
         if not conversation:
             return Response({"error": "conversation is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Build a plain text transcript for analysis
-        transcript_lines = []
-        for msg in conversation:
-            role_label = "Candidate" if msg.get("role") == "user" else "Interviewer"
-            transcript_lines.append(f"{role_label}: {msg.get('content', '')}")
-        transcript_text = "\n".join(transcript_lines)
-
-        # Prompt Mistral to analyze the transcript
-        type_context = (
-            "This was a TECHNICAL interview focusing on programming, algorithms, and system design."
-            if interview_type == "technical"
-            else "This was a BEHAVIORAL interview focusing on soft skills, leadership, and past experiences."
-        )
-
-        analysis_prompt = f"""You are an expert interview coach and evaluator. Analyze the following interview transcript and return ONLY a valid JSON object (no extra text, no markdown, no code fences).
-
-{type_context}
-
-CRITICAL SCORING RULES:
-1. If the candidate provides extremely short, unhelpful, or no meaningful responses (e.g., total words spoken is very low, or they just say "I don't know", stay silent, etc.), YOU MUST SEVERELY PENALIZE their `overall_score` and `skill_scores`. Their scores should be extremely low (e.g., 10-35).
-2. DO NOT give a high score or generic positive feedback if the candidate barely participated.
-3. If they give bad or empty responses, their strengths should explicitly state "Requires more active participation" or "Minimal engagement", and improvements should focus on "Need to provide detailed responses to questions", "Avoid remaining silent or giving one-word answers".
-
-TRANSCRIPT:
-{transcript_text}
-
-Return this exact JSON structure:
-{{
-  "overall_score": <integer 0-100, heavily penalized if minimal/no response>,
-  "tone_analysis": {{
-    "dominant_tone": "<one word: confident|nervous|enthusiastic|hesitant|calm|anxious|assertive|uncertain|unresponsive>",
-    "confidence_score": <integer 0-100>,
-    "tone_tags": ["<tag1>", "<tag2>", "<tag3>"],
-    "sentiment": "<positive|neutral|negative|n/a>"
-  }},
-  "skill_scores": {{
-    "communication": <integer 0-100>,
-    "response_quality": <integer 0-100>,
-    "engagement": <integer 0-100>,
-    "{"technical_depth" if interview_type == "technical" else "empathy_and_self_awareness"}": <integer 0-100>
-  }},
-  "strengths": ["<strength 1>", "<strength 2>", "<strength 3>"],
-  "improvements": ["<area 1>", "<area 2>", "<area 3>"],
-  "detailed_feedback": "<2-3 sentence paragraph of personalized feedback>"
-}}"""
-
-        api_key = getattr(settings, "MISTRAL_API_KEY", None)
-        if not api_key:
+        try:
+            analysis_service = InterviewAnalysisService()
+        except ValueError as e:
             return Response(
-                {"error": "MISTRAL_API_KEY not configured"},
+                {"error": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
         try:
-            headers = {
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            }
-            payload = {
-                "model": "mistral-small-latest",
-                "messages": [{"role": "user", "content": analysis_prompt}],
-                "temperature": 0.3,
-                "max_tokens": 700,
-                "response_format": {"type": "json_object"},
-            }
-
-            print("[AnalyzeInterview] Calling Mistral API for analysis...")
-            resp = requests.post(
-                "https://api.mistral.ai/v1/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=45,
-            )
-            resp.raise_for_status()
-            resp_json = resp.json()
-
-            raw_content = ""
-            if resp_json.get("choices"):
-                raw_content = resp_json["choices"][0]["message"].get("content", "")
-
-            # Parse the JSON response
-            analysis = json.loads(raw_content)
-
-            # Attach meta-info
-            analysis["session_id"] = session_id
-            analysis["interview_type"] = interview_type
-            analysis["duration"] = duration
-            analysis["question_count"] = sum(1 for m in conversation if m.get("role") == "ai")
-            analysis["response_count"] = sum(1 for m in conversation if m.get("role") == "user")
+            print(f"[AnalyzeInterview] Calling {analysis_service.provider} provider for analysis...")
+            analysis = analysis_service.analyze(conversation, interview_type, duration, session_id)
 
             print(f"[AnalyzeInterview] Analysis complete, overall_score={analysis.get('overall_score')}")
 
@@ -492,118 +426,63 @@ Return this exact JSON structure:
             except InterviewSession.DoesNotExist:
                 pass
 
-            return Response(analysis, status=status.HTTP_200_OK)
-
-        except json.JSONDecodeError as e:
-            print(f"[AnalyzeInterview] JSON parse error: {e}, raw: {raw_content[:200]}")
+        except LLMJSONError as e:
+            print(f"[AnalyzeInterview] JSON parse error: {e}, raw: {e.raw[:200]}")
             # Return a graceful fallback so the UI still works
-            fallback = _fallback_analysis(conversation, interview_type, duration, session_id)
-            return Response(fallback, status=status.HTTP_200_OK)
+            analysis = fallback_analysis(conversation, interview_type, duration, session_id)
 
         except requests.exceptions.RequestException as e:
             print(f"[AnalyzeInterview] Mistral API error: {e}")
-            fallback = _fallback_analysis(conversation, interview_type, duration, session_id)
-            return Response(fallback, status=status.HTTP_200_OK)
+            analysis = fallback_analysis(conversation, interview_type, duration, session_id)
 
         except Exception as e:
             print(f"[AnalyzeInterview] Unexpected error: {e}")
             return Response({"error": "Internal server error during analysis."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+        if save_report and request.user.is_authenticated:
+            try:
+                report, _ = upsert_interview_report(request.user, analysis)
+                analysis["report_id"] = str(report.id)
+            except ValidationError as e:
+                print(f"[AnalyzeInterview] Report not saved: {e.detail}")
+                analysis["report_error"] = e.detail
+
+        return Response(analysis, status=status.HTTP_200_OK)
+
 
-def _fallback_analysis(conversation, interview_type, duration, session_id):
+def upsert_interview_report(user, data):
     """
-    Returns a basic heuristic analysis when the AI call fails,
-    so the frontend always gets a usable response.
+    Create or update the user's InterviewReport for `data['session_id']`.
+
+    Keyed on (user, session_id), which is unique, so retried saves update the
+    existing report instead of creating duplicates. Reports without a
+    session_id are always created.
+
+    Returns:
+    - (report, created)
     """
-    user_turns = [m for m in conversation if m.get("role") == "user"]
-    ai_turns = [m for m in conversation if m.get("role") == "ai"]
-    total_words = sum(len(m.get("content", "").split()) for m in user_turns)
-    avg_words = total_words // max(len(user_turns), 1)
-
-    # Penalize if there's no or almost no response
-    if total_words < 20:
-        return {
-            "overall_score": 25,
-            "tone_analysis": {
-                "dominant_tone": "unresponsive",
-                "confidence_score": 20,
-                "tone_tags": ["silent", "disengaged", "hesitant"],
-                "sentiment": "negative",
-            },
-            "skill_scores": {
-                "communication": 15,
-                "response_quality": 10,
-                "engagement": 10,
-                "technical_depth" if interview_type == "technical" else "empathy_and_self_awareness": 10,
-            },
-            "strengths": [
-                "Attended the interview session"
-            ],
-            "improvements": [
-                "Needs to actively engage with the questions",
-                "Must provide actual, detailed responses rather than remaining silent or using one-word answers",
-                "Practice speaking confidently and elaborating on key points"
-            ],
-            "detailed_feedback": (
-                "The candidate provided little to no substantial responses during the interview. "
-                "It is critical to actively engage with the interviewer and provide detailed examples. "
-                "Without sufficient communication, it is impossible to evaluate skills effectively."
-            ),
-            "session_id": session_id,
-            "interview_type": interview_type,
-            "duration": duration,
-            "question_count": len(ai_turns),
-            "response_count": len(user_turns),
-        }
-
-    comm_score = min(100, 50 + avg_words)  # longer answers = better communication proxy
-    return {
-        "overall_score": 70,
-        "tone_analysis": {
-            "dominant_tone": "calm",
-            "confidence_score": 65,
-            "tone_tags": ["composed", "thoughtful", "engaged"],
-            "sentiment": "positive",
-        },
-        "skill_scores": {
-            "communication": comm_score,
-            "response_quality": 68,
-            "engagement": 72,
-            "technical_depth" if interview_type == "technical" else "empathy_and_self_awareness": 65,
-        },
-        "strengths": [
-            "Participated actively throughout the session",
-            "Maintained clear communication",
-            "Demonstrated willingness to engage with questions",
-        ],
-        "improvements": [
-            "Aim to provide more specific examples in answers",
-            "Elaborate further on key technical/behavioral points",
-            "Practice structuring answers with a clear beginning, middle, and end",
-        ],
-        "detailed_feedback": (
-            "You completed the interview with a solid performance. "
-            "Focus on providing more detailed and structured answers to stand out further. "
-            "Keep practicing to build confidence and fluency."
-        ),
-        "session_id": session_id,
-        "interview_type": interview_type,
-        "duration": duration,
-        "question_count": len(ai_turns),
-        "response_count": len(user_turns),
-    }
+    serializer = InterviewReportSerializer(data=data)
+    serializer.is_valid(raise_exception=True)
+    fields = dict(serializer.validated_data)
+    session_id = fields.pop('session_id', None) or None
+    if session_id is None:
+        return InterviewReport.objects.create(user=user, **fields), True
+    return InterviewReport.objects.update_or_create(user=user, session_id=session_id, defaults=fields)
 
 
 class InterviewReportSaveView(generics.CreateAPIView):
     """
     API endpoint to save interview reports.
     Accepts full interview report object and saves it linked to the authenticated user.
+    Saving the same session_id again updates the existing report (200 instead of 201).
     """
     serializer_class = InterviewReportSerializer
     permission_classes = [IsAuthenticated]
-    
-    def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+
+    def create(self, request, *args, **kwargs):
+        report, created = upsert_interview_report(request.user, request.data)
+        serializer = self.get_serializer(report)
+        return Response(serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
 
 
 class InterviewReportListView(generics.ListAPIView):
@@ -629,3 +508,70 @@ class InterviewReportListView(generics.ListAPIView):
             queryset = queryset.filter(user=user)
 
         return queryset.order_by('-created_at')
+
+
+@method_decorator(transaction.non_atomic_requests, name='dispatch')
+class InterviewRescoreView(APIView):
+    """
+    Staff endpoint to re-score stored interviews after a prompt/rubric change.
+
+    POST body:
+      - target: "reports" (default) | "sessions"
+      - ids: optional list of report ids / session ids
+      - user, interview_type: optional filters (reports only)
+      - created_after, created_before: optional ISO dates
+      - concurrency: optional worker count (capped by INTERVIEW_RESCORE_MAX_CONCURRENCY)
+
+    Runs outside ATOMIC_REQUESTS (each batch is saved with its own bulk
+    update) and only accepts as many interviews as `concurrency` workers can
+    analyse within INTERVIEW_RESCORE_REQUEST_SECONDS, assuming every call
+    takes the full analysis timeout. Large backfills should use
+    `python manage.py rescore_interviews`, which supports resumable checkpoints.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request):
+        target = request.data.get('target', 'reports')
+        concurrency = request.data.get('concurrency')
+        if concurrency is not None:
+            try:
+                concurrency = int(concurrency)
+            except (TypeError, ValueError):
+                return Response({"error": "concurrency must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            queryset = filter_queryset(
+                target,
+                ids=request.data.get('ids'),
+                user=request.data.get('user'),
+                interview_type=request.data.get('interview_type'),
+                created_after=request.data.get('created_after'),
+                created_before=request.data.get('created_before'),
+            )
+            selected = queryset.count()
+        except (ValueError, DjangoValidationError) as e:
+            message = '; '.join(e.messages) if isinstance(e, DjangoValidationError) else str(e)
+            return Response({"error": message}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            rescorer = InterviewRescorer(concurrency=concurrency)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        rounds = max(1, getattr(settings, 'INTERVIEW_RESCORE_REQUEST_SECONDS', 90) // ANALYSIS_TIMEOUT_SECONDS)
+        max_batch = min(getattr(settings, 'INTERVIEW_RESCORE_MAX_BATCH', 200), rescorer.concurrency * rounds)
+        if selected > max_batch:
+            return Response({
+                "error": f"Too many interviews selected (limit {max_batch} at concurrency {rescorer.concurrency}).",
+                "details": "Narrow the filters, raise concurrency, or use the rescore_interviews management command."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            summary = rescorer.rescore(target, queryset)
+            return Response(summary, status=status.HTTP_200_OK)
+        except Exception as e:
+            print(f"[Rescore] Internal error: {e}")
+            return Response({
+                "error": "Failed to re-score interviews",
+                "details": str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
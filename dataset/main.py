@@ -445,6 +445,13 @@ with open('final_model.pkl', 'wb') as f:
 print("✓ Saved: final_model.pkl")
 print(f"  • File size: {os.path.getsize('final_model.pkl') / (1024*1024):.2f} MB")
 
+# Save the memory-mappable artifact the backend loads (shared across workers)
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from candidates.model_artifact import export_artifact
+artifact_path = export_artifact(final_model, 'artifacts')
+print(f"✓ Saved: {artifact_path} (memory-mapped artifact, now CURRENT)")
+
 # Save job profiles CSV for reference
 job_profiles.to_csv('job_profiles.csv', index=False)
 print("✓ Saved: job_profiles.csv (for reference)")
@@ -523,6 +530,7 @@ print("=" * 60)
 print("\n📦 Saved Files:")
 print("  Models:")
 print("    1. final_model.pkl (Main model file with all components)")
+print(f"    1b. {artifact_path} (Memory-mapped artifact loaded by the backend)")
 print("\n  Data Files:")
 print("    2. job_profiles.csv (Job profiles data)")
 print("    3. feature_info.json (Feature information)")
@@ -443,12 +443,16 @@ const Interview = () => {
         conversation: conv,
         interview_type: selectedInterviewType,
         duration: selectedDuration,
+        // Persist the report in the same request (upserted per session)
+        save_report: true,
       });
       const data = response.data;
       if (isMounted.current) {
         setAnalysisData(data);
-        // Automatically save the report (don't block UI if it fails)
-        saveInterviewReport(data);
+        // Fall back to the separate save call only if the backend didn't persist it
+        if (!data.report_id) {
+          saveInterviewReport(data);
+        }
       }
     } catch (err) {
       console.error("[Interview] Analysis fetch error:", err);